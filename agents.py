@@ -0,0 +1,249 @@
+#Team Name: Anything Works
+
+import numpy as np
+from occupancy import EMPTY
+
+# behavior -> (current_factor, swim_speed, turn_sigma, cohesion)
+#   current_factor: share of the local current the agent is carried by
+#   swim_speed:     own speed along its heading, cells per tick
+#   turn_sigma:     random heading change per tick, radians
+#   cohesion:       pull towards the centroid of its species on its layer
+BEHAVIORS = {
+    'stationary': (0.0, 0.0, 0.0, 0.0),
+    'drifter':    (1.0, 0.0, 0.0, 0.0),
+    'roaming':    (0.5, 0.6, 0.3, 0.0),
+    'swarm':      (0.8, 0.4, 0.2, 0.05),
+    'scavenger':  (0.3, 0.3, 0.8, 0.0),
+}
+DEFAULT_BEHAVIOR = 'drifter'
+BEHAVIOR_NAMES = list(BEHAVIORS)
+BEHAVIOR_PARAMS = np.array(list(BEHAVIORS.values()), dtype=np.float32)
+
+# uniform noise in [-0.5, 0.5) times this has unit standard deviation
+UNIFORM_TO_UNIT_STD = np.float32(np.sqrt(12.0))
+
+# steps of heading noise drawn at once by run()
+NOISE_BATCH = 256
+
+
+class LifeSimulation:
+    """Moves every marine-life object of an objects store as one batch.
+
+    Positions, headings, layer, species and behavior of all agents live in
+    flat NumPy arrays (agents of one layer are contiguous). step() advances
+    them all with the current field and per-behavior parameters, reflects
+    them off the grid edges and writes the rounded cells back into the
+    store's 'life' columns. Each layer's hit-testing for 'life' is handed to
+    an AgentIndex that is refreshed after every step.
+
+    The per-agent math runs in float32: it is several times faster for the
+    trig calls and positions stay exact to well below a cell.
+    """
+
+    def __init__(self, objects_store, currents, cols, rows, obj_type='life', seed=None):
+        self.objects_store = objects_store
+        self.currents = currents            # MovementSimulator (dense current field)
+        self.cols = cols
+        self.rows = rows
+        self.obj_type = obj_type
+        self.rng = np.random.default_rng(seed)
+
+        self.layers = sorted(objects_store)
+        self.columns = [objects_store[layer][obj_type] for layer in self.layers]
+        sizes = [len(c.index) for c in self.columns]
+        self.bounds = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        n = int(self.bounds[-1])
+
+        self.layer = np.repeat(np.array(self.layers, dtype=np.int16), sizes)
+        # x and y stacked, so each step does one operation for both axes
+        self.pos = np.stack([np.concatenate([c.col for c in self.columns]),
+                             np.concatenate([c.row for c in self.columns])]).astype(np.float32).reshape(2, n)
+        self.x, self.y = self.pos
+        self.w = np.concatenate([c.w for c in self.columns]).astype(np.int32)
+        self.h = np.concatenate([c.h for c in self.columns]).astype(np.int32)
+        self.limit = np.stack([cols - self.w, rows - self.h]).astype(np.float32).reshape(2, n)
+        self.heading = self.rng.uniform(0, 2 * np.pi, n).astype(np.float32)
+
+        # current (u, v) per grid cell, flattened so a step needs one take() each;
+        # a broadcast row x column query avoids a full-grid index meshgrid
+        u, v = currents.currents_at(np.arange(cols)[None, :], np.arange(rows)[:, None])
+        self.cell_uv = np.stack([u.ravel(), v.ravel()]).astype(np.float32)
+
+        species = np.concatenate([self._meta(c, 'species', '') for c in self.columns])
+        behavior = np.concatenate([self._meta(c, 'behavior', DEFAULT_BEHAVIOR) for c in self.columns])
+        self.species_names, self.species = np.unique(species, return_inverse=True)
+        codes = {name: i for i, name in enumerate(BEHAVIOR_NAMES)}
+        self.behavior = np.array([codes.get(b, codes[DEFAULT_BEHAVIOR]) for b in behavior], dtype=np.int8)
+
+        params = BEHAVIOR_PARAMS[self.behavior]
+        self.current_factor, self.swim_speed, self.turn_sigma, self.cohesion = params.T.copy()
+        self.turn_scale = self.turn_sigma * UNIFORM_TO_UNIT_STD
+        self.swarming = self.cohesion > 0
+        # swarm groups: one per (layer, species); group_xy numbers them again for y
+        self.group = self.layer.astype(np.int64) * len(self.species_names) + self.species
+        self.n_groups = (int(self.layer.max()) + 1) * len(self.species_names) if n else 0
+        self.group_xy = np.concatenate([self.group, self.group + self.n_groups])
+
+        self.index = AgentIndex(cols, rows, self.layer, int(self.w.max(initial=1)), int(self.h.max(initial=1)))
+        self.sync()
+        for k, layer in enumerate(self.layers):
+            objects_store[layer].set_dynamic(obj_type, LayerAgentIndex(self, k))
+
+    @staticmethod
+    def _meta(columns, name, default):
+        if columns.frame is None or name not in columns.frame:
+            return np.full(len(columns.index), default)
+        values = columns.frame[name].to_numpy(dtype=object)[columns.index]
+        return np.where(values == values, values, default).astype(str)   # NaN != NaN
+
+    def __len__(self):
+        return len(self.x)
+
+    # agents that have not been collected
+    def alive(self):
+        return np.concatenate([c.alive for c in self.columns]) if self.columns else np.zeros(0, dtype=bool)
+
+    def step(self, dt=1.0):
+        self.run(1, dt)
+
+    # several steps in a row (fast-forward); what stays fixed between steps is
+    # computed once and the store and hit-test index are written at the end,
+    # which leaves the same state as calling step() that many times
+    def run(self, steps, dt=1.0):
+        n = len(self.x)
+        if not n or steps <= 0:
+            return
+        alive = self.alive()
+        scale = alive * np.float32(dt)      # collected agents stay where they were
+        # swarm math only touches the swarming agents (the rest have no cohesion)
+        swarm = np.flatnonzero(self.swarming)
+        weight = alive[swarm]
+        swarming = weight.any()
+        if swarming:
+            group, group_xy = self.group[swarm], self.group_xy[np.concatenate([swarm, swarm + n])]
+            cohesion = self.cohesion[swarm]
+            count = np.bincount(group, weight, self.n_groups)
+            count[count == 0] = 1.0
+
+        velocity = np.empty_like(self.pos)
+        for first in range(0, steps, NOISE_BATCH):
+            # the heading noise of many steps in one draw (same stream as one draw per step)
+            noise = self.rng.random((min(NOISE_BATCH, steps - first), n), dtype=np.float32)
+            noise -= np.float32(0.5)
+            noise *= self.turn_scale
+            for turn in noise:
+                # own swimming along a heading that wanders by behavior
+                self.heading += turn
+                np.cos(self.heading, out=velocity[0])
+                np.sin(self.heading, out=velocity[1])
+                velocity *= self.swim_speed
+
+                # carried by the current at the agent's cell
+                cell = self.cell_i[1] * self.cols + self.cell_i[0]
+                velocity += self.cell_uv.take(cell, axis=1) * self.current_factor
+
+                # swarms drift towards the centroid of their (layer, species) group
+                if swarming:
+                    pos = self.pos[:, swarm]
+                    sums = np.bincount(group_xy, (weight * pos).ravel(), 2 * self.n_groups)
+                    centroid = (sums.reshape(2, -1) / count).astype(np.float32)
+                    velocity[:, swarm] += (centroid[:, group] - pos) * cohesion
+
+                velocity *= scale
+                self.pos += velocity
+                if self.pos.min() < 0 or (self.pos > self.limit).any():
+                    self._reflect()
+                self.cell_i = np.rint(self.pos).astype(np.int32)
+        self.sync()
+
+    # bounce positions back into [0, limit] and mirror the heading
+    # (x first: pi - heading, then y: -heading)
+    def _reflect(self):
+        pos, limit = self.pos, self.limit
+        low = pos < 0
+        high = pos > limit
+        flipped = low | high
+        np.copyto(pos, -pos, where=low)
+        np.copyto(pos, 2 * limit - pos, where=high)
+        np.clip(pos, 0, limit, out=pos)
+        for axis_angle, axis_flipped in zip((np.float32(np.pi), np.float32(0.0)), flipped):
+            self.heading[axis_flipped] = axis_angle - self.heading[axis_flipped]
+
+    # write rounded positions into the store and refresh the hit-test index
+    def sync(self):
+        self.cell_i = np.rint(self.pos).astype(np.int32)
+        col, row = self.cell_i
+        for k, columns in enumerate(self.columns):
+            a, b = self.bounds[k], self.bounds[k + 1]
+            columns.col[:] = col[a:b]
+            columns.row[:] = row[a:b]
+            columns.version += 1
+        self.index.rebuild(col, row, self.alive())
+
+
+class AgentIndex:
+    """Spatial hash of agent anchor cells.
+
+    Agents are bucketed by (layer, row, col) of their top-left cell; a point
+    query looks up the max_w x max_h anchors that could cover the cell. The
+    sort behind it is redone lazily, on the first query after agents moved,
+    so ticks without clicks never pay for it.
+    """
+
+    def __init__(self, cols, rows, layer, max_w, max_h):
+        self.cols = cols
+        self.rows = rows
+        self.layer = layer.astype(np.int64)
+        dr, dc = np.divmod(np.arange(max_w * max_h), max_w)
+        self.offset_col = dc
+        self.offset_row = dr
+        self.order = np.zeros(0, dtype=np.int64)
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.pending = None
+
+    def _key(self, layer, col, row):
+        return (layer * self.rows + row) * self.cols + col
+
+    def rebuild(self, col, row, alive):
+        self.pending = (col, row, alive)
+
+    def _sort(self):
+        col, row, alive = self.pending
+        self.pending = None
+        keys = self._key(self.layer, col.astype(np.int64), row.astype(np.int64))
+        keys[~alive] = -1
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+    # agents anchored where their footprint could cover (col,row)
+    def candidates(self, layer, col, row):
+        if self.pending is not None:
+            self._sort()
+        cand_col = col - self.offset_col
+        cand_row = row - self.offset_row
+        ok = (cand_col >= 0) & (cand_row >= 0)
+        keys = self._key(layer, cand_col[ok], cand_row[ok])
+        lo = np.searchsorted(self.keys, keys, side='left')
+        hi = np.searchsorted(self.keys, keys, side='right')
+        return [agent for a, b in zip(lo.tolist(), hi.tolist()) for agent in self.order[a:b].tolist()]
+
+
+# object_at() for one layer's 'life' type, in that type's own index space
+class LayerAgentIndex:
+    def __init__(self, sim, k):
+        self.sim = sim
+        self.k = k
+
+    def object_at(self, col, row):
+        sim = self.sim
+        columns = sim.columns[self.k]
+        first = int(sim.bounds[self.k])
+        best = EMPTY
+        for agent in sim.index.candidates(sim.layers[self.k], col, row):
+            i = agent - first
+            if not columns.alive[i]:
+                continue
+            if col < columns.col[i] + columns.w[i] and row < columns.row[i] + columns.h[i]:
+                if best == EMPTY or i < best:
+                    best = i
+        return best
@@ -0,0 +1,550 @@
+#Team Name: Anything Works
+
+# Micro-benchmarks for the game's data paths. Run with: python benchmarks.py
+# Headless stage suite:  python benchmarks.py --suite --out results.json
+# Compare two commits:   python benchmarks.py --compare old.json new.json
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# no window needed; must be set before pygame initializes its display
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pandas as pd
+import pygame
+import main as game
+from agents import LifeSimulation
+from hazards import HazardFields
+from foodweb import FoodWeb
+from layers import LAYER_RANGES, OBJ_TYPES, assignRandomLayers, loadLayerIndex, partitionByLayer
+from load_csv import DataLoader
+from movement import MovementSimulator
+from object_store import build_objects_store, collect_at
+from selection import Selection
+from simulation import ASCEND, CLICK, DESCEND, END, EventLog, Simulation, radius_for_layer, replay
+from user_hud import HUD
+
+LAYERS, COLS, SRC_SIZE = 6, 200, 50
+MAIN_PY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+
+# the original dict-per-object store, kept here only as a baseline
+def legacy_build_objects_store(layer_index, layers: int, cols: int, src_size: int = 50):
+    scale = max(1, cols // src_size)
+    store = {}
+    for layer in range(1, layers + 1):
+        raw = layer_index.get(layer) or {}
+        layer_store = {}
+        for objectType in OBJ_TYPES:
+            df = raw.get(objectType)
+            objects = []
+            if df is None:
+                layer_store[objectType] = objects
+                continue
+            for _, r in df.iterrows():
+                if 'col' not in r or 'row' not in r:
+                    continue
+                try:
+                    src_col = int(r['col'])
+                    src_row = int(r['row'])
+                except Exception:
+                    continue
+                w_src = int(r['width']) if 'width' in r and not pd.isna(r['width']) else 1
+                h_src = int(r['height']) if 'height' in r and not pd.isna(r['height']) else 1
+                objects.append({
+                    'type': objectType,
+                    'src_col': src_col,
+                    'src_row': src_row,
+                    'col': src_col * scale,
+                    'row': src_row * scale,
+                    'w': max(1, w_src * scale),
+                    'h': max(1, h_src * scale),
+                    'meta': r.to_dict(),
+                })
+            layer_store[objectType] = objects
+        store[layer] = layer_store
+    return store
+
+
+# replicate every object table `factor` times to simulate a bigger dataset
+def scale_layer_index(layer_index, factor):
+    if factor == 1:
+        return layer_index
+    return {
+        layer: {ot: pd.concat([df] * factor, ignore_index=True) for ot, df in objs.items()}
+        for layer, objs in layer_index.items()
+    }
+
+
+def count_objects(layer_index):
+    return sum(len(df) for objs in layer_index.values() for df in objs.values())
+
+
+# wall time of fn(*args) and the memory its result keeps alive
+def measure(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    seconds = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(*args)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return seconds, retained
+
+
+def compare_object_stores(factors=(1, 10, 100)):
+    _, layer_index = loadLayerIndex(layers=LAYERS)
+    rows = []
+    for factor in factors:
+        scaled = scale_layer_index(layer_index, factor)
+        n = count_objects(scaled)
+        for name, builder in (('legacy', legacy_build_objects_store), ('columnar', build_objects_store)):
+            seconds, retained = measure(builder, scaled, LAYERS, COLS, SRC_SIZE)
+            rows.append({'store': name, 'objects': n, 'seconds': seconds, 'retained_mb': retained / 2**20})
+    return rows
+
+
+# layer index whose only objects are n life agents sampled from life.csv,
+# scattered uniformly over the source grid and the life layers
+def synthetic_life_index(data, n, seed=0):
+    rng = np.random.default_rng(seed)
+    life = data['life'].iloc[rng.integers(0, len(data['life']), n)].reset_index(drop=True)
+    life['col'] = rng.integers(0, SRC_SIZE, n)
+    life['row'] = rng.integers(0, SRC_SIZE, n)
+    low, high = LAYER_RANGES['life']
+    life['layer'] = rng.integers(low, high, n)
+    return {int(layer): {'life': group} for layer, group in life.groupby('layer')}
+
+
+# mean wall time of LifeSimulation.step (including store/index sync) by agent count
+def agent_scaling(counts=(1_000, 10_000, 100_000), steps=20):
+    data, _ = loadLayerIndex(layers=LAYERS)
+    currents = MovementSimulator(data)
+    rows = []
+    for n in counts:
+        store = build_objects_store(synthetic_life_index(data, n), LAYERS, COLS, SRC_SIZE)
+        sim = LifeSimulation(store, currents, COLS, COLS, seed=0)
+        sim.step()
+        start = time.perf_counter()
+        for _ in range(steps):
+            sim.step()
+        ms = (time.perf_counter() - start) / steps * 1000
+        rows.append({'agents': n, 'step_ms': ms, 'us_per_agent': ms * 1000 / n})
+    return rows
+
+
+# a food web of n species in trophic bands: each species eats up to `diet`
+# species of lower bands, plus a few random links that close cycles
+def synthetic_food_web(n, diet=4, seed=0):
+    rng = np.random.default_rng(seed)
+    band = np.arange(n) * 10 // n
+    lower = np.searchsorted(band, band)         # species below index lower[s] are in lower bands
+    has_prey = lower > 0
+    predator = np.repeat(np.flatnonzero(has_prey), diet)
+    prey = (rng.random(len(predator)) * np.repeat(lower[has_prey], diet)).astype(np.int64)
+    extra = n // 50 + 1
+    predator = np.concatenate([predator, rng.integers(0, n, extra)])
+    prey = np.concatenate([prey, rng.integers(0, n, extra)])
+    names = np.array([f'Species_{i}' for i in range(n)], dtype=object)
+    return pd.DataFrame({'predator': names[predator], 'prey': names[prey],
+                         'interaction_strength': rng.random(len(predator))}), list(names)
+
+
+# FoodWeb build time and per-query times (first and cached) by species count
+def food_web_scaling(counts=(8, 1_000, 10_000), queries=200):
+    rows = []
+    for n in counts:
+        table, species = synthetic_food_web(n)
+        start = time.perf_counter()
+        web = FoodWeb(table, species)
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        web.trophic_levels()
+        levels_ms = (time.perf_counter() - start) * 1000
+        picks = [species[i] for i in np.random.default_rng(n).integers(0, n, queries)]
+        start = time.perf_counter()
+        for name in picks:
+            web.reachable_prey(name)
+        first_ms = (time.perf_counter() - start) * 1000 / queries
+        start = time.perf_counter()
+        for name in picks:
+            web.reachable_prey(name)
+            web.predators_of(name)
+            web.trophic_level(name)
+        cached_ms = (time.perf_counter() - start) * 1000 / queries
+        rows.append({'species': n, 'links': len(table), 'build_ms': build_ms, 'levels_ms': levels_ms,
+                     'closure_ms': first_ms, 'cached_query_ms': cached_ms})
+    return rows
+
+
+# wall time from process start until main.py has its first frame on screen
+# (loaded: its first frame with the whole world loaded)
+def startup_time(runs=5, cold=False, loaded=False):
+    exit_on = 'BT_EXIT_WHEN_LOADED' if loaded else 'BT_EXIT_AFTER_FIRST_FRAME'
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', **{exit_on: '1'})
+    times = []
+    for _ in range(runs):
+        if cold:
+            shutil.rmtree(DataLoader().cache_dir, ignore_errors=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN_PY], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def compare_startup(runs=5):
+    return [
+        {'dataset_cache': 'cold', 'first_frame_s': startup_time(runs, cold=True),
+         'loaded_s': startup_time(runs, cold=True, loaded=True)},
+        {'dataset_cache': 'warm', 'first_frame_s': startup_time(runs, cold=False),
+         'loaded_s': startup_time(runs, cold=False, loaded=True)},
+    ]
+
+
+# dataset scale factors of the stage suite: objects x factor on a grid with
+# factor times the area
+SUITE_SCALES = (1, 10, 100, 1000)
+# frames are skipped on grids of more pixels than this (cached layer surfaces)
+FRAME_MAX_PIXELS = 16_000_000
+# clicks per collect_at burst
+COLLECT_BURST = 500
+# a stage is a regression when its median time grows by more than this share
+REGRESSION_THRESHOLD = 0.10
+# game time of the replayed session, and the largest grid it is replayed on
+# (the route planner keeps per-direction cost arrays of the whole grid)
+SESSION_MINUTES = 30
+SESSION_MAX_CELLS = 4_000_000
+
+
+# the dataset tables with every object table `factor` times as long, scattered
+# over a source grid sqrt(factor) times wider; cells and currents are tiled
+def scaled_tables(data, factor, seed=0):
+    if factor == 1:
+        return {name: df.copy() for name, df in data.items()}, SRC_SIZE
+    side = int(round(SRC_SIZE * math.sqrt(factor)))
+    tiles = -(-side // SRC_SIZE)
+    rng = np.random.default_rng(seed)
+    scaled = {}
+    for name, df in data.items():
+        if name in OBJ_TYPES:
+            df = pd.concat([df] * factor, ignore_index=True)
+            df['col'] = rng.integers(0, side, len(df))
+            df['row'] = rng.integers(0, side, len(df))
+        else:
+            copies = []
+            for i in range(tiles):
+                for j in range(tiles):
+                    tile = df.copy()
+                    tile['row'] += i * SRC_SIZE
+                    tile['col'] += j * SRC_SIZE
+                    copies.append(tile)
+            df = pd.concat(copies, ignore_index=True)
+            df = df[(df['row'] < side) & (df['col'] < side)].reset_index(drop=True)
+        scaled[name] = df
+    return scaled, side
+
+
+# write a scaled copy of the dataset (CSVs + metadata.json) into base_dir
+def write_scaled_dataset(base_dir, factor, seed=0):
+    loader = DataLoader(use_cache=False)
+    tables, side = scaled_tables(loader.load_CSV_files(), factor, seed)
+    for name, df in tables.items():
+        df.to_csv(os.path.join(base_dir, name + '.csv'), index=False)
+    metadata = loader.load_metadata()
+    metadata['grid'] = dict(metadata.get('grid', {}), rows=side, cols=side)
+    with open(os.path.join(base_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f)
+    return side
+
+
+# call fn() `runs` times (setup() untimed before each) and summarize in ms
+def time_stage(fn, runs, setup=None):
+    times = []
+    result = None
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    stats = {
+        'runs': runs,
+        'median_ms': statistics.median(times),
+        'min_ms': min(times),
+        'mean_ms': statistics.fmean(times),
+    }
+    return stats, result
+
+
+# big datasets get fewer repeats of the expensive stages
+def runs_for(factor, repeat):
+    return max(1, round(repeat / max(1.0, math.log10(factor))))
+
+
+# grid (col, row) of n objects picked at random from the store, for clicks
+def object_cells(store, n, rng):
+    cells = []
+    for layer, layer_objs in store.items():
+        for columns in layer_objs.values():
+            live = np.flatnonzero(columns.alive)
+            cells += [(layer, int(columns.col[i]), int(columns.row[i])) for i in live]
+    if not cells:
+        return []
+    return [cells[i] for i in rng.integers(0, len(cells), n)]
+
+
+# an event log like a played session: a click every 1-5 s around the middle of
+# the map (inside the viewport of the layer), now and then a layer change
+def synthetic_session(cols, rows, minutes, rng):
+    log = EventLog()
+    center = (cols // 2, rows // 2)
+    log.append(0, CLICK, *center)
+    t, layer = 0, 1
+    while t < minutes * 60_000:
+        t += int(rng.integers(1000, 5000))
+        r = rng.random()
+        if r < 0.05 and layer < LAYERS:
+            log.append(t, DESCEND)
+            layer += 1
+        elif r < 0.1 and layer > 1:
+            log.append(t, ASCEND)
+            layer -= 1
+        else:
+            reach = radius_for_layer(layer) // 3
+            dc, dr = rng.integers(-reach, reach + 1, 2)
+            log.append(t, CLICK, int(center[0] + dc), int(center[1] + dr))
+    log.append(t, END)
+    return log
+
+
+def suite_scale(factor, repeat=5, seed=0):
+    """Time every stage of the game on a dataset scaled by `factor`."""
+    rng = np.random.default_rng(seed)
+    stages, skipped = {}, {}
+    heavy = runs_for(factor, repeat)
+
+    with tempfile.TemporaryDirectory(prefix='bench_') as base_dir:
+        side = write_scaled_dataset(base_dir, factor, seed)
+        cols = rows = side * (COLS // SRC_SIZE)
+        cache_dir = os.path.join(base_dir, '.cache')
+
+        # loading: CSV parse + cache build, then the memory-mapped cache
+        loader = DataLoader(base_dir)
+        stages['load_csv_cold'], _ = time_stage(
+            loader.load_CSV_files, heavy, setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+        stages['load_csv_warm'], data = time_stage(loader.load_CSV_files, heavy)
+
+        data = assignRandomLayers(data, loader.load_metadata().get('seed'))
+        layer_index = partitionByLayer(data, LAYERS)
+        n_objects = count_objects(layer_index)
+
+        stages['build_objects_store'], store = time_stage(
+            lambda: build_objects_store(layer_index, LAYERS, cols, side, rows), heavy)
+
+        # movement: the current field for every object position, and one life step
+        currents = MovementSimulator(data, sub_size=game.SUB_SIZE, seed=seed)
+        xs = rng.uniform(0, cols, n_objects)
+        ys = rng.uniform(0, rows, n_objects)
+        stages['movement_next_positions'], _ = time_stage(lambda: currents.next_positions(xs, ys), repeat)
+        life_sim = LifeSimulation(store, currents, cols, rows, seed=seed)
+        stages['life_step'], _ = time_stage(life_sim.step, repeat)
+
+        # frames: one per layer at that layer's radius, around the grid center
+        cell_size = max(1, game.GRID_WIDTH // cols)
+        width, height = cols * cell_size, rows * cell_size
+        if width * height > FRAME_MAX_PIXELS:
+            skipped['frame'] = f'{width}x{height} grid exceeds FRAME_MAX_PIXELS'
+            hud_height = game.Window_height - game.GRID_HEIGHT
+            screen = pygame.display.set_mode((game.Window_width, hud_height))
+            hud = HUD(grid_height=0, window_width=game.Window_width)
+        else:
+            hud_height = game.Window_height - game.GRID_HEIGHT
+            screen = pygame.display.set_mode((width, height + hud_height))
+            hud = HUD(grid_height=height, window_width=width)
+            center = (cols // 2, rows // 2)
+            active_cells = Selection(cols, rows)
+            active_cells.select(*center)
+            for mode in ('surface', 'framebuffer'):
+                renderer = game.make_renderer(store, mode, cols, rows, cell_size)
+                for layer in range(1, LAYERS + 1):
+                    draw = lambda: game.draw_frame(screen, renderer, hud, layer, center, active_cells, center)
+                    draw()      # first frame renders the layer cache
+                    stats, radius = time_stage(draw, repeat * 4)
+                    stages[f'frame_{mode}_layer{layer}'] = dict(stats, radius=radius)
+                del renderer
+
+        # HUD: unchanged values (cached panel) and a value change every draw
+        stages['hud_draw'], _ = time_stage(lambda: hud.draw(screen), repeat * 20)
+
+        def hud_changed():
+            hud.fuel = (hud.fuel - 1) % 100
+            hud.draw(screen)
+        stages['hud_draw_changed'], _ = time_stage(hud_changed, repeat * 20)
+
+        # collection: bursts of clicks, half on object cells and half at random
+        hits = []
+
+        def burst():
+            clicks = object_cells(store, COLLECT_BURST // 2, rng)
+            clicks += [(int(layer), int(c), int(r)) for layer, c, r in zip(
+                rng.integers(1, LAYERS + 1, COLLECT_BURST - len(clicks)),
+                rng.integers(0, cols, COLLECT_BURST - len(clicks)),
+                rng.integers(0, rows, COLLECT_BURST - len(clicks)))]
+            return clicks
+        bursts = [burst() for _ in range(repeat)]
+
+        def collect():
+            clicks = bursts[len(hits)]
+            hits.append(sum(collect_at(store, c, r, layer) is not None for layer, c, r in clicks))
+        stages['collect_burst'], _ = time_stage(collect, repeat)
+        stages['collect_burst']['clicks'] = COLLECT_BURST
+        stages['collect_burst']['hits'] = hits
+
+        # a recorded session replayed through the simulation core on a fresh world
+        if cols * rows > SESSION_MAX_CELLS:
+            skipped['session_replay'] = f'{cols}x{rows} grid exceeds SESSION_MAX_CELLS'
+        else:
+            log = synthetic_session(cols, rows, SESSION_MINUTES, rng)
+            sessions = []
+
+            def new_session():
+                fresh = build_objects_store(layer_index, LAYERS, cols, side, rows)
+                sessions.append(Simulation(fresh, cols, rows, planner=game.make_planner(fresh, currents, cols, rows),
+                                           life_sim=LifeSimulation(fresh, currents, cols, rows, seed=seed),
+                                           hazards=HazardFields(fresh, cols, rows)))
+            stages['session_replay'], _ = time_stage(lambda: replay(log, sessions[-1]), heavy, setup=new_session)
+            stages['session_replay']['events'] = len(log)
+            stages['session_replay']['minutes'] = SESSION_MINUTES
+
+    return {
+        'factor': factor,
+        'objects': n_objects,
+        'cols': cols,
+        'rows': rows,
+        'stages': stages,
+        'skipped': skipped,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(MAIN_PY),
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=os.path.dirname(MAIN_PY), capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out + ('-dirty' if dirty else '')
+
+
+def run_suite(scales=SUITE_SCALES, repeat=5):
+    pygame.init()
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pygame': pygame.version.ver,
+        'machine': platform.platform(),
+        'scales': [],
+    }
+    for factor in scales:
+        result = suite_scale(factor, repeat)
+        results['scales'].append(result)
+        print(f'{factor}x: {result["objects"]} objects on {result["cols"]}x{result["rows"]}')
+        print_rows([{'stage': name, 'median_ms': stats['median_ms'], 'min_ms': stats['min_ms']}
+                    for name, stats in result['stages'].items()])
+        for stage, reason in result['skipped'].items():
+            print(f'  skipped {stage}: {reason}')
+    pygame.quit()
+    return results
+
+
+# median-time ratio new/old for every (scale, stage) present in both runs
+def compare_results(old, new, threshold=REGRESSION_THRESHOLD):
+    old_scales = {s['factor']: s['stages'] for s in old['scales']}
+    rows = []
+    for scale in new['scales']:
+        before = old_scales.get(scale['factor'], {})
+        for name, stats in scale['stages'].items():
+            if name not in before:
+                continue
+            ratio = stats['median_ms'] / max(before[name]['median_ms'], 1e-9)
+            rows.append({
+                'scale': scale['factor'],
+                'stage': name,
+                'old_ms': before[name]['median_ms'],
+                'new_ms': stats['median_ms'],
+                'ratio': ratio,
+                'status': 'REGRESSION' if ratio > 1 + threshold else
+                          'faster' if ratio < 1 - threshold else 'same',
+            })
+    return rows
+
+
+def print_rows(rows):
+    if not rows:
+        return
+    keys = list(rows[0])
+    print('  '.join(f'{k:>12}' for k in keys))
+    for row in rows:
+        print('  '.join(f'{v:>12.4f}' if isinstance(v, float) else f'{v:>12}' for v in row.values()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--factors', type=int, nargs='+', default=[1, 10, 100],
+                        help='dataset replication factors for the object store comparison')
+    parser.add_argument('--startup', action='store_true',
+                        help='time process start to the first frame and to the loaded world instead')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--agents', type=int, nargs='*',
+                        help='time LifeSimulation.step at these agent counts instead')
+    parser.add_argument('--food-web', type=int, nargs='*',
+                        help='time food-web queries at these species counts instead')
+    parser.add_argument('--suite', action='store_true',
+                        help='time every game stage headless at the --scales dataset sizes')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SUITE_SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--out', help='write the suite results to this JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='compare two suite JSON files; exits 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            rows = compare_results(json.load(f_old), json.load(f_new), args.threshold)
+        print_rows(rows)
+        sys.exit(1 if any(row['status'] == 'REGRESSION' for row in rows) else 0)
+    elif args.suite:
+        results = run_suite(args.scales, args.repeat)
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(results, f, indent=2)
+    elif args.agents is not None:
+        print_rows(agent_scaling(args.agents or (1_000, 10_000, 100_000)))
+    elif args.food_web is not None:
+        print_rows(food_web_scaling(args.food_web or (8, 1_000, 10_000)))
+    elif args.startup:
+        print_rows(compare_startup(args.runs))
+    else:
+        print_rows(compare_object_stores(args.factors))
@@ -0,0 +1,363 @@
+#Team Name: Anything Works
+
+import json
+import os
+import shutil
+from collections import OrderedDict
+import numpy as np
+from environment import FIELDS, dense_fields, sample_bilinear
+from layers import OBJ_TYPES, assignRandomLayers
+from load_csv import TABLES, DataLoader, columns_frame, open_columns, write_columns
+from object_store import LayerObjects, TypeColumns, size_column
+from occupancy import EMPTY
+
+# chunk side, in source cells
+CHUNK_SIZE = 16
+# resident chunk data (bytes) before least recently used chunks are dropped
+MEMORY_CAP = 128 * 2**20
+# rings of chunks loaded ahead of the view in the direction it moves
+PREFETCH_DEPTH = 1
+# prefetched chunks loaded per update, so one frame never loads a whole ring
+PREFETCH_BUDGET = 1
+
+# bump when the on-disk chunk layout changes
+CHUNK_CACHE_VERSION = 1
+
+
+class ChunkIndex:
+    """The dataset partitioned into square chunks of source cells, on disk.
+
+    Every table with row/col columns is stored sorted by chunk (one .npy per
+    column, as in the DataLoader cache) next to an offsets array, so the rows
+    of one chunk are a single memory-mapped slice. Object tables keep the
+    'layer' assignRandomLayers gave them (so a seed places objects exactly
+    as in the resident world) and are sorted by layer within a chunk. The
+    partition is rebuilt when a source CSV changes (mtime or size) or the
+    chunk size or seed differ.
+    """
+
+    def __init__(self, loader=None, chunk_size=CHUNK_SIZE, seed=None):
+        self.loader = loader if loader is not None else DataLoader()
+        self.chunk_size = chunk_size
+        metadata = self.loader.load_metadata()
+        self.seed = metadata.get('seed') if seed is None else seed
+        self.src_cols = metadata['grid']['cols']
+        self.src_rows = metadata['grid']['rows']
+        self.chunks_x = -(-self.src_cols // chunk_size)
+        self.chunks_y = -(-self.src_rows // chunk_size)
+        self.dir = os.path.join(self.loader.cache_dir, f'chunks{chunk_size}')
+
+        manifest = self._valid_manifest()
+        if manifest is None:
+            manifest = self._build()
+        self.tables = {
+            name: (open_columns(os.path.join(self.dir, name), table['columns']),
+                   np.load(os.path.join(self.dir, name, 'offsets.npy'), mmap_mode='r'))
+            for name, table in manifest['tables'].items()
+        }
+        # approximate bytes per row once loaded (strings as stored on disk)
+        self.row_bytes = {
+            name: sum(values.itemsize + (8 if is_str else 0) for _, is_str, values, _ in opened)
+            for name, (opened, _) in self.tables.items()
+        }
+
+    def _sources(self):
+        sources = {}
+        for name in TABLES:
+            st = os.stat(os.path.join(self.loader.base_dir, name + '.csv'))
+            sources[name] = [st.st_mtime_ns, st.st_size]
+        return sources
+
+    def _valid_manifest(self):
+        try:
+            with open(os.path.join(self.dir, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (manifest.get('version') != CHUNK_CACHE_VERSION or manifest.get('seed') != self.seed
+                or manifest.get('sources') != self._sources()):
+            return None
+        return manifest
+
+    def _build(self):
+        data = assignRandomLayers(self.loader.load_CSV_files(), self.seed)
+        n_chunks = self.chunks_x * self.chunks_y
+        tmp_dir = self.dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        tables = {}
+        for name, df in data.items():
+            if 'row' not in df or 'col' not in df:
+                continue        # not spatial (food_web)
+            row = df['row'].to_numpy(dtype=float)
+            col = df['col'].to_numpy(dtype=float)
+            inside = (row >= 0) & (row < self.src_rows) & (col >= 0) & (col < self.src_cols)
+            df = df[inside]
+            key = (row[inside] // self.chunk_size * self.chunks_x + col[inside] // self.chunk_size).astype(np.int64)
+            order = np.argsort(key, kind='stable')
+            if 'layer' in df:
+                order = order[np.argsort(df['layer'].to_numpy()[order], kind='stable')]
+                order = order[np.argsort(key[order], kind='stable')]
+
+            table_dir = os.path.join(tmp_dir, name)
+            os.makedirs(table_dir)
+            columns = write_columns(table_dir, df.iloc[order].reset_index(drop=True))
+            np.save(os.path.join(table_dir, 'offsets.npy'), np.searchsorted(key[order], np.arange(n_chunks + 1)))
+            tables[name] = {'columns': columns, 'rows': int(len(df))}
+
+        manifest = {
+            'version': CHUNK_CACHE_VERSION,
+            'chunk_size': self.chunk_size,
+            'seed': self.seed,
+            'sources': self._sources(),
+            'tables': tables,
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        shutil.rmtree(self.dir, ignore_errors=True)
+        os.replace(tmp_dir, self.dir)
+        return manifest
+
+    # row range [start, stop) of one table inside chunk (cx, cy)
+    def span(self, name, cx, cy):
+        offsets = self.tables[name][1]
+        key = cy * self.chunks_x + cx
+        return int(offsets[key]), int(offsets[key + 1])
+
+    # rows of one table inside chunk (cx, cy), as a DataFrame
+    def rows(self, name, cx, cy):
+        return columns_frame(self.tables[name][0], *self.span(name, cx, cy))
+
+    # one numeric column of a table inside chunk (cx, cy), straight from the map
+    def column(self, name, column, cx, cy):
+        start, stop = self.span(name, cx, cy)
+        for col_name, _, values, _ in self.tables[name][0]:
+            if col_name == column:
+                return np.asarray(values[start:stop])
+        raise KeyError(column)
+
+
+# One loaded chunk: its objects by layer (an objects store over the chunk's
+# grid cells, positions in world cells), its currents and environment fields
+# as dense source-cell arrays and its environment cells. removed holds the
+# collected objects of the chunk ({(layer, obj_type): rows of the chunk's
+# table}); they are loaded as already gone.
+class Chunk:
+    __slots__ = ('cx', 'cy', 'col0', 'row0', 'objects', 'cells', 'fields', 'u', 'v', 'has_current', 'nbytes')
+
+    def __init__(self, index, cx, cy, layers, scale, removed=None):
+        size = index.chunk_size
+        self.cx, self.cy = cx, cy
+        self.col0, self.row0 = cx * size * scale, cy * size * scale
+
+        # objects anchored in this chunk; with 1x1 source objects nothing crosses
+        # a chunk edge, bigger footprints are clipped to the chunk
+        self.nbytes = 0
+        per_layer = {layer: {} for layer in range(1, layers + 1)}
+        empty = np.zeros(0, dtype=np.int32)
+        for obj_type in OBJ_TYPES:
+            if obj_type not in index.tables:
+                for layer_columns in per_layer.values():
+                    layer_columns[obj_type] = TypeColumns(obj_type, None, empty, empty, empty, scale, empty, empty)
+                continue
+            # rows are sorted by layer inside the chunk: each layer is a range of them
+            frame = index.rows(obj_type, cx, cy)
+            self.nbytes += len(frame) * index.row_bytes[obj_type]
+            src_col = frame['col'].to_numpy(dtype=np.int32)
+            src_row = frame['row'].to_numpy(dtype=np.int32)
+            w_src = size_column(frame, 'width', len(frame))
+            h_src = size_column(frame, 'height', len(frame))
+            bounds = np.searchsorted(frame['layer'].to_numpy(), np.arange(1, layers + 2))
+            for layer in range(1, layers + 1):
+                a, b = int(bounds[layer - 1]), int(bounds[layer])
+                columns = per_layer[layer][obj_type] = TypeColumns(
+                    obj_type, frame, np.arange(a, b, dtype=np.int32), src_col[a:b], src_row[a:b],
+                    scale, w_src[a:b], h_src[a:b])
+                gone = (removed or {}).get((layer, obj_type))
+                if gone:
+                    columns.alive[np.fromiter(gone, dtype=np.int64, count=len(gone)) - a] = False
+        k = size * scale
+        self.objects = {layer: LayerObjects(columns, k, k, origin=(self.col0, self.row0))
+                        for layer, columns in per_layer.items()}
+
+        self.cells = index.rows('cells', cx, cy) if 'cells' in index.tables else None
+        self.fields = {}
+        if self.cells is not None:
+            self.fields = dense_fields(self.cells, (size, size), row0=cy * size, col0=cx * size)
+        self.u = np.zeros((size, size))
+        self.v = np.zeros((size, size))
+        self.has_current = np.zeros((size, size), dtype=bool)
+        if 'currents' in index.tables:
+            r = index.column('currents', 'row', cx, cy).astype(np.int64) - cy * size
+            c = index.column('currents', 'col', cx, cy).astype(np.int64) - cx * size
+            # reversed so the first row of a duplicated cell wins, as in MovementSimulator
+            self.u[r[::-1], c[::-1]] = index.column('currents', 'u_mps', cx, cy)[::-1]
+            self.v[r[::-1], c[::-1]] = index.column('currents', 'v_mps', cx, cy)[::-1]
+            self.has_current[r, c] = True
+
+        self.nbytes += self.u.nbytes + self.v.nbytes + self.has_current.nbytes
+        self.nbytes += sum(field.nbytes for field in self.fields.values())
+        if self.cells is not None:
+            self.nbytes += len(self.cells) * index.row_bytes['cells']
+        for layer_objs in self.objects.values():
+            occupancy = layer_objs.occupancy
+            self.nbytes += sum(v.nbytes for v in vars(occupancy).values() if isinstance(v, np.ndarray))
+
+
+class ChunkedWorld:
+    """Streams the chunks of a ChunkIndex around the view.
+
+    Chunks load on first use and are kept in least-recently-used order;
+    once the resident bytes exceed memory_cap, the oldest chunks that are
+    not in view are dropped. What was collected in a chunk is kept (as
+    rows of the chunk's tables, so it grows with the objects collected, not
+    with the map) and taken out again when the chunk is reloaded. update() loads the chunks of the view and
+    queues the ring just beyond it on the side it moves towards; prefetch()
+    queues any other area the view is about to reach. pump() loads a few
+    queued chunks per frame.
+    """
+
+    def __init__(self, index, layers, scale, memory_cap=MEMORY_CAP):
+        self.index = index
+        self.layers = layers
+        self.scale = scale
+        self.chunk_cells = index.chunk_size * scale     # grid cells per chunk side
+        self.cols = index.src_cols * scale
+        self.rows = index.src_rows * scale
+        self.memory_cap = memory_cap
+
+        self.chunks = OrderedDict()     # (cx, cy) -> Chunk, least recently used first
+        self.nbytes = 0
+        self.pinned = set()
+        self.prefetch_queue = []
+        self.on_evict = []              # callbacks taking the evicted chunk's key
+        self.collected = {}             # (cx, cy) -> {(layer, obj_type): set of table rows}
+        self._last_view = None
+
+    # chunk (cx, cy), loaded if needed
+    def chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk(self.index, key[0], key[1], self.layers, self.scale,
+                                             removed=self.collected.get(key))
+            self.nbytes += chunk.nbytes
+            self._evict()
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def chunk_key(self, col, row):
+        return col // self.chunk_cells, row // self.chunk_cells
+
+    # keys of the chunks covering the inclusive cell rectangle
+    def keys_in(self, cmin, cmax, rmin, rmax):
+        cmin, cmax = max(0, cmin), min(self.cols - 1, cmax)
+        rmin, rmax = max(0, rmin), min(self.rows - 1, rmax)
+        if cmin > cmax or rmin > rmax:
+            return []
+        k = self.chunk_cells
+        return [(cx, cy) for cy in range(rmin // k, rmax // k + 1) for cx in range(cmin // k, cmax // k + 1)]
+
+    def update(self, cmin, cmax, rmin, rmax):
+        """Load the chunks of the view (inclusive cells) and queue the ones ahead of it."""
+        view = (cmin, cmax, rmin, rmax)
+        keys = self.keys_in(*view)
+        self.pinned = set(keys)
+        for key in keys:
+            self.chunk(key)
+
+        if self._last_view is not None and view != self._last_view:
+            # direction of movement from the change of the view's center
+            dx = np.sign((cmin + cmax) - (self._last_view[0] + self._last_view[1]))
+            dy = np.sign((rmin + rmax) - (self._last_view[2] + self._last_view[3]))
+            reach = PREFETCH_DEPTH * self.chunk_cells
+            self.prefetch(cmin + min(dx, 0) * reach, cmax + max(dx, 0) * reach,
+                          rmin + min(dy, 0) * reach, rmax + max(dy, 0) * reach)
+        self._last_view = view
+
+    # queue the chunks of a cell rectangle the view is expected to reach
+    def prefetch(self, cmin, cmax, rmin, rmax):
+        queued = set(self.prefetch_queue)
+        self.prefetch_queue += [key for key in self.keys_in(cmin, cmax, rmin, rmax)
+                                if key not in self.chunks and key not in queued]
+
+    # load up to `budget` queued chunks; called every frame, idle or not
+    def pump(self, budget=PREFETCH_BUDGET):
+        while budget > 0 and self.prefetch_queue:
+            key = self.prefetch_queue.pop(0)
+            if key not in self.chunks:
+                self.chunk(key)
+                budget -= 1
+
+    def _evict(self):
+        for key in list(self.chunks):
+            if self.nbytes <= self.memory_cap:
+                break
+            if key in self.pinned:
+                continue
+            self.nbytes -= self.chunks.pop(key).nbytes
+            for callback in self.on_evict:
+                callback(key)
+
+    # objects store of one layer of the chunk holding (col,row)
+    def layer_objects(self, col, row, layer):
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        return self.chunk(self.chunk_key(col, row)).objects.get(layer)
+
+    def object_at(self, col, row, layer):
+        layer_objs = self.layer_objects(col, row, layer)
+        return EMPTY if layer_objs is None else layer_objs.object_at(col, row)
+
+    # same as object_store.collect_at, positions in world cells; the object
+    # stays collected when its chunk is dropped and loaded again
+    def collect_at(self, col, row, layer):
+        layer_objs = self.layer_objects(col, row, layer)
+        if not layer_objs:
+            return None
+        obj_id = layer_objs.object_at(col, row)
+        if obj_id == EMPTY:
+            return None
+        columns, i = layer_objs.resolve(obj_id)
+        collected = columns.get(i)
+        layer_objs.remove(obj_id)
+        removed = self.collected.setdefault(self.chunk_key(col, row), {})
+        removed.setdefault((layer, columns.type), set()).add(int(columns.index[i]))
+        return collected
+
+    # current (u, v) at a grid cell, zero where there is none
+    def current_at(self, col, row):
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return 0.0, 0.0
+        chunk = self.chunk(self.chunk_key(col, row))
+        r = (row - chunk.row0) // self.scale
+        c = (col - chunk.col0) // self.scale
+        if not chunk.has_current[r, c]:
+            return 0.0, 0.0
+        return float(chunk.u[r, c]), float(chunk.v[r, c])
+
+    # environment field values of one source cell (NaN where there are none)
+    def _source_fields(self, src_col, src_row):
+        size = self.index.chunk_size
+        chunk = self.chunk((src_col // size, src_row // size))
+        r, c = src_row - chunk.cy * size, src_col - chunk.cx * size
+        return {name: chunk.fields[name][r, c] if name in chunk.fields else np.nan for name in FIELDS}
+
+    # environment readings at a grid cell, interpolated as by EnvironmentFields
+    # but from the (up to four) source cells around it, whichever chunks they are in
+    def environment_at(self, col, row):
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return {name: np.nan for name in FIELDS}
+        x = (col + 0.5) / self.scale
+        y = (row + 0.5) / self.scale
+        x0 = min(max(int(np.floor(x - 0.5)), 0), self.index.src_cols - 1)
+        y0 = min(max(int(np.floor(y - 0.5)), 0), self.index.src_rows - 1)
+        x1 = min(x0 + 1, self.index.src_cols - 1)
+        y1 = min(y0 + 1, self.index.src_rows - 1)
+        corners = [self._source_fields(c, r) for r, c in ((y0, x0), (y0, x1), (y1, x0), (y1, x1))]
+        return {
+            name: float(sample_bilinear(np.array([[corners[0][name], corners[1][name]],
+                                                  [corners[2][name], corners[3][name]]], dtype=np.float32),
+                                        x - x0, y - y0))
+            for name in FIELDS
+        }
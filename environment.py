@@ -0,0 +1,94 @@
+#Team Name: Anything Works
+
+import numpy as np
+
+# cells.csv columns served as environment fields
+FIELDS = ['depth_m', 'pressure_atm', 'temperature_c', 'light_intensity', 'terrain_roughness']
+
+
+# dense (rows, cols) float32 arrays of the fields in a cells table; cells
+# missing from the table are NaN. row0/col0 shift the table's cells (a chunk)
+def dense_fields(cells, shape, row0=0, col0=0):
+    rows = cells['row'].to_numpy(dtype=np.int64) - row0
+    cols = cells['col'].to_numpy(dtype=np.int64) - col0
+    inside = (rows >= 0) & (rows < shape[0]) & (cols >= 0) & (cols < shape[1])
+    fields = {}
+    for name in FIELDS:
+        if name not in cells:
+            continue
+        field = np.full(shape, np.nan, dtype=np.float32)
+        field[rows[inside], cols[inside]] = cells[name].to_numpy(dtype=np.float32)[inside]
+        fields[name] = field
+    return fields
+
+
+# values at fractional source-cell positions (cell i spans [i, i + 1), its
+# value sits at the center i + 0.5), interpolated between the four nearest
+# centers; positions beyond the outer centers take the edge value
+def sample_bilinear(values, xs, ys):
+    n_rows, n_cols = values.shape
+    x = np.clip(np.asarray(xs, dtype=np.float32) - 0.5, 0, n_cols - 1)
+    y = np.clip(np.asarray(ys, dtype=np.float32) - 0.5, 0, n_rows - 1)
+    x0 = np.floor(x).astype(np.int64)
+    y0 = np.floor(y).astype(np.int64)
+    x1 = np.minimum(x0 + 1, n_cols - 1)
+    y1 = np.minimum(y0 + 1, n_rows - 1)
+    wx = (x - x0).astype(values.dtype)
+    wy = (y - y0).astype(values.dtype)
+    top = values[y0, x0] * (1 - wx) + values[y0, x1] * wx
+    bottom = values[y1, x0] * (1 - wx) + values[y1, x1] * wx
+    return top * (1 - wy) + bottom * wy
+
+
+class EnvironmentFields:
+    """Environment readings of cells.csv over the game grid.
+
+    Each field is held as a dense array per source cell. The first time a
+    field is used, it is bilinearly upsampled to the game grid (sub_size
+    grid cells per source cell) and cached, so point and region queries are
+    plain array indexing.
+    """
+
+    def __init__(self, cells, sub_size=4):
+        self.sub_size = sub_size
+        shape = (int(cells['row'].max()) + 1, int(cells['col'].max()) + 1) if len(cells) else (0, 0)
+        self.source = dense_fields(cells, shape)
+        self.rows = shape[0] * sub_size
+        self.cols = shape[1] * sub_size
+        self._grids = {}
+
+    @property
+    def names(self):
+        return list(self.source)
+
+    # (rows * sub_size, cols * sub_size) grid of one field, built on first use
+    def grid(self, name):
+        grid = self._grids.get(name)
+        if grid is None:
+            centers_x = (np.arange(self.cols, dtype=np.float32) + 0.5) / self.sub_size
+            centers_y = (np.arange(self.rows, dtype=np.float32) + 0.5) / self.sub_size
+            grid = sample_bilinear(self.source[name], centers_x[None, :], centers_y[:, None])
+            self._grids[name] = grid
+        return grid
+
+    def at(self, cols, rows, names=None):
+        """Field values at grid cells (scalars or arrays); NaN outside the grid."""
+        cols = np.asarray(cols, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        c = np.where(inside, cols, 0)
+        r = np.where(inside, rows, 0)
+        return {name: np.where(inside, self.grid(name)[r, c], np.nan)
+                for name in (names if names is not None else self.names)}
+
+    # view of one field over the inclusive cell rectangle (clipped to the grid)
+    def region(self, name, cmin, cmax, rmin, rmax):
+        cmin, rmin = max(0, cmin), max(0, rmin)
+        return self.grid(name)[rmin:max(rmin, rmax + 1), cmin:max(cmin, cmax + 1)]
+
+    # (min, mean, max) of one field over the inclusive cell rectangle
+    def region_stats(self, name, cmin, cmax, rmin, rmax):
+        values = self.region(name, cmin, cmax, rmin, rmax)
+        if not values.size or np.isnan(values).all():
+            return np.nan, np.nan, np.nan
+        return float(np.nanmin(values)), float(np.nanmean(values)), float(np.nanmax(values))
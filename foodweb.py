@@ -0,0 +1,253 @@
+#Team Name: Anything Works
+
+import numpy as np
+import pandas as pd
+
+# row i of a CSR graph is indices[indptr[i]:indptr[i + 1]]
+def csr(src, dst, n, weight=None):
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order].astype(np.int32), (weight[order] if weight is not None else None)
+
+
+# positions into indices of all the CSR rows in nodes, in one gather
+def csr_rows(indptr, nodes):
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+    return offsets + np.arange(total)
+
+
+class FoodWeb:
+    """Predator/prey graph of the species in food_web.csv.
+
+    Species are numbered once (metadata.json's species_list first, then any
+    other name in the table) and the links are held as two CSR adjacency
+    arrays, predator -> prey and prey -> predator, so direct lookups are a
+    slice. "Everything X eats, directly or down the chain" is a breadth-first
+    walk over the CSR rows that is cached per species; trophic levels are
+    computed for all species at once on first use. join() hooks in the
+    marine-life objects of a store, so a species' predators or prey can be
+    picked out of a viewport.
+    """
+
+    def __init__(self, food_web, species=()):
+        species = np.asarray(list(species), dtype=object)
+        links = len(food_web)
+        # codes in order of first appearance, so metadata's species keep theirs
+        codes, names = pd.factorize(np.concatenate([
+            species, food_web['predator'].astype(str).to_numpy(dtype=object),
+            food_web['prey'].astype(str).to_numpy(dtype=object)]))
+        self.names = np.asarray(names, dtype=object)
+        self.index = pd.Index(self.names)
+        self.codes = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+
+        predator = codes[len(species):len(species) + links].astype(np.int64)
+        prey = codes[len(species) + links:].astype(np.int64)
+        strength = (food_web['interaction_strength'].to_numpy(dtype=np.float64)
+                    if 'interaction_strength' in food_web else np.ones(len(predator)))
+        strength = np.where(np.isnan(strength), 1.0, strength)
+
+        self.prey_ptr, self.prey_idx, self.prey_strength = csr(predator, prey, n, strength)
+        self.pred_ptr, self.pred_idx, _ = csr(prey, predator, n)
+
+        self._closure = {}          # (direction, code) -> species codes reachable
+        self._levels = None
+        self._life = None           # objects store joined with join()
+        self._life_codes = {}       # layer -> species code of every life object (-1: not in the web)
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_data(cls, data, metadata=None):
+        return cls(data['food_web'], (metadata or {}).get('species_list', ()))
+
+    def code(self, name):
+        return self.codes.get(name, -1)
+
+    def species(self, codes):
+        return self.names[codes].tolist()
+
+    # species codes one step down (prey) or up (predators) the chain
+    def prey_codes(self, code):
+        return self.prey_idx[self.prey_ptr[code]:self.prey_ptr[code + 1]] if code >= 0 else self.prey_idx[:0]
+
+    def predator_codes(self, code):
+        return self.pred_idx[self.pred_ptr[code]:self.pred_ptr[code + 1]] if code >= 0 else self.pred_idx[:0]
+
+    def prey_of(self, name):
+        return self.species(self.prey_codes(self.code(name)))
+
+    def predators_of(self, name):
+        return self.species(self.predator_codes(self.code(name)))
+
+    # all codes reachable from code along one CSR graph (breadth first, one
+    # gather per level); code itself only if a cycle leads back to it
+    def _reach(self, direction, code):
+        key = (direction, code)
+        reached = self._closure.get(key)
+        if reached is None:
+            indptr, indices = (self.prey_ptr, self.prey_idx) if direction == 'prey' else (self.pred_ptr, self.pred_idx)
+            seen = np.zeros(len(self.names), dtype=bool)
+            frontier = np.array([code], dtype=np.int64) if code >= 0 else np.zeros(0, dtype=np.int64)
+            while len(frontier):
+                nxt = indices[csr_rows(indptr, frontier)]
+                nxt = np.unique(nxt[~seen[nxt]])
+                seen[nxt] = True
+                frontier = nxt.astype(np.int64)
+            reached = np.flatnonzero(seen)
+            reached.flags.writeable = False
+            self._closure[key] = reached
+        return reached
+
+    def reachable_prey(self, name):
+        return self.species(self._reach('prey', self.code(name)))
+
+    def reachable_predators(self, name):
+        return self.species(self._reach('predators', self.code(name)))
+
+    # strongly connected components of the predator -> prey graph (iterative
+    # Tarjan), prey before predators: every component comes after all the
+    # components it eats from
+    def _components(self):
+        ptr, idx = self.prey_ptr.tolist(), self.prey_idx.tolist()
+        n = len(self.names)
+        order = [-1] * n            # visit number
+        low = [0] * n
+        on_stack = [False] * n
+        stack, components, counter = [], [], 0
+        for root in range(n):
+            if order[root] >= 0:
+                continue
+            work = [(root, ptr[root])]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                v, i = work[-1]
+                if i < ptr[v + 1]:
+                    work[-1] = (v, i + 1)
+                    w = idx[i]
+                    if order[w] < 0:
+                        order[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = True
+                        work.append((w, ptr[w]))
+                    elif on_stack[w] and order[w] < low[v]:
+                        low[v] = order[w]
+                    continue
+                work.pop()
+                if work and low[v] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[v]
+                if low[v] == order[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    components.append(component)
+        return components
+
+    # trophic level of every species: 1 for species that eat nothing here,
+    # otherwise 1 + the interaction-strength weighted mean level of its prey,
+    # i.e. the solution of (I - D) L = 1 for the diet matrix D. It is solved
+    # component by component, prey first: a species in no cycle is one sum,
+    # a cycle one np.linalg.solve over its members. A cycle that eats nothing
+    # outside itself has no finite level, so it and everything that eats
+    # from it, directly or down the chain, get NaN
+    def trophic_levels(self):
+        if self._levels is None:
+            n = len(self.names)
+            counts = np.diff(self.prey_ptr)
+            row_of = np.repeat(np.arange(n), counts)
+            total = np.bincount(row_of, self.prey_strength, minlength=n)
+            diet = self.prey_strength / np.where(total[row_of] > 0, total[row_of], 1)    # each row sums to 1
+
+            ptr, idx, share = self.prey_ptr.tolist(), self.prey_idx.tolist(), diet.tolist()
+            levels = [1.0] * n
+            member = [-1] * n
+            for c, component in enumerate(self._components()):
+                if len(component) == 1:
+                    s = component[0]
+                    own, level, exits = 0.0, 1.0, ptr[s] == ptr[s + 1]
+                    for i in range(ptr[s], ptr[s + 1]):
+                        if idx[i] == s:
+                            own += share[i]
+                        else:
+                            level += share[i] * levels[idx[i]]
+                            exits = True
+                    # a cannibal: L = 1 + own * L + the rest of its diet
+                    levels[s] = level / (1 - own) if exits else float('nan')
+                    continue
+                for s in component:
+                    member[s] = c
+                pos = {s: k for k, s in enumerate(component)}
+                a = np.eye(len(component))
+                b = np.ones(len(component))
+                exits = False
+                for k, s in enumerate(component):
+                    for i in range(ptr[s], ptr[s + 1]):
+                        t = idx[i]
+                        if member[t] == c:
+                            a[k, pos[t]] -= share[i]
+                        else:
+                            b[k] += share[i] * levels[t]
+                            exits = True
+                solved = np.linalg.solve(a, b) if exits else np.full(len(component), np.nan)
+                for s, level in zip(component, solved.tolist()):
+                    levels[s] = level
+            levels = np.array(levels)
+            levels.flags.writeable = False
+            self._levels = levels
+        return self._levels
+
+    def trophic_level(self, name):
+        code = self.code(name)
+        return float(self.trophic_levels()[code]) if code >= 0 else float('nan')
+
+    # species with a trophic level in [low, high)
+    def at_levels(self, low, high):
+        levels = self.trophic_levels()
+        return self.species(np.flatnonzero((levels >= low) & (levels < high)))
+
+    # use the marine-life objects of an objects store for the viewport queries
+    def join(self, objects_store, obj_type='life'):
+        self._life = (objects_store, obj_type)
+        self._life_codes = {}
+
+    def _layer_codes(self, layer):
+        codes = self._life_codes.get(layer)
+        if codes is None:
+            columns = self._life[0][layer][self._life[1]]
+            if columns.frame is None or 'species' not in columns.frame:
+                codes = np.full(len(columns.index), -1, dtype=np.int32)
+            else:
+                codes = self.index.get_indexer(columns.frame['species'].to_numpy(dtype=object)[columns.index])
+                codes = codes.astype(np.int32)
+            self._life_codes[layer] = codes
+        return codes
+
+    # life objects (indices into the layer's life columns) of any of the given
+    # species whose footprint intersects the inclusive cell rectangle
+    def life_in_view(self, layer, species_codes, cmin, cmax, rmin, rmax):
+        columns = self._life[0][layer][self._life[1]]
+        wanted = np.zeros(len(self.names) + 1, dtype=bool)     # last slot: species not in the web
+        wanted[species_codes] = True
+        i = columns.visible(cmin, cmax, rmin, rmax)
+        return i[wanted[self._layer_codes(layer)[i]]]
+
+    def predators_in_view(self, name, layer, cmin, cmax, rmin, rmax):
+        return self.life_in_view(layer, self.predator_codes(self.code(name)), cmin, cmax, rmin, rmax)
+
+    def prey_in_view(self, name, layer, cmin, cmax, rmin, rmax):
+        return self.life_in_view(layer, self.prey_codes(self.code(name)), cmin, cmax, rmin, rmax)
@@ -0,0 +1,128 @@
+#Team Name: Anything Works
+
+import numpy as np
+
+# hazards reach this many grid cells (one source cell is 4); beyond it a cell is safe
+HAZARD_RANGE = 12
+
+# hull damage per unit of exposure at the cell a move ends in
+DAMAGE_PER_EXPOSURE = 0.5
+
+
+# per-hazard metadata of a TypeColumns as an array (default where missing/NaN)
+def hazard_meta(columns, name, default, dtype):
+    if columns.frame is None or name not in columns.frame:
+        return np.full(len(columns.index), default, dtype=dtype)
+    values = columns.frame[name].to_numpy(dtype=object)[columns.index]
+    return np.where(values == values, values, default).astype(dtype)   # NaN != NaN
+
+
+class HazardFields:
+    """Dense per-layer hazard fields over the game grid.
+
+    For every layer and cell: the distance (in cells) to the nearest live
+    hazard footprint, the type of that hazard and the exposure, the sum of
+    severity * (1 - distance / radius) over all hazards in range. They are
+    built once with a distance transform truncated at `radius` (cells
+    farther away read inf / no type / 0), so a damage check or a danger
+    lookup is one array read. A hazard only changes the cells within radius
+    of its footprint, so refresh() recomputes just that window after a
+    hazard is collected.
+    """
+
+    def __init__(self, objects_store, cols, rows, obj_type='hazards', radius=HAZARD_RANGE):
+        self.objects_store = objects_store
+        self.cols = cols
+        self.rows = rows
+        self.obj_type = obj_type
+        self.radius = radius
+        self.layers = sorted(objects_store)
+
+        # hazard types numbered over all layers; kind fields hold these codes (-1: none in range)
+        types = {layer: hazard_meta(self._columns(layer), 'type', '', str) for layer in self.layers}
+        self.kinds = sorted({str(t) for names in types.values() for t in names})
+        codes = {name: i for i, name in enumerate(self.kinds)}
+        self.kind_codes = {layer: np.array([codes[t] for t in names], dtype=np.int8)
+                           for layer, names in types.items()}
+        self.severity = {layer: hazard_meta(self._columns(layer), 'severity', 1, np.float32)
+                         for layer in self.layers}
+
+        shape = (len(self.layers), rows, cols)
+        self.distance = np.full(shape, np.inf, dtype=np.float32)
+        self.exposure = np.zeros(shape, dtype=np.float32)
+        self.kind = np.full(shape, -1, dtype=np.int8)
+        for layer in self.layers:
+            self._stamp(layer, 0, cols - 1, 0, rows - 1)
+
+    def _columns(self, layer):
+        layer_objs = self.objects_store.get(layer)
+        return layer_objs.get(self.obj_type) if layer_objs else None
+
+    # recompute the inclusive cell window of a layer from the live hazards in range of it
+    def _stamp(self, layer, cmin, cmax, rmin, rmax):
+        cmin, rmin = max(0, cmin), max(0, rmin)
+        cmax, rmax = min(self.cols - 1, cmax), min(self.rows - 1, rmax)
+        if cmin > cmax or rmin > rmax:
+            return
+        k = self.layers.index(layer)
+        window = np.s_[rmin:rmax + 1, cmin:cmax + 1]
+        distance, exposure, kind = self.distance[k][window], self.exposure[k][window], self.kind[k][window]
+        distance[...] = np.inf
+        exposure[...] = 0
+        kind[...] = -1
+
+        columns = self._columns(layer)
+        reach = self.radius - 1
+        i = columns.visible(cmin - reach, cmax + reach, rmin - reach, rmax + reach) if columns is not None else ()
+        if not len(i):
+            return
+
+        # every hazard's footprint plus `reach` cells around it, as (hazards, span) cells
+        col0, row0 = columns.col[i].astype(np.int64), columns.row[i].astype(np.int64)
+        col1, row1 = col0 + columns.w[i] - 1, row0 + columns.h[i] - 1
+        cc = col0[:, None] - reach + np.arange(int(columns.w[i].max()) + 2 * reach)
+        rr = row0[:, None] - reach + np.arange(int(columns.h[i].max()) + 2 * reach)
+        dx = np.maximum(0, np.maximum(col0[:, None] - cc, cc - col1[:, None]))
+        dy = np.maximum(0, np.maximum(row0[:, None] - rr, rr - row1[:, None]))
+        d = np.hypot(dx[:, None, :], dy[:, :, None]).astype(np.float32)     # (hazards, rows, cols)
+        valid = ((d < self.radius)
+                 & ((cc >= cmin) & (cc <= cmax))[:, None, :]
+                 & ((rr >= rmin) & (rr <= rmax))[:, :, None])
+
+        # cell numbers within the window
+        width = cmax - cmin + 1
+        cell = ((rr - rmin)[:, :, None] * width + (cc - cmin)[:, None, :])[valid]
+        hazard = np.broadcast_to(np.arange(len(i))[:, None, None], d.shape)[valid]
+        d = d[valid]
+
+        weight = self.severity[layer][i][hazard] * (1 - d / self.radius)
+        exposure += np.bincount(cell, weight, minlength=exposure.size).reshape(exposure.shape).astype(np.float32)
+        # nearest distance per cell, then the type of a hazard at that distance
+        nearest = np.full(exposure.size, np.inf, dtype=np.float32)
+        np.minimum.at(nearest, cell, d)
+        hit = d == nearest[cell]
+        rows, cols = np.divmod(cell[hit], width)
+        distance[rows, cols] = d[hit]
+        kind[rows, cols] = self.kind_codes[layer][i][hazard[hit]]
+
+    # hazards covering the (col, row, w, h) footprint changed (e.g. one was collected)
+    def refresh(self, layer, col, row, w=1, h=1):
+        reach = self.radius - 1
+        self._stamp(layer, col - reach, col + w - 1 + reach, row - reach, row + h - 1 + reach)
+
+    def _cell(self, layer, col, row):
+        if layer not in self.layers or not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        return self.layers.index(layer), row, col
+
+    # hull damage for a move that ends in (col, row)
+    def damage(self, layer, col, row):
+        cell = self._cell(layer, col, row)
+        return DAMAGE_PER_EXPOSURE * float(self.exposure[cell]) if cell else 0.0
+
+    # (hazard type, distance in cells) of the nearest hazard in range, or None
+    def nearest(self, layer, col, row):
+        cell = self._cell(layer, col, row)
+        if cell is None or self.kind[cell] < 0:
+            return None
+        return self.kinds[self.kind[cell]], float(self.distance[cell])
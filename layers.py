@@ -1,49 +1,76 @@
 #Team Name: Anything Works
 
+from functools import lru_cache
 from load_csv import DataLoader
 import numpy as np
 
-def assignRandomLayers(data):
+# layer range [low, high) each object type is randomly placed in
+LAYER_RANGES = {
+    'corals':    (2, 6),
+    'food_web':  (3, 6),
+    'hazards':   (4, 6),
+    'life':      (3, 6),
+    'poi':       (2, 6),
+    'resources': (6, 7),
+}
 
-    corals = data['corals']
-    corals['layer'] = np.random.randint(2, 6, size=len(corals))
-    # print(corals[:20])
+# all the objects types we have in dataset
+OBJ_TYPES = list(LAYER_RANGES)
 
-    foodWeb = data['food_web']
-    foodWeb['layer'] = np.random.randint(3, 6, size=len(foodWeb))
-    # print(foodWeb[:20])
+def assignRandomLayers(data, seed=None):
+    # one generator for all tables so the same seed always gives the same placement
+    rng = np.random.default_rng(seed)
 
-    hazards = data['hazards']
-    hazards['layer'] = np.random.randint(4, 6, size=len(hazards))
-    # print(hazards[:20])
+    for obj_type, (low, high) in LAYER_RANGES.items():
+        df = data[obj_type]
+        df['layer'] = rng.integers(low, high, size=len(df))
 
-    life = data['life']
-    life['layer'] = np.random.randint(3, 6, size=len(life))
-    # print(life[:20])
+    return data
 
-    poi = data['poi']
-    poi['layer'] = np.random.randint(2, 6, size=len(poi))
-    # print(poi[:20])
 
-    resources = data['resources']
-    resources['layer'] = np.random.randint(6, 7, size=len(resources))
-    # print(resources[:20])
+def partitionByLayer(data, layers):
+    """Group every object table by its 'layer' column in one pass.
 
-    
-    return data
+    Returns {layer: {obj_type: DataFrame}} for layers 1..layers; layers or
+    types without objects get an empty frame with the table's columns.
+    """
+    index = {layer: {} for layer in range(1, layers + 1)}
 
+    for obj_type in OBJ_TYPES:
+        df = data[obj_type]
+        for layer, group in df.groupby('layer', sort=False):
+            layer = int(layer)
+            if layer in index:
+                index[layer][obj_type] = group
 
-def getObjects(layer):
-    loader = DataLoader()
+        empty = df.iloc[0:0]
+        for layer_objs in index.values():
+            layer_objs.setdefault(obj_type, empty)
+
+    return index
+
+
+def loadLayerIndex(layers, seed=None, loader=None):
+    """Parse the dataset once, place objects on layers and partition them.
+
+    seed defaults to the 'seed' in data/metadata.json so placement is stable
+    from run to run. Returns (data, layer_index).
+    """
+    loader = loader if loader is not None else DataLoader()
     data = loader.load_CSV_files()
-    
-    data = assignRandomLayers(data)
+    if seed is None:
+        seed = loader.load_metadata().get('seed')
+
+    data = assignRandomLayers(data, seed)
+    return data, partitionByLayer(data, layers)
 
-    objects_in_layer = {}
-    
-    for obj_type in ['corals', 'food_web', 'hazards', 'life', 'poi', 'resources']:
-        df = data[obj_type]
-        filtered = df[df['layer'] == layer]
-        objects_in_layer[obj_type] = filtered
 
-    return objects_in_layer
+@lru_cache(maxsize=1)
+def _defaultLayerIndex():
+    _, index = loadLayerIndex(layers=max(high for _, high in LAYER_RANGES.values()) - 1)
+    return index
+
+
+def getObjects(layer):
+    # kept for callers that want a single layer; shares one cached load
+    return _defaultLayerIndex().get(layer, {})
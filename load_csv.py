@@ -1,23 +1,212 @@
 #Team Name: Anything Works
 
+import hashlib
+import json
 import os
+import shutil
+from multiprocessing import shared_memory
+import numpy as np
 import pandas as pd
-import streamlit as st
-import json
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# every table in the dataset, loaded from <name>.csv
+TABLES = ['cells', 'currents', 'hazards', 'corals', 'food_web', 'life', 'poi', 'resources']
+
+# bump when the on-disk cache layout changes
+CACHE_VERSION = 1
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# a column as (is_str, values, null mask or None); strings become a fixed-width
+# unicode array with '' for missing values
+def column_arrays(series):
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return False, series.to_numpy(), None
+    null = series.isna().to_numpy()
+    values = series.fillna('').astype(str).to_numpy(dtype=str)
+    return True, values, (null if null.any() else None)
+
+
+# save every column of df as <i>.npy in out_dir; returns the manifest's column list
+def write_columns(out_dir, df):
+    columns = []
+    for i, name in enumerate(df.columns):
+        is_str, values, null = column_arrays(df[name])
+        np.save(os.path.join(out_dir, f'{i}.npy'), values)
+        if null is not None:
+            np.save(os.path.join(out_dir, f'{i}.null.npy'), null)
+        columns.append({'name': name, 'kind': 'str' if is_str else 'num', 'has_null': null is not None})
+    return columns
+
+
+# memory-map the columns written by write_columns: [(name, values, null mask or None)]
+def open_columns(table_dir, columns):
+    opened = []
+    for i, col in enumerate(columns):
+        values = np.load(os.path.join(table_dir, f'{i}.npy'), mmap_mode='r')
+        null = None
+        if col['kind'] == 'str' and col['has_null']:
+            null = np.load(os.path.join(table_dir, f'{i}.null.npy'), mmap_mode='r')
+        opened.append((col['name'], col['kind'] == 'str', values, null))
+    return opened
+
+
+# DataFrame of rows [start, stop) of opened columns; only that slice is read
+def columns_frame(opened, start=None, stop=None):
+    columns = {}
+    for name, is_str, values, null in opened:
+        values = values[start:stop]
+        if is_str:
+            values = values.astype(object)
+            if null is not None:
+                values[null[start:stop]] = np.nan
+        columns[name] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+# Copy every table of data into one shared-memory block, so worker processes
+# can attach to the dataset instead of each getting a pickled copy. Returns
+# (block, spec): the owner closes and unlinks the block when done, spec is the
+# small picklable layout attach_tables() needs.
+def share_tables(data):
+    layout, parts, size = {}, [], 0
+    for table, df in data.items():
+        columns = []
+        for name in df.columns:
+            is_str, values, null = column_arrays(df[name])
+            entry = {'name': name, 'is_str': is_str}
+            for key, arr in (('values', values), ('null', null)):
+                if arr is None:
+                    continue
+                arr = np.ascontiguousarray(arr)
+                size = -(-size // 64) * 64      # keep every array cache-line aligned
+                entry[key] = (arr.dtype.str, arr.shape, size)
+                parts.append((size, arr))
+                size += arr.nbytes
+            columns.append(entry)
+        layout[table] = columns
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for offset, arr in parts:
+        np.ndarray(arr.shape, arr.dtype, buffer=block.buf, offset=offset)[...] = arr
+    return block, {'name': block.name, 'tables': layout}
+
+
+# the tables of a share_tables() spec as DataFrames over the shared block
+# (numeric columns are read-only views, not copies); returns (block, data) and
+# the block has to stay open as long as the frames are used
+def attach_tables(spec):
+    block = shared_memory.SharedMemory(name=spec['name'])
+
+    def view(entry, key):
+        if key not in entry:
+            return None
+        dtype, shape, offset = entry[key]
+        arr = np.ndarray(shape, np.dtype(dtype), buffer=block.buf, offset=offset)
+        arr.flags.writeable = False
+        return arr
+
+    data = {table: columns_frame([(c['name'], c['is_str'], view(c, 'values'), view(c, 'null')) for c in columns])
+            for table, columns in spec['tables'].items()}
+    return block, data
+
 
 class DataLoader:
+    """Loads the dataset tables.
+
+    Each CSV is compiled on first load into a columnar cache (one .npy file
+    per column under data/.cache/<table>/). Later loads memory-map those
+    files instead of parsing the CSV again. A cache is used while the source
+    file's mtime and size match; if only the mtime moved, the content hash
+    decides.
+    """
+
+    def __init__(self, base_dir: str = DATA_DIR, cache_dir: str = None, use_cache: bool = True):
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(base_dir, '.cache')
+        self.use_cache = use_cache
+
     def load_CSV_files(self):
-        base_dir = os.path.join(os.path.dirname(__file__), 'data')
-        data = {
-            'cells': pd.read_csv(os.path.join(base_dir, 'cells.csv')),
-            'currents': pd.read_csv(os.path.join(base_dir, 'currents.csv')),
-            'hazards': pd.read_csv(os.path.join(base_dir, 'hazards.csv')),
-            'corals': pd.read_csv(os.path.join(base_dir, 'corals.csv')),
-            'food_web': pd.read_csv(os.path.join(base_dir, 'food_web.csv')),
-            'life': pd.read_csv(os.path.join(base_dir, 'life.csv')),
-            'poi': pd.read_csv(os.path.join(base_dir, 'poi.csv')),
-            'resources': pd.read_csv(os.path.join(base_dir, 'resources.csv')),
-        }
+        data = {name: self.load_table(name) for name in TABLES}
 
         return data
 
+    # grid size, seed, species list etc. for the dataset
+    def load_metadata(self):
+        with open(os.path.join(self.base_dir, 'metadata.json')) as f:
+            return json.load(f)
+
+    def load_table(self, name):
+        src = os.path.join(self.base_dir, name + '.csv')
+        if not self.use_cache:
+            return pd.read_csv(src)
+
+        table_dir = os.path.join(self.cache_dir, name)
+        manifest = self._valid_manifest(src, table_dir)
+        if manifest is not None:
+            return self._read_cache(table_dir, manifest)
+
+        df = pd.read_csv(src)
+        try:
+            self._write_cache(src, table_dir, df)
+        except OSError:
+            pass        # read-only data dir: just use the parsed frame
+        return df
+
+    def _valid_manifest(self, src, table_dir):
+        try:
+            with open(os.path.join(table_dir, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != CACHE_VERSION:
+            return None
+
+        st = os.stat(src)
+        if manifest['size'] != st.st_size:
+            return None
+        if manifest['mtime_ns'] != st.st_mtime_ns:
+            # touched but possibly unchanged: compare content before rebuilding
+            if manifest['sha1'] != _file_sha1(src):
+                return None
+            manifest['mtime_ns'] = st.st_mtime_ns
+            try:
+                self._write_manifest(table_dir, manifest)
+            except OSError:
+                pass
+        return manifest
+
+    def _read_cache(self, table_dir, manifest):
+        return columns_frame(open_columns(table_dir, manifest['columns']))
+
+    def _write_cache(self, src, table_dir, df):
+        st = os.stat(src)
+        tmp_dir = table_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns = write_columns(tmp_dir, df)
+
+        self._write_manifest(tmp_dir, {
+            'version': CACHE_VERSION,
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha1': _file_sha1(src),
+            'columns': columns,
+        })
+        shutil.rmtree(table_dir, ignore_errors=True)
+        os.replace(tmp_dir, table_dir)
+
+    def _write_manifest(self, table_dir, manifest):
+        path = os.path.join(table_dir, 'manifest.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
@@ -0,0 +1,46 @@
+#Team Name: Anything Works
+
+import queue
+import threading
+
+
+class BackgroundLoad:
+    """Runs a loading job on a worker thread and hands its results over in parts.
+
+    job() returns an iterator of (kind, payload) parts; each part is queued
+    as soon as it is built and poll() gives the queued parts to the calling
+    thread (the game loop), so the objects the game uses are only changed
+    on that thread. Parts are in the order the job built them. An exception
+    in the job is raised again by the next poll(); done is True once poll()
+    has returned the last part.
+    """
+
+    def __init__(self, job, name='world-loader'):
+        self.done = False
+        self._parts = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(job,), name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self, job):
+        try:
+            for part in job():
+                self._parts.put(part)
+        except BaseException as exc:
+            self._parts.put(('error', exc))
+        self._parts.put(('done', None))
+
+    # parts finished since the last call, without waiting (block: until the job ends)
+    def poll(self, block=False):
+        parts = []
+        while not self.done:
+            try:
+                kind, payload = self._parts.get(block=block)
+            except queue.Empty:
+                break
+            if kind == 'error':
+                raise payload
+            if kind == 'done':
+                self.done = True
+            else:
+                parts.append((kind, payload))
+        return parts
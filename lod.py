@@ -0,0 +1,149 @@
+#Team Name: Anything Works
+
+import numpy as np
+import pygame
+
+# block sizes (in cells) of the coarser pyramid levels, each twice the one before
+LOD_FACTORS = (2, 4, 8)
+
+# block code of a level: type number painted over the whole block, or one of these
+EMPTY_BLOCK = -1
+MIXED_BLOCK = -2
+
+
+# (rows, cols) number of objects covering each cell of the inclusive rectangle:
+# +1/-1 at the footprint corners, then a 2-D prefix sum (no per-object loop)
+def coverage(columns, idx, cmin, cmax, rmin, rmax):
+    w, h = cmax - cmin + 1, rmax - rmin + 1
+    c0 = np.clip(columns.col[idx] - cmin, 0, w)
+    c1 = np.clip(columns.col[idx] + columns.w[idx] - cmin, 0, w)
+    r0 = np.clip(columns.row[idx] - rmin, 0, h)
+    r1 = np.clip(columns.row[idx] + columns.h[idx] - rmin, 0, h)
+    corners = np.concatenate([r0 * (w + 1) + c0, r0 * (w + 1) + c1, r1 * (w + 1) + c0, r1 * (w + 1) + c1])
+    signs = np.repeat(np.array([1, -1, -1, 1], dtype=np.float64), len(idx))
+    diff = np.bincount(corners, signs, minlength=(h + 1) * (w + 1)).reshape(h + 1, w + 1)
+    return diff.astype(np.int32).cumsum(0).cumsum(1)[:h, :w]
+
+
+# block codes one level up: a block keeps its children's code only if all four agree
+def merge_codes(codes):
+    a, b, c, d = codes[0::2, 0::2], codes[0::2, 1::2], codes[1::2, 0::2], codes[1::2, 1::2]
+    return np.where((a == b) & (a == c) & (a == d), a, np.int8(MIXED_BLOCK))
+
+
+class DensityPyramid:
+    """Per-type object coverage of one layer at full resolution and in 2x,
+    4x and 8x blocks (a mipmap built with NumPy reductions).
+
+    Each level keeps one code per block: the type painted over the whole
+    block when the block is uniform, EMPTY_BLOCK or MIXED_BLOCK. Types
+    later in `types` are painted over earlier ones, as draw_objects does.
+    blocks() picks the coarsest uniform block for every part of a view, so
+    drawing from it is exact and costs one rectangle per uniform region
+    rather than one per object: a crowded layer costs about as much as an
+    empty one. Finding the blocks still reads every code of the view at
+    each level, so it grows with the view's area: about 1 ms for a 200x200
+    view, ~70 ms for a whole 2000x2000 one even when the layer is empty. refresh() rebuilds only the blocks over a changed
+    rectangle (a collected object's footprint).
+    """
+
+    def __init__(self, layer_objs, cols, rows, types, object_colors, factors=LOD_FACTORS):
+        self.layer_objs = layer_objs
+        self.cols = cols
+        self.rows = rows
+        self.types = list(types)
+        self.colors = np.array([object_colors.get(t, (255, 0, 0)) for t in self.types], dtype=np.uint8)
+        self.color_tuples = [tuple(int(v) for v in color) for color in self.colors]
+        self.factors = (1,) + tuple(factors)
+        top = self.factors[-1]
+        # padded to whole top-level blocks; the padding stays empty
+        self.padded_rows = -(-rows // top) * top
+        self.padded_cols = -(-cols // top) * top
+        self.codes = [np.full((self.padded_rows // f, self.padded_cols // f), EMPTY_BLOCK, dtype=np.int8)
+                      for f in self.factors]
+        self.versions = None
+        self._drawn = None          # (view and versions, blocks, visible objects) of the last draw()
+        self.refresh(0, cols - 1, 0, rows - 1)
+
+    # version of every type's columns the pyramid was built from (see TypeColumns.version)
+    def source_versions(self):
+        return tuple(self.layer_objs[t].version for t in self.types)
+
+    def stale(self):
+        return self.versions != self.source_versions()
+
+    def refresh(self, cmin, cmax, rmin, rmax):
+        """Recompute the blocks over an inclusive cell rectangle from the live objects."""
+        top = self.factors[-1]
+        # whole top-level blocks, so every level can be reduced from the cells below it
+        cmin, rmin = max(0, cmin) // top * top, max(0, rmin) // top * top
+        cmax = min(self.padded_cols, (min(self.cols - 1, cmax) // top + 1) * top) - 1
+        rmax = min(self.padded_rows, (min(self.rows - 1, rmax) // top + 1) * top) - 1
+        if cmin > cmax or rmin > rmax:
+            return
+
+        # the type painted last over each cell, then uniform blocks level by level
+        codes = np.full((rmax - rmin + 1, cmax - cmin + 1), EMPTY_BLOCK, dtype=np.int8)
+        for t, obj_type in enumerate(self.types):
+            columns = self.layer_objs.get(obj_type)
+            idx = columns.visible(cmin, cmax, rmin, rmax) if columns is not None else ()
+            if len(idx):
+                codes[coverage(columns, idx, cmin, cmax, rmin, rmax) > 0] = t
+        self.codes[0][rmin:rmax + 1, cmin:cmax + 1] = codes
+        for level in range(1, len(self.factors)):
+            codes = merge_codes(codes)
+            k = self.factors[level]
+            self.codes[level][rmin // k:(rmax + 1) // k, cmin // k:(cmax + 1) // k] = codes
+        self.versions = self.source_versions()
+        self._drawn = None
+
+    def blocks(self, cmin, cmax, rmin, rmax):
+        """Uniform non-empty blocks covering the inclusive cell rectangle, each at
+        the coarsest level where it is uniform: (col, row, size, type) arrays."""
+        cols, rows, sizes, kinds = [], [], [], []
+        parent = None
+        for level in range(len(self.factors) - 1, -1, -1):
+            k = self.factors[level]
+            b0c, b1c = max(0, cmin) // k, min(self.cols - 1, cmax) // k
+            b0r, b1r = max(0, rmin) // k, min(self.rows - 1, rmax) // k
+            codes = self.codes[level][b0r:b1r + 1, b0c:b1c + 1]
+            # only blocks whose parent was mixed are still open at this level
+            if parent is not None:
+                p = parent[0]
+                ratio = self.factors[level + 1] // k
+                open_ = p[(np.arange(b0r, b1r + 1) // ratio - parent[1])[:, None],
+                          np.arange(b0c, b1c + 1) // ratio - parent[2]] == MIXED_BLOCK
+            else:
+                open_ = np.ones(codes.shape, dtype=bool)
+            r, c = np.nonzero(open_ & (codes >= 0))
+            cols.append((c + b0c) * k)
+            rows.append((r + b0r) * k)
+            sizes.append(np.full(len(r), k, dtype=np.int64))
+            kinds.append(codes[r, c])
+            parent = (np.where(open_, codes, EMPTY_BLOCK), b0r, b0c)
+        return np.concatenate(cols), np.concatenate(rows), np.concatenate(sizes), np.concatenate(kinds)
+
+    # draw the objects of the rectangle onto surf with whichever takes fewer
+    # rectangles: the uniform blocks, or (for a few scattered objects) the
+    # objects themselves; both paint the same pixels. Returns the rectangle count
+    def draw(self, surf, cmin, cmax, rmin, rmax, cell_size, origin=(0, 0)):
+        oc, orow = origin
+        # the same view of unchanged objects is drawn from the same blocks
+        key = (cmin, cmax, rmin, rmax, self.versions)
+        if self._drawn is None or self._drawn[0] != key:
+            visible = [self.layer_objs[t].visible(cmin, cmax, rmin, rmax) for t in self.types]
+            self._drawn = (key, self.blocks(cmin, cmax, rmin, rmax), visible)
+        _, (cols, rows, sizes, kinds), visible = self._drawn
+        if sum(len(i) for i in visible) <= len(cols):
+            for t, idx in enumerate(visible):
+                columns, color = self.layer_objs[self.types[t]], self.color_tuples[t]
+                for col, row, w, h in zip(columns.col[idx].tolist(), columns.row[idx].tolist(),
+                                          columns.w[idx].tolist(), columns.h[idx].tolist()):
+                    pygame.draw.rect(surf, color, ((col - oc) * cell_size, (row - orow) * cell_size,
+                                                   w * cell_size, h * cell_size))
+            return sum(len(i) for i in visible)
+
+        for col, row, size, kind in zip(cols.tolist(), rows.tolist(), sizes.tolist(), kinds.tolist()):
+            pygame.draw.rect(surf, self.color_tuples[kind], ((col - oc) * cell_size, (row - orow) * cell_size,
+                                                            size * cell_size, size * cell_size))
+        return len(cols)
@@ -1,110 +1,25 @@
 #Team Name: Anything Works
 
+import os
+import numpy as np
 import pygame
 from user_hud import HUD, OBJECT_COLORS, OBJECT_LABELS
-from layers import getObjects
-import pandas as pd
-
-# all the objects types we have in dataset
-OBJ_TYPES = ['corals', 'food_web', 'hazards', 'life', 'poi', 'resources']
-
-# function to build objects store
-def build_objects_store(getObjects_func, layers: int, cols: int, src_size: int = 50):
-    scale = max(1, cols // src_size)
-    store = {}      
-
-    # Iterate over each layer to build the store
-    for layer in range(1, layers + 1):
-        raw = getObjects_func(layer)
-        layer_store = {}
-
-        # If no objects in this layer, initialize empty lists for each object type
-        if not raw:
-            for ot in OBJ_TYPES:
-                layer_store[ot] = []
-            store[layer] = layer_store
-            continue
-
-        # Process each object type in this layer
-        for objectType in OBJ_TYPES:
-            df = raw.get(objectType)
-            objects = []
-            if df is None:
-                layer_store[objectType] = objects
-                continue
-
-            # Scale and store each object
-            for _, r in df.iterrows():
-                if 'col' not in r or 'row' not in r:
-                    continue
-                try:
-                    src_col = int(r['col'])
-                    src_row = int(r['row'])
-                except Exception:
-                    continue
-
-                scaled_col = src_col * scale
-                scaled_row = src_row * scale
-                w_src = int(r['width']) if 'width' in r and not pd.isna(r['width']) else 1
-                h_src = int(r['height']) if 'height' in r and not pd.isna(r['height']) else 1
-                scaled_w = max(1, w_src * scale)
-                scaled_h = max(1, h_src * scale)
-
-                obj = {
-                    'type': objectType,
-                    'src_col': src_col,
-                    'src_row': src_row,
-                    'col': int(scaled_col),
-                    'row': int(scaled_row),
-                    'w': int(scaled_w),
-                    'h': int(scaled_h),
-                    'meta': r.to_dict(),
-                }
-                objects.append(obj)
-
-            layer_store[objectType] = objects
-        store[layer] = layer_store
-    return store
-
-# function to collect object at (col,row) in given layer
-def collect_at(objects_store, col, row, layer):
-    layer_objs = objects_store.get(layer)
-    if not layer_objs:
-        return None
-    for obj_type, obj_list in layer_objs.items():
-        i = 0
-        while i < len(obj_list):
-            obj = obj_list[i]
-            oc = int(obj['col'])
-            orow = int(obj['row'])
-            w = int(obj.get('w', 1))
-            h = int(obj.get('h', 1))
-            if oc <= col < oc + w and orow <= row < orow + h:
-                collected = obj_list.pop(i)
-                return collected
-            else:
-                i += 1
-    return None
-
-# function to draw objects in current layer
-def draw_objects(screen, objects_store, layer, cmin, cmax, rmin, rmax, cell_size, object_colors):
-    layer_objs = objects_store.get(layer, {})
-    for obj_type, obj_list in layer_objs.items():
-        color = object_colors.get(obj_type, (255, 0, 0))
-
-        # draw each object as rectangle
-        for obj in obj_list:
-            oc = int(obj['col'])
-            orow = int(obj['row'])
-            w = int(obj.get('w', 1))
-            h = int(obj.get('h', 1))
-            if oc + w - 1 < cmin or oc > cmax or orow + h - 1 < rmin or orow > rmax:
-                continue
-            x_px = oc * cell_size
-            y_px = orow * cell_size
-            w_px = w * cell_size
-            h_px = h * cell_size
-            pygame.draw.rect(screen, color, (x_px, y_px, w_px, h_px))
+from layers import loadLayerIndex
+from load_csv import DATA_DIR as DEFAULT_DATA_DIR, DataLoader
+from object_store import build_layer_objects, build_objects_store
+from render import ChunkRenderer, FramebufferRenderer, LayerSurfaceCache
+from chunks import ChunkIndex, ChunkedWorld
+from selection import Selection
+from movement import MovementSimulator
+from agents import LifeSimulation
+from environment import EnvironmentFields
+from planner import RoutePlanner, blocked_cells
+from hazards import HazardFields
+from regions import RegionTotals
+from foodweb import FoodWeb
+from simulation import LAYERS, EventLog, Simulation, radius_for_layer
+from profiler import FrameProfiler
+from loading import BackgroundLoad
 
 
 # define constants
@@ -114,9 +29,35 @@ ROWS, COLS = 200, 200
 SUB_SIZE = 4
 CELL_SIZE = Window_width // COLS
 
-LAYERS = 6
-TOP_RADIUS = 75
-MIN_RADIUS = 20
+# dataset directory; BT_DATA_DIR points the game at another survey area
+DATA_DIR = os.environ.get('BT_DATA_DIR', DEFAULT_DATA_DIR)
+
+# 'resident': the whole world in memory, drawn as one grid
+# 'chunked': stream chunks of the world around the view (chunks.py)
+# 'auto': chunked when the map is bigger than the screen grid
+WORLD_MODE = os.environ.get('BT_WORLD', 'auto')
+
+# 'surface': blit cached per-layer pygame surfaces
+# 'framebuffer': compose frames from per-layer NumPy color grids (surfarray)
+RENDER_MODE = 'surface'
+
+# quit as soon as the first frame is on screen (startup timing in benchmarks.py)
+EXIT_AFTER_FIRST_FRAME = os.environ.get('BT_EXIT_AFTER_FIRST_FRAME') == '1'
+# ... or as soon as a frame with the whole world loaded is
+EXIT_WHEN_LOADED = os.environ.get('BT_EXIT_WHEN_LOADED') == '1'
+
+# frame profiler: F3 toggles the phase timing overlay; BT_PROFILE=1 starts
+# with it shown and BT_TRACE=<file.json|file.csv> records every frame to that
+# file, written as it goes
+PROFILE_OVERLAY = os.environ.get('BT_PROFILE') == '1'
+TRACE_PATH = os.environ.get('BT_TRACE')
+
+# marine life drifts with the currents (one step every simulation.LIFE_TICK_MS)
+SIMULATE_LIFE = True
+
+# BT_RECORD=<file.npz> writes the session's input events to that file on exit;
+# python simulation.py <file.npz> replays it without a display
+RECORD_PATH = os.environ.get('BT_RECORD')
 
 # Colors
 BLACK      = (0, 0, 0)
@@ -125,171 +66,415 @@ ACTIVE     = (255, 255, 255)
 SELECTED   = (255, 255, 255)
 GRID_LINE  = (70, 70, 70)
 
-pygame.init()
-screen = pygame.display.set_mode((Window_width, Window_height))
-clock = pygame.time.Clock()
+# screen regions redrawn as a whole
+GRID_RECT = pygame.Rect(0, 0, GRID_WIDTH, GRID_HEIGHT)
+HUD_RECT = pygame.Rect(0, GRID_HEIGHT, Window_width, Window_height - GRID_HEIGHT)
 
-# logical grid (0 = off, 1 = active)
-grid = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+# origin: world cell at the top-left of the screen (the renderer's camera)
+def pixel_to_cell(mx, my, origin=(0, 0)):
+    return origin[0] + mx // CELL_SIZE, origin[1] + my // CELL_SIZE
 
-hud = HUD(grid_height=GRID_HEIGHT, window_width=Window_width)
+# screen rectangle covered by a block of cells
+def cell_rect(col, row, w=1, h=1, origin=(0, 0)):
+    return pygame.Rect((col - origin[0]) * CELL_SIZE, (row - origin[1]) * CELL_SIZE, w * CELL_SIZE, h * CELL_SIZE)
 
-# Initial values
-current_layer = 1
-hud.hull_health = 100
-hud.fuel = 100
-hud.depth_m = current_layer * 100   # NEW: depth based on layer (1 -> 100m)
+# visible cell bounds (cmin, cmax, rmin, rmax); the whole grid without a center
+def viewport_bounds(center, radius, cols=COLS, rows=ROWS):
+    if center is None:
+        return 0, cols - 1, 0, rows - 1
+    vc_col, vc_row = center
+    return (max(0, vc_col - radius), min(cols - 1, vc_col + radius),
+            max(0, vc_row - radius), min(rows - 1, vc_row + radius))
+
+# load the dataset once, partition it by layer and build objects store
+# (scale source 50x50 coords into our grid)
+def load_world(seed=None, loader=None):
+    loader = loader if loader is not None else DataLoader(DATA_DIR)
+    if seed is None:
+        seed = loader.load_metadata().get('seed')
+    dataset, layer_index = loadLayerIndex(layers=LAYERS, seed=seed, loader=loader)
+    objects_store = build_objects_store(layer_index, layers=LAYERS, cols=COLS, src_size=50, rows=ROWS)
+    return dataset, objects_store, seed
+
+# should the map be streamed in chunks instead of held in memory?
+def use_chunked_world(loader, mode=WORLD_MODE):
+    if mode != 'auto':
+        return mode == 'chunked'
+    grid = loader.load_metadata().get('grid', {})
+    scale = COLS // 50
+    return grid.get('cols', 50) * scale > COLS or grid.get('rows', 50) * scale > ROWS
+
+# the map as chunks loaded around the view, at the same scale as the resident grid
+def load_chunked_world(seed=None, loader=None):
+    loader = loader if loader is not None else DataLoader(DATA_DIR)
+    return ChunkedWorld(ChunkIndex(loader, seed=seed), layers=LAYERS, scale=COLS // 50)
+
+def make_chunk_renderer(world, profiler=None):
+    return ChunkRenderer(world, COLS, ROWS, CELL_SIZE, SUB_SIZE,
+                         BASE_COLOR, GRID_LINE, OBJECT_COLORS, BLACK, profiler=profiler)
+
+# planner over the current field with hazards as obstacles (planner layer = layer - 1)
+def make_planner(objects_store, movement, cols=COLS, rows=ROWS):
+    u, v = movement.currents_at(np.arange(cols)[None, :], np.arange(rows)[:, None])
+    return RoutePlanner(u, v, layers=LAYERS, blocked=blocked_cells(objects_store, LAYERS, cols, rows))
+
+# seed and world mode of a session (noted in the log's meta for replays)
+def session_settings(loader, seed=None, world_mode=None, simulate_life=SIMULATE_LIFE, log=None):
+    if seed is None:
+        seed = loader.load_metadata().get('seed')
+    chunked = use_chunked_world(loader, world_mode or WORLD_MODE)
+    if log is not None:
+        log.meta.update(data_dir=loader.base_dir, seed=seed, simulate_life=simulate_life,
+                        world_mode='chunked' if chunked else 'resident')
+    return seed, chunked
+
+# the loading pipeline as (kind, payload) parts, in the order the game can use them:
+#   ('progress', (done, total, label)) before each step,
+#   ('world', ChunkedWorld) for a chunked world, otherwise
+#   ('dataset', data), then ('layer', (layer, LayerObjects)) for every layer,
+#   the one nearest wanted() first, and ('rules', {...}) once all layers are built
+def session_parts(loader, seed, chunked, wanted=lambda: 1):
+    if chunked:
+        yield 'progress', (0, 1, 'Indexing map chunks')
+        yield 'world', load_chunked_world(seed=seed, loader=loader)
+        return
+
+    total = LAYERS + 2
+    yield 'progress', (0, total, 'Reading survey data')
+    dataset, layer_index = loadLayerIndex(layers=LAYERS, seed=seed, loader=loader)
+    yield 'dataset', dataset
+
+    store = {}
+    while len(store) < LAYERS:
+        # the layer on screen first, then outwards from it
+        current = wanted()
+        layer = min((l for l in range(1, LAYERS + 1) if l not in store), key=lambda l: (abs(l - current), l))
+        yield 'progress', (len(store) + 1, total, f'Building layer {layer}')
+        store[layer] = build_layer_objects(layer_index.get(layer), COLS, src_size=50, rows=ROWS)
+        yield 'layer', (layer, store[layer])
+
+    yield 'progress', (total - 1, total, 'Charting currents and hazards')
+    movement = MovementSimulator(dataset, sub_size=SUB_SIZE)
+    # moves burn fuel along the cheapest route through the currents;
+    # hazard distance/exposure per cell: damage checks are one array read;
+    # resource and POI totals of any rectangle from summed-area tables
+    yield 'rules', {'movement': movement, 'planner': make_planner(store, movement),
+                    'hazards': HazardFields(store, COLS, ROWS), 'regions': RegionTotals(store, COLS, ROWS)}
+
+# put a loaded part into the simulation; the store only changes here, on the
+# thread that plays the session
+def attach_part(sim, kind, payload, seed, simulate_life=SIMULATE_LIFE):
+    if kind == 'world':
+        # big maps: only the chunks around the view are in memory; marine
+        # life stays where the survey put it and hazards do no damage (both
+        # need the whole store)
+        sim.set_world(payload, payload.cols, payload.rows)
+    elif kind == 'layer':
+        layer, layer_objs = payload
+        sim.world[layer] = layer_objs
+    elif kind == 'rules':
+        sim.planner = payload['planner']
+        sim.hazards = payload['hazards']
+        # marine life moves as one vectorized batch and keeps the store in sync
+        if simulate_life:
+            sim.life_sim = LifeSimulation(sim.world, payload['movement'], COLS, ROWS, seed=seed)
+
+# the world and the simulation core that plays it (no display needed), loaded
+# in one go; returns (simulation, dataset) where the dataset is None for a chunked world
+def load_session(loader, seed=None, world_mode=None, simulate_life=SIMULATE_LIFE, log=None):
+    seed, chunked = session_settings(loader, seed, world_mode, simulate_life, log)
+    sim, dataset = Simulation({}, COLS, ROWS, log=log), None
+    for kind, payload in session_parts(loader, seed, chunked):
+        attach_part(sim, kind, payload, seed, simulate_life)
+        if kind == 'dataset':
+            dataset = payload
+    return sim, dataset
+
+def make_renderer(objects_store, mode=RENDER_MODE, cols=COLS, rows=ROWS, cell_size=CELL_SIZE, profiler=None):
+    # each layer is rendered once and cached; frames only draw the viewport
+    Renderer = FramebufferRenderer if mode == 'framebuffer' else LayerSurfaceCache
+    return Renderer(objects_store, cols, rows, cell_size, SUB_SIZE,
+                    BASE_COLOR, GRID_LINE, OBJECT_COLORS, BLACK, profiler=profiler)
+
+# draw one frame (grid viewport, active cells, selection, HUD) onto screen;
+# the grid size comes from the renderer so scaled worlds can be drawn too
+def draw_frame(screen, renderer, hud, current_layer, viewport_center, active_cells, selected):
+    cs = renderer.cell_size
+    oc, orow = renderer.origin
+    layer_radius = radius_for_layer(current_layer)      # update radius for current layer
+    cmin, cmax, rmin, rmax = viewport_bounds(viewport_center, layer_radius, renderer.cols, renderer.rows)
 
-# viewport and selection state
-viewport_center = None          # (col,row) or None
-selected = None                 # (col,row) user-selected pixel (must be inside viewport)
-prev_selected = None
-# build objects store once (scale source 50x50 coords into our grid)
-objects_store = build_objects_store(getObjects, layers=LAYERS, cols=COLS, src_size=50)
-objects_in_layer = objects_store.get(current_layer, {})
+    # visible part of the pre-rendered layer (base fill, objects, grid lines)
+    # with the area outside the viewport blacked out
+    renderer.draw_viewport(screen, current_layer, cmin, cmax, rmin, rmax)
 
-# HUD maintains collected_counts and fonts; no local collected_counts required
+    with renderer.profiler.phase('markers'):
+        # draw active cell(s) on top
+        for c, r in active_cells.within(cmin, cmax, rmin, rmax):
+            pygame.draw.rect(screen, ACTIVE, ((c - oc) * cs, (r - orow) * cs, cs, cs))
 
-# function to compute radius for a given layer
-def radius_for_layer(layer):
-    if LAYERS <= 1:
-        return MIN_RADIUS
-    t = (layer - 1) / (LAYERS - 1)
-    return int(round(TOP_RADIUS * (1 - t) + MIN_RADIUS * t))
+        # draw selection marker (if any) inside viewport
+        if selected is not None:
+            sc, sr = selected
+            if cmin <= sc <= cmax and rmin <= sr <= rmax:
+                pygame.draw.rect(screen, SELECTED, ((sc - oc) * cs, (sr - orow) * cs, cs, cs), 2)
 
-def pixel_to_cell(mx, my):
-    return mx // CELL_SIZE, my // CELL_SIZE
+    # draw HUD
+    with renderer.profiler.phase('hud'):
+        hud.draw(screen)
+    return layer_radius
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((Window_width, Window_height))
+    clock = pygame.time.Clock()
+
+    hud = HUD(grid_height=GRID_HEIGHT, window_width=Window_width)
+
+    profiler = FrameProfiler(trace=TRACE_PATH)
+    if PROFILE_OVERLAY:
+        profiler.toggle_overlay()
+
+    # the game rules run in the simulation core; this loop turns pygame
+    # events into its input and draws what changed
+    loader = DataLoader(DATA_DIR)
+    log = EventLog() if RECORD_PATH else None
+    seed, chunked = session_settings(loader, log=log)
+
+    # the world loads on a worker thread while the window is already up: the
+    # layer on screen is built first and every finished part is attached in
+    # the loop below; until all of it is in, layers can be browsed but the
+    # game (clicks, game clock) waits
+    sim = Simulation({}, COLS, ROWS, log=log)
+    load = BackgroundLoad(lambda: session_parts(loader, seed, chunked, wanted=lambda: sim.layer))
+    progress = (0, 1, 'Loading')
+
+    world = None
+    objects_store = sim.world
+    renderer = None if chunked else make_renderer(objects_store, profiler=profiler)
+    environment_at = None
+    food_web = None
+    regions = None
+
+    hud.hull_health = sim.hull_health
+    hud.fuel = sim.fuel
+    hud.depth_m = sim.depth_m
+
+    # active (cursor) cells; only the cells that change are touched
+    active_cells = Selection(COLS, ROWS)
+
+    # screen regions that changed since the last frame; idle frames push nothing
+    dirty = [screen.get_rect()]
+
+    # cursor position whose environment readings the HUD shows
+    cursor = None
+    shown_cursor = None
+
+    # game time starts once the world is loaded
+    start_ticks = None
+
+    # Main loop
+    running = True
+    while running:
+        profiler.begin_frame()
+
+        # hand the parts the loader finished since the last frame to the game
+        if load is not None:
+            with profiler.phase('loading'):
+                for kind, payload in load.poll():
+                    attach_part(sim, kind, payload, seed)
+                    if kind == 'progress':
+                        progress = payload
+                    elif kind == 'world':
+                        world = sim.world
+                        renderer = make_chunk_renderer(world, profiler=profiler)
+                        environment_at = world.environment_at
+                        active_cells = Selection(renderer.cols, renderer.rows)
+                    elif kind == 'dataset':
+                        # environment readings, upsampled to the grid on first use
+                        environment_at = EnvironmentFields(payload['cells'], sub_size=SUB_SIZE).at
+                        # predator/prey graph, joined with the marine life on the map
+                        food_web = FoodWeb.from_data(payload, loader.load_metadata())
+                        food_web.join(objects_store)
+                    elif kind == 'layer':
+                        renderer.invalidate(payload[0])
+                    elif kind == 'rules':
+                        # marine life is now drawn per frame instead of baked into the layers
+                        renderer.invalidate()
+                        regions = payload['regions']
+                    dirty.append(GRID_RECT)
+            if load.done:
+                load = None
+                start_ticks = pygame.time.get_ticks()
+                dirty += [GRID_RECT, HUD_RECT]
+
+        # advance marine life on the game clock; redraw only if this layer has any
+        if load is None:
+            with profiler.phase('simulation'):
+                life_steps = sim.advance(pygame.time.get_ticks() - start_ticks)
+            if life_steps and world is None and len(objects_store[sim.layer].get('life', ())):
+                dirty.append(GRID_RECT)
+
+        with profiler.phase('events'):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+
+                if event.type == pygame.MOUSEMOTION:
+                    cursor = event.pos
+
+                # window was uncovered/restored: everything has to be pushed again
+                if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    dirty.append(screen.get_rect())
+        
+                # F3 shows/hides the frame profiler overlay
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    old_rect = profiler.toggle_overlay()
+                    if old_rect is not None:
+                        dirty.append(old_rect)
+
+                #DOWN to go deeper, UP to go up
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_DOWN:
+                        if sim.descend():
+                            if world is not None and sim.viewport_center is not None:
+                                renderer.center_on(sim.viewport_center)
+                            dirty += [GRID_RECT, HUD_RECT]
+
+                    elif event.key == pygame.K_UP:
+                        # going up keeps the same viewport center but increases the radius
+                        if sim.ascend():
+                            dirty += [GRID_RECT, HUD_RECT]
+
+                # if user clicks mouse
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    mx, my = event.pos
+                    if load is not None or not GRID_RECT.collidepoint(mx, my):
+                        continue
+                    origin = renderer.origin
+                    col, row = pixel_to_cell(mx, my, origin)
+                    if not (0 <= col < renderer.cols and 0 <= row < renderer.rows):
+                        continue
+
+                    old_center, old_selected = sim.viewport_center, sim.selected
+                    with profiler.phase('rules'):
+                        collected = sim.click(col, row)
+
+                    if old_center is None:
+                        if world is not None:
+                            renderer.center_on(sim.viewport_center)
+                        # set active cell (cursor-like), clear others
+                        active_cells.select(col, row)
+                        # the viewport mask appears around the new center
+                        dirty.append(GRID_RECT)
+                    elif sim.selected == (col, row):
+                        if old_selected is not None:
+                            dirty.append(cell_rect(*old_selected, origin=origin))
+                        dirty.append(cell_rect(col, row, origin=origin))
+                        # optionally set active cell
+                        dirty += [cell_rect(c, r, origin=origin) for c, r in active_cells.select(col, row)]
+
+                        # going deeper centers the view here: start loading that area
+                        if world is not None:
+                            renderer.prefetch(sim.selected)
 
-# function to check if (col,row) is inside viewport
-def in_viewport(col, row, center, radius):
-    """Square viewport check: Chebyshev distance <= radius."""
-    if center is None:
-        return True
-    ccol, crow = center
-    return abs(col - ccol) <= radius and abs(row - crow) <= radius
-
-# Main loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-    
-        #DOWN to go deeper, UP to go up
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_DOWN and current_layer < LAYERS:
-                if selected is not None:
-                    viewport_center = selected
-                current_layer += 1
-                hud.depth_m = current_layer * 100  
-                
-                # switch to objects stored for new layer
-                objects_in_layer = objects_store.get(current_layer, {})
-
-            elif event.key == pygame.K_UP and current_layer > 1:
-                # going up and keep the same viewport center but increase radius
-                current_layer -= 1
-                hud.depth_m = current_layer * 100
-                objects_in_layer = objects_store.get(current_layer, {})
-
-        # if user clicks mouse
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            mx, my = event.pos
-            col, row = pixel_to_cell(mx, my)
-            if not (0 <= col < COLS and 0 <= row < ROWS):
-                continue
-
-            layer_radius = radius_for_layer(current_layer)      # update radius for current layer
-            
-
-            if viewport_center is None:
-                viewport_center = (col, row)
-                selected = (col, row)
-                # set active cell (cursor-like), clear others
-                for r in range(ROWS):
-                    for c in range(COLS):
-                        grid[r][c] = 0
-                grid[row][col] = 1
-                objects_in_layer = objects_store.get(current_layer, {})
-            else:
-                # only allow clicks inside the currently visible bounds (non-black)
-                if in_viewport(col, row, viewport_center, layer_radius):
-                    selected = (col, row)   # store selection, but do NOT change viewport bounds now
-                    # optionally set active cell
-                    for r in range(ROWS):
-                        for c in range(COLS):
-                            grid[r][c] = 0
-                    grid[row][col] = 1
-
-                    # try to collect any object at this selected cell in current layer
-                    collected = collect_at(objects_store, col, row, current_layer)
                     if collected:
                         print("Collected:", collected['type'])
+                        if collected['type'] == 'life' and food_web is not None:
+                            species = collected['meta'].get('species')
+                            bounds = viewport_bounds(sim.viewport_center, radius_for_layer(sim.layer))
+                            hunters = food_web.predators_in_view(species, sim.layer, *bounds)
+                            hud.set_predators(species, len(hunters))
                         # update HUD counts
                         hud.increment_collected(collected['type'])
-                
-                # update fuel based on movement distance
-                if prev_selected is not None:
-                    dx = selected[0] - prev_selected[0]
-                    dy = selected[1] - prev_selected[1]
-                    dist = (dx*dx + dy*dy) ** 0.5     # sqrt(a^2 + b^2)
-                    hud.fuel = max(0, hud.fuel - 0.1 * dist)
-
-                prev_selected = selected
-
-    screen.fill(BLACK)
-    layer_radius = radius_for_layer(current_layer)      # update radius for current layer
+                        # repaint the collected footprint in the cached layer
+                        renderer.patch(sim.layer,
+                                       collected['col'], collected['col'] + collected['w'] - 1,
+                                       collected['row'], collected['row'] + collected['h'] - 1)
+                        dirty += [cell_rect(collected['col'], collected['row'], collected['w'], collected['h'], origin),
+                                  HUD_RECT]
+
+        # HUD values follow the simulation
+        if (hud.fuel, hud.hull_health, hud.depth_m) != (sim.fuel, sim.hull_health, sim.depth_m):
+            hud.fuel, hud.hull_health, hud.depth_m = sim.fuel, sim.hull_health, sim.depth_m
+            dirty.append(HUD_RECT)
+        # nearest hazard to the sub, one lookup in the hazard fields
+        if sim.hazards is not None and sim.selected is not None:
+            if hud.set_hazard(sim.hazards.nearest(sim.layer, *sim.selected)):
+                dirty.append(HUD_RECT)
+
+        # readings under the cursor, looked up once per frame when the cell under it changes
+        cursor_cell = None
+        if cursor is not None and environment_at is not None and GRID_RECT.collidepoint(cursor):
+            cursor_cell = pixel_to_cell(*cursor, renderer.origin)
+        if cursor_cell != shown_cursor:
+            shown_cursor = cursor_cell
+            readings = environment_at(*cursor_cell) if cursor_cell is not None else None
+            if hud.set_readings(readings):
+                dirty.append(HUD_RECT)
+
+        # stream a few queued chunks of a big map, also on idle frames
+        if world is not None:
+            with profiler.phase('stream'):
+                world.pump()
+
+        # new overlay numbers: the panel and what is under it are redrawn
+        overlay_rect = profiler.refresh_overlay(pygame.time.get_ticks())
+        if overlay_rect is not None:
+            dirty.append(overlay_rect)
+
+        # nothing changed: skip rendering and leave the display alone
+        if not dirty:
+            profiler.end_frame()
+            clock.tick(60)
+            continue
 
-    if viewport_center is None:
-        cmin, cmax = 0, COLS - 1
-        rmin, rmax = 0, ROWS - 1
-    else:
-        vc_col, vc_row = viewport_center
-        cmin = max(0, vc_col - layer_radius)
-        cmax = min(COLS - 1, vc_col + layer_radius)
-        rmin = max(0, vc_row - layer_radius)
-        rmax = min(ROWS - 1, vc_row + layer_radius)
-
-    # fill visible area with BASE_COLOR
-    for r in range(rmin, rmax + 1):
-        for c in range(cmin, cmax + 1):
-            pygame.draw.rect(screen, BASE_COLOR, (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-        # draw objects for current layer from the in-memory store
-        try:
-            draw_objects(screen, objects_store, current_layer, cmin, cmax, rmin, rmax, CELL_SIZE, OBJECT_COLORS)
-        except Exception:
-            pass
-
-    # draw active cell(s) on top
-    for r in range(rmin, rmax + 1):
-        for c in range(cmin, cmax + 1):
-            if grid[r][c] == 1:
-                pygame.draw.rect(screen, ACTIVE, (c * CELL_SIZE, r * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-    # draw selection marker (if any) inside viewport
-    if selected is not None:
-        sc, sr = selected
-        if cmin <= sc <= cmax and rmin <= sr <= rmax:
-            pygame.draw.rect(screen, SELECTED, (sc * CELL_SIZE, sr * CELL_SIZE, CELL_SIZE, CELL_SIZE), 2)
-
-    # grid lines limited to viewport area
-    for c in range(cmin, cmax + 1, SUB_SIZE):
-        x = c * CELL_SIZE
-        pygame.draw.line(screen, GRID_LINE, (x, rmin * CELL_SIZE), (x, (rmax + 1) * CELL_SIZE), 1)
-    for r in range(rmin, rmax + 1, SUB_SIZE):
-        y = r * CELL_SIZE
-        pygame.draw.line(screen, GRID_LINE, (cmin * CELL_SIZE, y), ((cmax + 1) * CELL_SIZE, y), 1)
+        # only the union of the dirty regions is redrawn
+        screen.set_clip(dirty[0].unionall(dirty[1:]))
+        if renderer is not None:
+            layer_radius = draw_frame(screen, renderer, hud, sim.layer, sim.viewport_center, active_cells, sim.selected)
+        else:
+            # nothing of a chunked world to show yet
+            layer_radius = radius_for_layer(sim.layer)
+            screen.fill(BLACK, GRID_RECT)
+            hud.draw(screen)
+        if load is not None:
+            done, total, label = progress
+            hud.draw_progress(screen, GRID_RECT, label, done / total)
+        profiler.draw_overlay(screen)
+        screen.set_clip(None)
+
+        if load is not None:
+            pygame.display.set_caption(f"Layer {sim.layer}/{LAYERS}  loading: {progress[2]}")
+        elif regions is not None:
+            # what is left to collect in view, four table reads per type
+            bounds = viewport_bounds(sim.viewport_center, layer_radius)
+            resources = regions.totals(sim.layer, 'resources', *bounds)
+            pois = regions.count(sim.layer, 'poi', *bounds)
+            pygame.display.set_caption(f"Layer {sim.layer}/{LAYERS}  radius={layer_radius}  in view: "
+                                       f"{resources['count']:.0f} resources (${resources['economic_value']:,.0f}), "
+                                       f"{pois} POIs")
+        else:
+            pygame.display.set_caption(f"Layer {sim.layer}/{LAYERS}  radius={layer_radius}")
+        with profiler.phase('display'):
+            pygame.display.update(dirty)
+        dirty.clear()
+        profiler.end_frame()
+        clock.tick(60)
+
+        if EXIT_AFTER_FIRST_FRAME or (EXIT_WHEN_LOADED and load is None):
+            running = False
 
-    # draw HUD
-    hud.draw(screen)
+        if sim.over:
+            running = False
 
-    pygame.display.set_caption(f"Layer {current_layer}/{LAYERS}  radius={layer_radius}")
-    pygame.display.flip()
-    clock.tick(60)
+    pygame.quit()
+    sim.finish()
+    if log is not None:
+        log.meta['final'] = sim.summary()
+        log.save(RECORD_PATH)
+    profiler.close()
 
-    if hud.fuel <= 0:
-        pygame.quit()
-        running = False
 
-pygame.quit()
+if __name__ == '__main__':
+    main()
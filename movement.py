@@ -1,9 +1,6 @@
 #Team Name: Anything Works
 
-import streamlit as st
-import pandas as pd
 import numpy as np
-import random
 from load_csv import DataLoader
 import math
 
@@ -18,43 +15,98 @@ directions = {
     'NW': (-1, 1)
 }
 
+# directions as an (8, 2) array so a batch can pick them by index
+DIRECTION_VECTORS = np.array(list(directions.values()), dtype=np.float64)
+
+# round up only when the fractional part is above the threshold
+def round_by_threshold(value, threshold=0.5):
+    floor = np.floor(value)
+    return np.where(value - floor > threshold, np.ceil(value), floor)
+
+
 class MovementSimulator:
-    def __init__(self, data):
+    def __init__(self, data, sub_size=4, seed=None):
         self.data = data
+        self.sub_size = sub_size
+        self.rng = np.random.default_rng(seed)
+
+        # currents as dense [row, col] arrays, built once
+        currents = data['currents']
+        rows = currents['row'].to_numpy(dtype=np.int64)
+        cols = currents['col'].to_numpy(dtype=np.int64)
+        shape = (int(rows.max()) + 1, int(cols.max()) + 1) if len(currents) else (0, 0)
+
+        # assign in reverse so the first row of a duplicated cell wins, as a filter + iloc[0] would
+        order = np.arange(len(currents))[::-1]
+        self.index = np.full(shape, -1, dtype=np.int64)
+        self.index[rows[order], cols[order]] = order
+        self.u = self._field(currents, 'u_mps', shape, rows[order], cols[order], order)
+        self.v = self._field(currents, 'v_mps', shape, rows[order], cols[order], order)
+        self.speed = self._field(currents, 'speed_mps', shape, rows[order], cols[order], order)
+        self.has_current = self.index >= 0
+
+    @staticmethod
+    def _field(currents, name, shape, rows, cols, order):
+        field = np.zeros(shape, dtype=np.float64)
+        field[rows, cols] = currents[name].to_numpy(dtype=np.float64)[order]
+        return field
+
+    # source cell (col,row) under each sub-cell position and whether it has a current
+    def _cells(self, xs, ys):
+        cols = np.floor(np.asarray(xs, dtype=np.float64) / self.sub_size).astype(np.int64)
+        rows = np.floor(np.asarray(ys, dtype=np.float64) / self.sub_size).astype(np.int64)
+        n_rows, n_cols = self.has_current.shape
+        inside = (cols >= 0) & (cols < n_cols) & (rows >= 0) & (rows < n_rows)
+        cols = np.where(inside, cols, 0)
+        rows = np.where(inside, rows, 0)
+        return cols, rows, inside & self.has_current[rows, cols]
+
+    # current (u, v) under each sub-cell position; zero where there is none
+    def currents_at(self, xs, ys):
+        cols, rows, has = self._cells(xs, ys)
+        return np.where(has, self.u[rows, cols], 0.0), np.where(has, self.v[rows, cols], 0.0)
 
     def get_current_at_position(self, x, y):
         """Retrieve current data at a specific (x, y) position."""
-        currents = self.data['currents']
-        col = math.floor(x / 4)
-        row = math.floor(y / 4)
-        print(col, row)
-        current_info = currents[(currents['col'] == col) & (currents['row'] == row)]
-        if not current_info.empty:
-            return current_info.iloc[0].to_dict()
-        return None
-    
+        col = math.floor(x / self.sub_size)
+        row = math.floor(y / self.sub_size)
+        if not (0 <= row < self.index.shape[0] and 0 <= col < self.index.shape[1]):
+            return None
+        i = self.index[row, col]
+        if i < 0:
+            return None
+        return self.data['currents'].iloc[int(i)].to_dict()
+
     def next_position(self, x, y):
         """Calculate the next position based on current data."""
-        current = self.get_current_at_position(x, y)
-        dir = random.choice(list(directions.values()))
-        print(dir);
-        if current:
-            def round_by_threshold(value, threshold=0.5):
-                frac = value - math.floor(value)
-                if frac > threshold:
-                    return math.ceil(value)
-                return math.floor(value)
-
-            print(x + dir[0] * current['u_mps'], y + dir[1] * current['v_mps'] )
-            new_x = round_by_threshold(x + dir[0] * current['u_mps'])
-            new_y = round_by_threshold(y + dir[1] * current['v_mps'])
-            return new_x, new_y
-        return x, y
-
-
-loader = DataLoader()
-data = loader.load_CSV_files()
-
-simulator = MovementSimulator(data)
-print(simulator.get_current_at_position(5, 10))
-print(simulator.next_position(5, 10))
\ No newline at end of file
+        new_x, new_y = self.next_positions(np.array([x]), np.array([y]))
+        return new_x[0].item(), new_y[0].item()
+
+    def next_positions(self, xs, ys):
+        """Advance N positions one step at once.
+
+        Each position drifts along its own random direction, scaled by the
+        current's u/v at its cell; positions without a current stay put.
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        cols, rows, moving = self._cells(xs, ys)
+        dirs = DIRECTION_VECTORS[self.rng.integers(0, len(DIRECTION_VECTORS), size=xs.shape)]
+
+        new_x = round_by_threshold(xs + dirs[..., 0] * self.u[rows, cols])
+        new_y = round_by_threshold(ys + dirs[..., 1] * self.v[rows, cols])
+        new_x = np.where(moving, new_x, xs)
+        new_y = np.where(moving, new_y, ys)
+        if np.issubdtype(xs.dtype, np.integer):
+            new_x = new_x.astype(xs.dtype)
+            new_y = new_y.astype(ys.dtype)
+        return new_x, new_y
+
+
+if __name__ == '__main__':
+    loader = DataLoader()
+    data = loader.load_CSV_files()
+
+    simulator = MovementSimulator(data, seed=loader.load_metadata().get('seed'))
+    print(simulator.get_current_at_position(5, 10))
+    print(simulator.next_position(5, 10))
@@ -0,0 +1,190 @@
+#Team Name: Anything Works
+
+import numpy as np
+import pandas as pd
+import pygame
+from layers import OBJ_TYPES
+from occupancy import EMPTY, build_occupancy
+
+# Struct-of-arrays for all objects of one type in one layer. Positions and
+# sizes are NumPy int arrays in grid cells; metadata stays in the source frame
+# and is only looked up (by position) when an object is actually collected.
+class TypeColumns:
+    __slots__ = ('type', 'frame', 'index', 'src_col', 'src_row', 'col', 'row', 'w', 'h', 'alive', 'version')
+
+    def __init__(self, obj_type, frame, index, src_col, src_row, scale, w_src, h_src):
+        self.type = obj_type
+        self.frame = frame
+        self.index = index                      # positions into frame
+        self.src_col = src_col
+        self.src_row = src_row
+        self.col = src_col * scale
+        self.row = src_row * scale
+        self.w = np.maximum(1, w_src * scale)
+        self.h = np.maximum(1, h_src * scale)
+        self.alive = np.ones(len(index), dtype=bool)
+        self.version = 0                        # bumped whenever positions or alive change
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    # objects whose footprint intersects the inclusive cell rectangle
+    def visible(self, cmin, cmax, rmin, rmax):
+        return np.flatnonzero(
+            self.alive
+            & (self.col + self.w - 1 >= cmin) & (self.col <= cmax)
+            & (self.row + self.h - 1 >= rmin) & (self.row <= rmax)
+        )
+
+    # materialize object i as the dict the game used to store per object
+    def get(self, i):
+        return {
+            'type': self.type,
+            'src_col': int(self.src_col[i]),
+            'src_row': int(self.src_row[i]),
+            'col': int(self.col[i]),
+            'row': int(self.row[i]),
+            'w': int(self.w[i]),
+            'h': int(self.h[i]),
+            'meta': self.frame.iloc[int(self.index[i])].to_dict(),
+        }
+
+    def remove(self, i):
+        self.alive[i] = False
+        self.version += 1
+
+
+def size_column(df, name, n):
+    if name not in df:
+        return np.ones(n, dtype=np.int32)
+    values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+    return np.where(np.isnan(values), 1, values).astype(np.int32)
+
+
+# scale one object table into grid-cell columns in a single vectorized step
+def build_type_columns(obj_type, df, scale):
+    if df is None or 'col' not in df or 'row' not in df:
+        empty = np.zeros(0, dtype=np.int32)
+        return TypeColumns(obj_type, df, empty, empty, empty, scale, empty, empty)
+
+    src_col = pd.to_numeric(df['col'], errors='coerce').to_numpy(dtype=float)
+    src_row = pd.to_numeric(df['row'], errors='coerce').to_numpy(dtype=float)
+    valid = ~(np.isnan(src_col) | np.isnan(src_row))
+    index = np.flatnonzero(valid).astype(np.int32)
+
+    n = len(df)
+    w_src = size_column(df, 'width', n)[index]
+    h_src = size_column(df, 'height', n)[index]
+    return TypeColumns(
+        obj_type, df, index,
+        src_col[index].astype(np.int32), src_row[index].astype(np.int32),
+        scale, w_src, h_src,
+    )
+
+
+# All object types of one layer (obj_type -> TypeColumns) plus an occupancy
+# index over every object footprint. Objects get a layer-wide id in OBJ_TYPES
+# order, which is also the priority used when footprints overlap.
+# Types whose objects move (see agents.py) are left out of the occupancy
+# index and hit-tested through the index registered with set_dynamic().
+class LayerObjects(dict):
+    def __init__(self, columns, cols, rows, origin=(0, 0)):
+        super().__init__(columns)
+        sizes = [len(c.index) for c in columns.values()]
+        self.cols = cols
+        self.rows = rows
+        self.origin = origin        # grid cell of the occupancy's top-left (a chunk's corner)
+        self.types = list(columns)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.dynamic = {}           # obj_type -> index with object_at(col, row) -> i or EMPTY
+        self._build_occupancy()
+
+    def _build_occupancy(self):
+        parts = list(self.values())
+        alive = np.concatenate([c.alive for c in parts])
+        # dynamic and already collected objects get an empty footprint
+        indexed = np.concatenate([c.alive & (c.type not in self.dynamic) for c in parts])
+        col0, row0 = self.origin
+        self.occupancy = build_occupancy(
+            self.cols, self.rows, int(self.offsets[-1]),
+            np.concatenate([c.col for c in parts]) - col0, np.concatenate([c.row for c in parts]) - row0,
+            np.where(indexed, np.concatenate([c.w for c in parts]), 0),
+            np.where(indexed, np.concatenate([c.h for c in parts]), 0),
+        )
+        self.occupancy.alive[:] = alive
+
+    # hand hit-testing of a moving object type over to another index
+    def set_dynamic(self, obj_type, index):
+        self.dynamic[obj_type] = index
+        self._build_occupancy()
+
+    def static_types(self):
+        return [t for t in self.types if t not in self.dynamic]
+
+    # layer-wide object id -> (TypeColumns, index within it)
+    def resolve(self, obj_id):
+        t = int(np.searchsorted(self.offsets, obj_id, side='right')) - 1
+        return self[self.types[t]], obj_id - int(self.offsets[t])
+
+    def object_at(self, col, row):
+        best = self.occupancy.object_at(col - self.origin[0], row - self.origin[1])
+        for obj_type, index in self.dynamic.items():
+            i = index.object_at(col, row)
+            if i != EMPTY:
+                obj_id = int(self.offsets[self.types.index(obj_type)]) + i
+                if best == EMPTY or obj_id < best:
+                    best = obj_id
+        return best
+
+    def remove(self, obj_id):
+        columns, i = self.resolve(obj_id)
+        columns.remove(i)
+        self.occupancy.remove(obj_id, columns.col[i] - self.origin[0], columns.row[i] - self.origin[1],
+                              columns.w[i], columns.h[i])
+        return columns, i
+
+
+# function to build objects store from a {layer: {obj_type: DataFrame}} index;
+# origin is the grid cell at the store's top-left when it covers only part of
+# the world (a chunk), object positions stay in world cells
+def build_objects_store(layer_index, layers: int, cols: int, src_size: int = 50, rows: int = None, origin=(0, 0)):
+    return {layer: build_layer_objects(layer_index.get(layer), cols, src_size, rows, origin)
+            for layer in range(1, layers + 1)}
+
+# function to build one layer's LayerObjects from its {obj_type: DataFrame}
+# partition (None: an empty layer); layers can be built one at a time
+def build_layer_objects(raw, cols: int, src_size: int = 50, rows: int = None, origin=(0, 0)):
+    scale = max(1, cols // src_size)
+    rows = cols if rows is None else rows
+    raw = raw or {}
+    columns = {ot: build_type_columns(ot, raw.get(ot), scale) for ot in OBJ_TYPES}
+    return LayerObjects(columns, cols, rows, origin)
+
+# function to collect object at (col,row) in given layer: one occupancy lookup,
+# then the footprint is cleared in place
+def collect_at(objects_store, col, row, layer):
+    layer_objs = objects_store.get(layer)
+    if not layer_objs:
+        return None
+    obj_id = layer_objs.object_at(col, row)
+    if obj_id == EMPTY:
+        return None
+    columns, i = layer_objs.resolve(obj_id)
+    collected = columns.get(i)
+    layer_objs.remove(obj_id)
+    return collected
+
+# function to draw objects in current layer (optionally only some types)
+def draw_objects(screen, objects_store, layer, cmin, cmax, rmin, rmax, cell_size, object_colors, types=None):
+    layer_objs = objects_store.get(layer, {})
+    for obj_type, columns in layer_objs.items():
+        if types is not None and obj_type not in types:
+            continue
+        color = object_colors.get(obj_type, (255, 0, 0))
+
+        # draw each visible object as rectangle
+        for i in columns.visible(cmin, cmax, rmin, rmax):
+            pygame.draw.rect(screen, color, (
+                int(columns.col[i]) * cell_size, int(columns.row[i]) * cell_size,
+                int(columns.w[i]) * cell_size, int(columns.h[i]) * cell_size,
+            ))
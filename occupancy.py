@@ -0,0 +1,118 @@
+#Team Name: Anything Works
+
+import numpy as np
+
+# grids up to this many cells use a dense id array, bigger ones a hash
+DENSE_MAX_CELLS = 4_000_000
+
+EMPTY = -1
+
+
+# expand object rectangles into (flat cell, object id) pairs, clipped to the grid
+def footprint_cells(ids, col, row, w, h, cols, rows):
+    ids = np.asarray(ids, dtype=np.int64)
+    c0 = np.clip(col, 0, cols).astype(np.int64)
+    r0 = np.clip(row, 0, rows).astype(np.int64)
+    c1 = np.clip(np.asarray(col, dtype=np.int64) + w, 0, cols)
+    r1 = np.clip(np.asarray(row, dtype=np.int64) + h, 0, rows)
+    cw = c1 - c0
+    ch = r1 - r0
+    area = np.where((cw > 0) & (ch > 0), cw * ch, 0)
+
+    total = int(area.sum())
+    owner = np.repeat(np.arange(len(ids)), area)
+    k = np.arange(total) - np.repeat(np.cumsum(area) - area, area)
+    cells = (r0[owner] + k // cw[owner]) * cols + (c0[owner] + k % cw[owner])
+    return cells, ids[owner]
+
+
+class DenseOccupancy:
+    """Cell -> object id lookup for a whole layer as a (rows, cols) int array.
+
+    Each cell holds the highest-priority (lowest id) live object covering it.
+    Objects stacked under it are kept in a per-cell run of a sorted id array,
+    so removing an object only touches the cells of its own footprint.
+    """
+
+    def __init__(self, cols, rows, n_objects, cells, ids):
+        self.cols = cols
+        self.rows = rows
+        self.alive = np.ones(n_objects, dtype=bool)
+
+        order = np.lexsort((ids, cells))
+        self.order = ids[order]
+        counts = np.bincount(cells, minlength=cols * rows)
+        self.end = np.cumsum(counts)
+        self.head = self.end - counts
+
+        grid = np.full(cols * rows, EMPTY, dtype=np.int32)
+        filled = counts > 0
+        grid[filled] = self.order[self.head[filled]]
+        self.grid = grid.reshape(rows, cols)
+
+    def object_at(self, col, row):
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return EMPTY
+        return int(self.grid[row, col])
+
+    def remove(self, obj_id, col, row, w, h):
+        self.alive[obj_id] = False
+        flat = self.grid.reshape(-1)
+        cells, _ = footprint_cells([obj_id], [col], [row], [w], [h], self.cols, self.rows)
+        for cell in cells[flat[cells] == obj_id]:
+            head, end = self.head[cell], self.end[cell]
+            while head < end and not self.alive[self.order[head]]:
+                head += 1
+            self.head[cell] = head
+            flat[cell] = self.order[head] if head < end else EMPTY
+
+
+class SparseOccupancy:
+    """Same interface as DenseOccupancy, but only covered cells are stored.
+
+    The covered cells are kept as a sorted key array with the same per-cell
+    runs as the dense grid; lookups binary-search the key.
+    """
+
+    def __init__(self, cols, rows, n_objects, cells, ids):
+        self.cols = cols
+        self.rows = rows
+        self.alive = np.ones(n_objects, dtype=bool)
+
+        order = np.lexsort((ids, cells))
+        cells = cells[order]
+        self.order = ids[order]
+        starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]]) if len(cells) else np.zeros(0, dtype=np.int64)
+        self.keys = cells[starts]
+        self.head = starts
+        self.end = np.r_[starts[1:], len(cells)].astype(np.int64)
+        self.top = self.order[starts].astype(np.int32)
+
+    def _slot(self, cell):
+        i = int(np.searchsorted(self.keys, cell))
+        return i if i < len(self.keys) and self.keys[i] == cell else None
+
+    def object_at(self, col, row):
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return EMPTY
+        i = self._slot(row * self.cols + col)
+        return EMPTY if i is None else int(self.top[i])
+
+    def remove(self, obj_id, col, row, w, h):
+        self.alive[obj_id] = False
+        cells, _ = footprint_cells([obj_id], [col], [row], [w], [h], self.cols, self.rows)
+        for cell in cells.tolist():
+            i = self._slot(cell)
+            if i is None or self.top[i] != obj_id:
+                continue
+            head, end = self.head[i], self.end[i]
+            while head < end and not self.alive[self.order[head]]:
+                head += 1
+            self.head[i] = head
+            self.top[i] = self.order[head] if head < end else EMPTY
+
+
+def build_occupancy(cols, rows, n_objects, col, row, w, h):
+    cells, ids = footprint_cells(np.arange(n_objects), col, row, w, h, cols, rows)
+    cls = DenseOccupancy if cols * rows <= DENSE_MAX_CELLS else SparseOccupancy
+    return cls(cols, rows, n_objects, cells, ids)
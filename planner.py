@@ -0,0 +1,440 @@
+#Team Name: Anything Works
+
+import array
+import copy
+import heapq
+import math
+import numpy as np
+
+# fuel per grid cell travelled in still water (main.py burns 0.1 * distance)
+FUEL_PER_CELL = 0.1
+# share of the fuel saved (or spent extra) per m/s of current along the move
+CURRENT_GAIN = 0.25
+# a move never costs less than this share of its still-water fuel
+MIN_FACTOR = 0.5
+# fuel to go one layer up or down
+LAYER_CHANGE_FUEL = 1.0
+
+INF = math.inf
+# heuristics are scaled by this so float32 rounding of the costs cannot make them overestimate
+HEURISTIC_SLACK = 1 - 1e-6
+
+# 8-connected moves as (d_col, d_row); row grows southwards, v_mps is northwards
+MOVES = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+
+
+# fuel of a move from every cell in every direction, as an (8, rows, cols) array;
+# moves leaving the grid cost INF. u/v are the current (m/s) at each cell
+def move_costs(u, v, fuel_per_cell=FUEL_PER_CELL, gain=CURRENT_GAIN, min_factor=MIN_FACTOR):
+    rows, cols = u.shape
+    costs = np.empty((len(MOVES), rows, cols), dtype=np.float32)
+    for d, (dc, dr) in enumerate(MOVES):
+        length = math.hypot(dc, dr)
+        assist = (u * dc - v * dr) / length         # current along the move
+        cost = costs[d]
+        cost[:] = fuel_per_cell * length * np.maximum(min_factor, 1 - gain * assist)
+        if dr < 0:
+            cost[0, :] = INF
+        if dr > 0:
+            cost[-1, :] = INF
+        if dc < 0:
+            cost[:, 0] = INF
+        if dc > 0:
+            cost[:, -1] = INF
+    return costs
+
+
+# (layers, rows, cols) mask of the cells covered by live objects of one type;
+# store layers 1..layers map to planner layers 0..layers-1
+def blocked_cells(objects_store, layers, cols, rows, obj_type='hazards'):
+    mask = np.zeros((layers, rows, cols), dtype=bool)
+    for layer in range(1, layers + 1):
+        layer_objs = objects_store.get(layer)
+        columns = layer_objs.get(obj_type) if layer_objs else None
+        if columns is None:
+            continue
+        for i in np.flatnonzero(columns.alive):
+            col, row = int(columns.col[i]), int(columns.row[i])
+            mask[layer - 1, max(0, row):row + int(columns.h[i]), max(0, col):col + int(columns.w[i])] = True
+    return mask
+
+
+class Route:
+    __slots__ = ('path', 'fuel')
+
+    def __init__(self, path, fuel):
+        self.path = path        # [(layer, col, row), ...] from start to goal
+        self.fuel = fuel
+
+    def __len__(self):
+        return len(self.path)
+
+
+class RoutePlanner:
+    """Fuel-optimal routes over the current field, across layers.
+
+    States are (layer, col, row); a move goes to one of the 8 neighbour
+    cells in the same layer (fuel from move_costs, lower with the current
+    and higher against it) or one layer up/down in place. Blocked cells
+    (hazards) cannot be entered.
+
+    Planning is D* Lite: the search runs backwards from the goal and keeps
+    its g/rhs values between calls, so a new start (the sub moved) or
+    cells that got blocked/unblocked only repair the affected part of the
+    search instead of replanning from scratch. That repair only pays off while the goal stays the same (the sub
+    follows a route, or hazards appear/vanish on it); a new goal resets
+    the search. One-off same-layer questions like "how much fuel to get
+    there" use fuel() instead: a fresh forward A* over a flat bytearray
+    of the enterable cells, optionally kept inside a window such as the
+    viewport.
+
+    Both searches expand one cell at a time in Python (a few µs each), so
+    their cost grows with the area searched around the path. That suits
+    the 200x200 map: a viewport query from click() takes ~8 ms on layer 1
+    (up to ~16 ms), while routes across the whole map take tens of ms (up
+    to ~100 ms for plan()). On a 2000x2000 grid long routes take seconds,
+    which is why streamed worlds keep the straight-line fuel burn.
+    """
+
+    def __init__(self, u, v, layers=1, blocked=None, layer_change_fuel=LAYER_CHANGE_FUEL):
+        self.rows, self.cols = u.shape
+        self.layers = layers
+        self.cells = self.rows * self.cols
+        self.layer_change_fuel = layer_change_fuel
+
+        costs = move_costs(u, v)
+        # flat float32 arrays: array indexing is much cheaper than NumPy scalar access
+        self.costs = [array.array('f', costs[d].tobytes()) for d in range(len(MOVES))]
+        self.offsets = [dr * self.cols + dc for dc, dr in MOVES]
+        # admissible heuristics (a little low so float32 costs never undercut them):
+        # the cheapest fuel per cell of distance anywhere, and a bound that splits
+        # the current into a uniform drift plus at most `spread` m/s around it
+        lengths = np.array([math.hypot(dc, dr) for dc, dr in MOVES], dtype=np.float32)
+        unit = costs / lengths[:, None, None]
+        self.min_unit = float(unit[np.isfinite(unit)].min()) * HEURISTIC_SLACK if np.isfinite(unit).any() else 0.0
+        flow = np.stack([u, -v]).reshape(2, -1).astype(np.float64)     # (col, row) components
+        drift = (flow.max(axis=1) + flow.min(axis=1)) / 2 if flow.size else np.zeros(2)
+        spread = float(np.hypot(*(flow - drift[:, None])).max()) if flow.size else 0.0
+        self.drift_unit = max(0.0, FUEL_PER_CELL * (1 - CURRENT_GAIN * spread)) * HEURISTIC_SLACK
+        self.drift = (FUEL_PER_CELL * CURRENT_GAIN * float(drift[0]), FUEL_PER_CELL * CURRENT_GAIN * float(drift[1]))
+
+        self.blocked = bytearray(layers * self.cells)
+        if blocked is not None:
+            self.blocked[:] = np.asarray(blocked, dtype=np.uint8).reshape(-1).tobytes()
+
+        self._reset(None, True)
+
+    # a planner over the same field with its own obstacles and search state;
+    # the cost arrays and heuristic bounds are shared (nothing writes them)
+    def with_blocked(self, blocked=None):
+        other = copy.copy(self)
+        other.blocked = bytearray(self.layers * self.cells)
+        if blocked is not None:
+            other.blocked[:] = np.asarray(blocked, dtype=np.uint8).reshape(-1).tobytes()
+        other._reset(None, True)
+        return other
+
+    def _reset(self, goal, cross_layer):
+        self.goal = goal
+        self.cross_layer = cross_layer
+        self.g = {}
+        self.rhs = {}
+        self.open = {}          # state -> key while in the queue
+        self.heap = []
+        self.km = 0.0
+        self.last_start = None
+        self.changed = set()
+        if goal is not None:
+            self.rhs[goal] = 0.0
+            self._push(goal, (0.0, 0.0))
+
+    def _state(self, layer, col, row):
+        return layer * self.cells + row * self.cols + col
+
+    def _unpack(self, s):
+        layer, cell = divmod(s, self.cells)
+        row, col = divmod(cell, self.cols)
+        return layer, col, row
+
+    # admissible estimate of the fuel from state a to state b; with a current
+    # the still-water part is cheaper (drift_unit) but the drift along the
+    # displacement is paid or refunded exactly
+    def _h(self, a, b):
+        la, ca = divmod(a, self.cells)
+        lb, cb = divmod(b, self.cells)
+        ra, cola = divmod(ca, self.cols)
+        rb, colb = divmod(cb, self.cols)
+        dx = colb - cola
+        dy = rb - ra
+        octile = max(abs(dx), abs(dy)) + 0.41421356 * min(abs(dx), abs(dy))
+        h = max(octile * self.drift_unit - self.drift[0] * dx - self.drift[1] * dy, octile * self.min_unit)
+        return h + abs(la - lb) * self.layer_change_fuel
+
+    def _key(self, s):
+        m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _push(self, s, key):
+        self.open[s] = key
+        heapq.heappush(self.heap, (key[0], key[1], s))
+
+    # (next state, fuel) for every move out of s
+    def _successors(self, s):
+        cell = s % self.cells
+        blocked = self.blocked
+        for d, off in enumerate(self.offsets):
+            cost = self.costs[d][cell]
+            if cost != INF:
+                t = s + off
+                if not blocked[t]:
+                    yield t, cost
+        if self.cross_layer:
+            for t in (s - self.cells, s + self.cells):
+                if 0 <= t < len(blocked) and not blocked[t]:
+                    yield t, self.layer_change_fuel
+
+    # (previous state, fuel) for every move into t
+    def _predecessors(self, t):
+        if self.blocked[t]:
+            return
+        cell = t % self.cells
+        for d, off in enumerate(self.offsets):
+            s = t - off
+            if 0 <= cell - off < self.cells:
+                cost = self.costs[d][cell - off]
+                if cost != INF:
+                    yield s, cost
+        if self.cross_layer:
+            for s in (t - self.cells, t + self.cells):
+                if 0 <= s < len(self.blocked):
+                    yield s, self.layer_change_fuel
+
+    def _best_rhs(self, s):
+        g = self.g
+        return min((cost + g.get(t, INF) for t, cost in self._successors(s)), default=INF)
+
+    def _update_vertex(self, s):
+        if self.g.get(s, INF) != self.rhs.get(s, INF):
+            self._push(s, self._key(s))
+        else:
+            self.open.pop(s, None)
+
+    def _top(self):
+        heap, open_ = self.heap, self.open
+        while heap:
+            k1, k2, s = heap[0]
+            if open_.get(s) == (k1, k2):
+                return (k1, k2), s
+            heapq.heappop(heap)         # stale entry
+        return (INF, INF), None
+
+    def _compute(self, max_expansions):
+        g, rhs, open_, heap = self.g, self.rhs, self.open, self.heap
+        g_get, rhs_get = g.get, rhs.get
+        push, pop = heapq.heappush, heapq.heappop
+        start, goal, km = self.start, self.goal, self.km
+        n, cols, cells = len(self.blocked), self.cols, self.cells
+        blocked, min_unit, layer_fuel = self.blocked, self.min_unit, self.layer_change_fuel
+        drift_unit, (drift_c, drift_r) = self.drift_unit, self.drift
+        moves = list(zip(self.costs, self.offsets, [dc for dc, _ in MOVES], [dr for _, dr in MOVES]))
+        vertical = (-cells, cells) if self.cross_layer else ()
+        l0, c0 = divmod(start, cells)
+        r0, c0 = divmod(c0, cols)
+        # until the start moves (km > 0) every queued key is up to date
+        check_keys = km > 0
+        expansions = 0
+        while heap:
+            k1, k2, u = heap[0]
+            if open_.get(u) != (k1, k2):
+                pop(heap)               # stale entry
+                continue
+            g_start, rhs_start = g_get(start, INF), rhs_get(start, INF)
+            m = min(g_start, rhs_start)
+            if not ((k1, k2) < (m + km, m) or rhs_start > g_start):
+                break
+            expansions += 1
+            if expansions > max_expansions:
+                return False
+            if check_keys:
+                k_new = self._key(u)
+                if (k1, k2) < k_new:
+                    self._push(u, k_new)
+                    continue
+            if g_get(u, INF) > rhs_get(u, INF):
+                g_u = g[u] = rhs[u]
+                del open_[u]
+                pop(heap)
+                if blocked[u]:
+                    continue
+                lu, cell = divmod(u, cells)
+                ru, cu = divmod(cell, cols)
+                layer_h = abs(lu - l0) * layer_fuel + km
+                # relax the states that move into u, inline for speed
+                for costs, off, dc, dr in moves:
+                    src = cell - off
+                    if 0 <= src < cells:
+                        cost = costs[src]
+                        if cost != INF:
+                            new = cost + g_u
+                            s = u - off
+                            if new < rhs_get(s, INF) and s != goal:
+                                rhs[s] = new
+                                g_s = g_get(s, INF)
+                                if g_s == new:
+                                    open_.pop(s, None)
+                                    continue
+                                m = g_s if g_s < new else new
+                                dx = cu - dc - c0
+                                dy = ru - dr - r0
+                                adx = dx if dx > 0 else -dx
+                                ady = dy if dy > 0 else -dy
+                                octile = adx + 0.41421356 * ady if adx > ady else ady + 0.41421356 * adx
+                                h = octile * drift_unit - drift_c * dx - drift_r * dy
+                                if h < octile * min_unit:
+                                    h = octile * min_unit
+                                k1 = m + h + layer_h
+                                open_[s] = (k1, m)
+                                push(heap, (k1, m, s))
+                for off in vertical:
+                    s = u - off
+                    if 0 <= s < n and s != goal and layer_fuel + g_u < rhs_get(s, INF):
+                        rhs[s] = layer_fuel + g_u
+                        self._update_vertex(s)
+            else:
+                g_old = g.get(u, INF)
+                g[u] = INF
+                for s, cost in list(self._predecessors(u)) + [(u, None)]:
+                    if s != goal and (cost is None or rhs_get(s, INF) == cost + g_old):
+                        rhs[s] = self._best_rhs(s)
+                    self._update_vertex(s)
+        return True
+
+    # mark cells blocked (True) or free (False) in a layer; the next plan() repairs around them
+    def set_blocked(self, layer, cells, blocked=True):
+        for col, row in cells:
+            s = self._state(layer, col, row)
+            if self.blocked[s] != blocked:
+                self.blocked[s] = blocked
+                self.changed.add(s)
+
+    def _repair(self):
+        changed, self.changed = self.changed, set()
+        if self.goal is None:
+            return
+        touched = set()
+        for t in changed:
+            # edges into t changed cost; so did the states that move into it
+            touched.add(t)
+            cell = t % self.cells
+            for off in self.offsets:
+                if 0 <= cell - off < self.cells:
+                    touched.add(t - off)
+            if self.cross_layer:
+                touched.update(s for s in (t - self.cells, t + self.cells) if 0 <= s < len(self.blocked))
+        for s in touched:
+            if s != self.goal:
+                self.rhs[s] = self._best_rhs(s)
+            self._update_vertex(s)
+
+    def plan(self, start, goal, cross_layer=True, max_expansions=1_000_000):
+        """Cheapest route from start to goal, both (layer, col, row).
+
+        With cross_layer=False the route stays in the start's layer. Returns
+        a Route or None if the goal cannot be reached (or the search gave up
+        after max_expansions).
+        """
+        if not cross_layer and start[0] != goal[0]:
+            return None
+        s_start, s_goal = self._state(*start), self._state(*goal)
+        if self.blocked[s_goal] or self.blocked[s_start]:
+            return None
+        if s_goal != self.goal or cross_layer != self.cross_layer:
+            self.start = s_start
+            self._reset(s_goal, cross_layer)
+        else:
+            self.km += self._h(self.last_start, s_start)
+            self.start = s_start
+        self.last_start = s_start
+        self._repair()
+
+        if not self._compute(max_expansions):
+            return None
+        fuel = self.rhs.get(s_start, INF)
+        if fuel == INF:
+            return None
+
+        # follow the cheapest move (fuel + remaining) from the start
+        path = [s_start]
+        s = s_start
+        g = self.g
+        while s != s_goal and len(path) <= self.layers * self.cells:
+            s = min(self._successors(s), key=lambda t: t[1] + g.get(t[0], INF))[0]
+            path.append(s)
+        return Route([self._unpack(s) for s in path], fuel)
+
+    def fuel(self, layer, start, goal, window=None, max_expansions=1_000_000):
+        """Fuel of the cheapest route between two (col, row) cells of a layer.
+
+        window=(cmin, cmax, rmin, rmax) keeps the route inside those cells
+        (it is widened to hold start and goal). Each call is a fresh A*
+        from the start that leaves plan()'s D* Lite state alone. Returns
+        INF if the goal cannot be reached (or after max_expansions).
+        """
+        if start == goal:
+            return 0.0
+        cols, rows, cells = self.cols, self.rows, self.cells
+        cmin, cmax, rmin, rmax = window if window is not None else (0, cols - 1, 0, rows - 1)
+        cmin, cmax = max(0, min(cmin, start[0], goal[0])), min(cols - 1, max(cmax, start[0], goal[0]))
+        rmin, rmax = max(0, min(rmin, start[1], goal[1])), min(rows - 1, max(rmax, start[1], goal[1]))
+        s0 = start[1] * cols + start[0]
+        t0 = goal[1] * cols + goal[0]
+        # cells that cannot be entered: blocked, outside the window or already expanded
+        wall = bytearray(b'\x01') * cells
+        blocked = self.blocked
+        for r in range(rmin, rmax + 1):
+            a = r * cols
+            wall[a + cmin:a + cmax + 1] = blocked[layer * cells + a + cmin:layer * cells + a + cmax + 1]
+        if wall[s0] or wall[t0]:
+            return INF
+        gc, gr = goal
+        min_unit, drift_unit, (drift_c, drift_r) = self.min_unit, self.drift_unit, self.drift
+        moves = list(zip(self.costs, self.offsets, [dc for dc, _ in MOVES], [dr for _, dr in MOVES]))
+        g = {s0: 0.0}
+        g_get = g.get
+        push, pop = heapq.heappush, heapq.heappop
+        heap = [(0.0, s0)]
+        expansions = 0
+        while heap:
+            _, u = pop(heap)
+            if u == t0:
+                return g[u]
+            if wall[u]:
+                continue            # already expanded
+            expansions += 1
+            if expansions > max_expansions:
+                break
+            wall[u] = 1
+            g_u = g[u]
+            ru, cu = divmod(u, cols)
+            # relax the moves out of u, inline for speed (same heuristic as _h);
+            # moves off the grid cost INF, so they never land on a wrapped cell
+            for costs, off, dc, dr in moves:
+                cost = costs[u]
+                if cost == INF:
+                    continue
+                v = u + off
+                if wall[v]:
+                    continue
+                new = g_u + cost
+                if new < g_get(v, INF):
+                    g[v] = new
+                    dx = gc - cu - dc
+                    dy = gr - ru - dr
+                    adx = dx if dx > 0 else -dx
+                    ady = dy if dy > 0 else -dy
+                    octile = adx + 0.41421356 * ady if adx > ady else ady + 0.41421356 * adx
+                    h = octile * drift_unit - drift_c * dx - drift_r * dy
+                    if h < octile * min_unit:
+                        h = octile * min_unit
+                    push(heap, (new + h, v))
+        return INF
@@ -0,0 +1,293 @@
+#Team Name: Anything Works
+
+# Automated exploration policies played headless over many seeds:
+#   python policies.py --seeds 1000 --out policies.json
+# Every seed is its own layer assignment (and marine-life run); all policies
+# play the same seeds, so their statistics compare like for like.
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from agents import LifeSimulation
+from hazards import HazardFields
+from layers import LAYER_RANGES, assignRandomLayers, partitionByLayer
+from load_csv import attach_tables, share_tables
+from movement import MovementSimulator
+from object_store import build_objects_store
+from planner import FUEL_PER_CELL, RoutePlanner, blocked_cells
+from simulation import CLICK, DESCEND, LAYERS, Simulation, radius_for_layer
+
+# score of one collected object; hazards are worth nothing and count as exposure
+OBJECT_VALUES = {'resources': 10, 'poi': 6, 'corals': 4, 'life': 2, 'food_web': 1, 'hazards': 0}
+
+# game time between two decisions (marine life keeps moving meanwhile)
+ACTION_MS = 2000
+# a session stops after this many decisions even with fuel left
+MAX_ACTIONS = 1000
+# seeds per task sent to a worker: few enough round trips, small enough to balance
+SEEDS_PER_TASK = 8
+
+# per-session numbers aggregated for every policy
+METRICS = ['value', 'fuel_used', 'value_per_fuel', 'hazards', 'hull_lost', 'collected', 'actions']
+
+
+# visible objects of the current layer worth collecting, each as the cell of
+# its footprint (inside the viewport) nearest to the sub: (cols, rows, values)
+def targets(sim):
+    layer_objs = sim.world.get(sim.layer) or {}
+    ccol, crow = sim.viewport_center
+    radius = radius_for_layer(sim.layer)
+    cmin, cmax = max(0, ccol - radius), min(sim.cols - 1, ccol + radius)
+    rmin, rmax = max(0, crow - radius), min(sim.rows - 1, crow + radius)
+    scol, srow = sim.selected
+
+    cols, rows, values = [], [], []
+    for obj_type, columns in layer_objs.items():
+        value = OBJECT_VALUES.get(obj_type, 0)
+        if value <= 0:
+            continue
+        i = columns.visible(cmin, cmax, rmin, rmax)
+        if not len(i):
+            continue
+        col, row = columns.col[i], columns.row[i]
+        cols.append(np.clip(scol, np.maximum(col, cmin), np.minimum(col + columns.w[i] - 1, cmax)))
+        rows.append(np.clip(srow, np.maximum(row, rmin), np.minimum(row + columns.h[i] - 1, rmax)))
+        values.append(np.full(len(i), value, dtype=np.float64))
+    if not cols:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0)
+    return np.concatenate(cols), np.concatenate(rows), np.concatenate(values)
+
+
+# nothing left to collect here: go deeper, or stop at the bottom
+def descend_or_stop(sim):
+    return (DESCEND, 0, 0) if sim.layer < LAYERS else None
+
+
+# A policy looks at the simulation and returns the next input as
+# (kind, col, row), or None to end the session.
+
+# always the closest collectable object
+def greedy_nearest(sim, rng):
+    cols, rows, values = targets(sim)
+    if not len(cols):
+        return descend_or_stop(sim)
+    i = int(np.argmin(np.hypot(cols - sim.selected[0], rows - sim.selected[1])))
+    return CLICK, int(cols[i]), int(rows[i])
+
+# the most value per unit of fuel, estimated from the straight-line burn
+# (one cell added so an object under the sub does not divide by zero)
+def value_per_fuel(sim, rng):
+    cols, rows, values = targets(sim)
+    if not len(cols):
+        return descend_or_stop(sim)
+    fuel = FUEL_PER_CELL * (np.hypot(cols - sim.selected[0], rows - sim.selected[1]) + 1)
+    i = int(np.argmax(values / fuel))
+    return CLICK, int(cols[i]), int(rows[i])
+
+# any visible object; the baseline the others should beat
+def random_target(sim, rng):
+    cols, rows, values = targets(sim)
+    if not len(cols):
+        return descend_or_stop(sim)
+    i = int(rng.integers(len(cols)))
+    return CLICK, int(cols[i]), int(rows[i])
+
+
+POLICIES = {
+    'greedy_nearest': greedy_nearest,
+    'value_per_fuel': value_per_fuel,
+    'random': random_target,
+}
+
+
+class PolicyWorld:
+    """Everything a session needs that does not depend on the seed.
+
+    The dataset, the current field and the planner's cost arrays are set up
+    once per process; session(seed) then only places the objects on layers,
+    builds the store, a planner sharing those arrays with the seed's
+    obstacles, the hazard fields and marine life for that seed.
+    """
+
+    def __init__(self, data, cols, rows, src_size=50, sub_size=4, simulate_life=True):
+        self.data = data
+        self.cols = cols
+        self.rows = rows
+        self.src_size = src_size
+        self.simulate_life = simulate_life
+        self.movement = MovementSimulator(data, sub_size=sub_size)
+        u, v = self.movement.currents_at(np.arange(cols)[None, :], np.arange(rows)[:, None])
+        # cost arrays and heuristics only; each session gets a copy with its own obstacles
+        self.planner = RoutePlanner(u, v, layers=LAYERS)
+
+    def session(self, seed):
+        # shallow copies: the 'layer' column of one seed must not reach the shared frames
+        tables = {name: df.copy(deep=False) if name in LAYER_RANGES else df for name, df in self.data.items()}
+        layer_index = partitionByLayer(assignRandomLayers(tables, seed), LAYERS)
+        store = build_objects_store(layer_index, LAYERS, self.cols, self.src_size, self.rows)
+        planner = self.planner.with_blocked(blocked_cells(store, LAYERS, self.cols, self.rows))
+        life_sim = LifeSimulation(store, self.movement, self.cols, self.rows, seed=seed) if self.simulate_life else None
+        return Simulation(store, self.cols, self.rows, planner=planner, life_sim=life_sim,
+                          hazards=HazardFields(store, self.cols, self.rows))
+
+
+# play one session with a policy, starting in the middle of the map
+def play(sim, policy, rng, max_actions=MAX_ACTIONS):
+    sim.click(sim.cols // 2, sim.rows // 2)
+    actions = 0
+    while not sim.over and actions < max_actions:
+        sim.advance(sim.now + ACTION_MS)
+        action = policy(sim, rng)
+        if action is None:
+            break
+        sim.apply(*action)
+        actions += 1
+    sim.finish()
+    return actions
+
+
+# the numbers of one played session
+def session_result(policy_name, seed, sim, actions):
+    counts = sim.collected_counts
+    value = sum(OBJECT_VALUES.get(t, 0) * n for t, n in counts.items())
+    fuel_used = 100 - float(sim.fuel)
+    return {
+        'policy': policy_name,
+        'seed': seed,
+        'value': value,
+        'fuel_used': round(fuel_used, 6),
+        'value_per_fuel': value / fuel_used if fuel_used > 0 else 0.0,
+        'hazards': counts.get('hazards', 0),
+        'hull_lost': round(100 - float(sim.hull_health), 6),
+        'collected': sum(counts.values()),
+        'actions': actions,
+        'layer': sim.layer,
+        'time_ms': sim.now,
+    }
+
+
+def run_sessions(world, policy_name, seeds, max_actions=MAX_ACTIONS):
+    policy = POLICIES[policy_name]
+    results = []
+    for seed in seeds:
+        sim = world.session(seed)
+        actions = play(sim, policy, np.random.default_rng(seed), max_actions)
+        results.append(session_result(policy_name, seed, sim, actions))
+    return results
+
+
+# set up once in every worker process by _init_worker()
+_worker = {}
+
+def _init_worker(spec, settings):
+    block, data = attach_tables(spec)
+    _worker['block'] = block        # keep the shared block open while the frames are in use
+    _worker['world'] = PolicyWorld(data, **settings['world'])
+    _worker['max_actions'] = settings['max_actions']
+
+def _run_task(task):
+    policy_name, seeds = task
+    return run_sessions(_worker['world'], policy_name, seeds, _worker['max_actions'])
+
+
+def run_batch(data, policies, seeds, workers=None, seeds_per_task=SEEDS_PER_TASK,
+              max_actions=MAX_ACTIONS, **world):
+    """Play every policy on every seed; returns the per-session results.
+
+    With more than one worker the dataset is copied once into shared memory
+    and every worker process attaches to it in its initializer; tasks only
+    carry a policy name and a few seeds. world holds PolicyWorld's keyword
+    arguments (cols, rows, src_size, sub_size, simulate_life).
+    """
+    unknown = [p for p in policies if p not in POLICIES]
+    if unknown:
+        raise ValueError(f"unknown policies {unknown}, choose from {list(POLICIES)}")
+    seeds = list(seeds)
+    tasks = [(p, seeds[i:i + seeds_per_task]) for p in policies for i in range(0, len(seeds), seeds_per_task)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        local = PolicyWorld(data, **world)
+        return [r for p, chunk in tasks for r in run_sessions(local, p, chunk, max_actions)]
+
+    block, spec = share_tables(data)
+    try:
+        settings = {'world': world, 'max_actions': max_actions}
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(spec, settings)) as pool:
+            return [r for results in pool.map(_run_task, tasks) for r in results]
+    finally:
+        block.close()
+        block.unlink()
+
+
+# mean, spread and percentiles of every metric, per policy
+def aggregate(results):
+    by_policy = {}
+    for r in results:
+        by_policy.setdefault(r['policy'], []).append(r)
+
+    stats = {}
+    for policy, runs in by_policy.items():
+        stats[policy] = {'sessions': len(runs)}
+        for metric in METRICS:
+            values = np.array([r[metric] for r in runs], dtype=np.float64)
+            p10, p50, p90 = np.percentile(values, [10, 50, 90])
+            stats[policy][metric] = {
+                'mean': float(values.mean()),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                'p10': float(p10),
+                'median': float(p50),
+                'p90': float(p90),
+            }
+    return stats
+
+
+def print_stats(stats):
+    print(f"{'policy':>16}  {'sessions':>8}" + ''.join(f'  {m:>14}' for m in METRICS))
+    for policy, s in stats.items():
+        print(f'{policy:>16}  {s["sessions"]:>8}' + ''.join(f'  {s[m]["mean"]:>14.3f}' for m in METRICS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare exploration policies over many seeds.')
+    parser.add_argument('--policies', nargs='+', default=list(POLICIES), choices=list(POLICIES))
+    parser.add_argument('--seeds', type=int, default=1000, help='number of seeds (layer assignments) per policy')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--seeds-per-task', type=int, default=SEEDS_PER_TASK)
+    parser.add_argument('--max-actions', type=int, default=MAX_ACTIONS)
+    parser.add_argument('--no-life', action='store_true', help='keep marine life where the survey put it')
+    parser.add_argument('--out', help='write the statistics and every session to this JSON file')
+    args = parser.parse_args()
+
+    import main as game     # world settings live with the game setup
+    loader = game.DataLoader(game.DATA_DIR)
+    if game.use_chunked_world(loader):
+        parser.error('batch runs need a map that fits in memory (BT_WORLD=chunked or a big dataset)')
+
+    workers = args.workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = run_batch(loader.load_CSV_files(), args.policies,
+                        range(args.first_seed, args.first_seed + args.seeds),
+                        workers=workers, seeds_per_task=args.seeds_per_task, max_actions=args.max_actions,
+                        cols=game.COLS, rows=game.ROWS, src_size=50, sub_size=game.SUB_SIZE,
+                        simulate_life=not args.no_life)
+    elapsed = time.perf_counter() - start
+
+    stats = aggregate(results)
+    print_stats(stats)
+    print(f'{len(results)} sessions on {workers} worker(s) in {elapsed:.2f} s '
+          f'({len(results) / elapsed:.1f} sessions/s)')
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'workers': workers, 'elapsed_s': elapsed, 'policies': stats,
+                       'sessions': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+#Team Name: Anything Works
+
+import array
+import csv
+import json
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+import pygame
+
+# frames kept for the rolling p50/p95/max of each phase
+WINDOW = 240
+# the overlay text is rebuilt at most this often
+OVERLAY_REFRESH_MS = 500
+# recorded samples held in memory before they are appended to the trace file
+TRACE_FLUSH = 4096
+
+OVERLAY_BG = (0, 0, 0, 170)
+OVERLAY_TEXT = (255, 255, 255)
+
+# what phase() hands out while profiling is off: entering it costs nothing
+_OFF = nullcontext()
+
+
+class _Phase:
+    """Reusable timer for one named phase (one object per name, not per call)."""
+
+    __slots__ = ('profiler', 'slot', 'start')
+
+    def __init__(self, profiler, slot):
+        self.profiler = profiler
+        self.slot = slot
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        self.profiler._add(self.slot, self.start, time.perf_counter_ns() - self.start)
+
+
+class FrameProfiler:
+    """Times the phases of each frame of the main loop.
+
+    Code wraps a phase in `with profiler.phase('name'):`. While disabled
+    that returns a shared no-op context, so instrumented code pays one
+    attribute check per phase. When enabled, durations go into rolling
+    windows for the overlay (p50/p95/max); when recording to a trace file,
+    every sample also goes into compact arrays that are appended to the
+    file (CSV, or Chrome trace JSON) every TRACE_FLUSH samples, so memory
+    stays flat and a crash loses at most the last few seconds.
+    """
+
+    def __init__(self, enabled=False, trace=None, window=WINDOW):
+        self.trace = trace
+        self.record = trace is not None
+        self.enabled = enabled or self.record
+        self.window = window
+        self.frame = 0
+        self.names = []
+        self._phases = {}
+        self._recent = []
+        self._frame_start = 0
+        self._origin = time.perf_counter_ns()
+
+        # recorded samples not yet written: frame number, phase slot, start and duration in ns
+        self._t_frame = array.array('I')
+        self._t_slot = array.array('H')
+        self._t_start = array.array('q')
+        self._t_dur = array.array('q')
+        self._trace_file = None
+        self._trace_csv = None      # csv.writer for .csv traces
+        self._trace_events = 0      # Chrome events written so far
+
+        # overlay
+        self.overlay = False
+        self.overlay_pos = (10, 10)
+        self._overlay_surf = None
+        self._overlay_rect = None
+        self._overlay_next = 0
+        self._font = None
+
+    def phase(self, name):
+        if not self.enabled:
+            return _OFF
+        timer = self._phases.get(name)
+        if timer is None:
+            timer = self._phases[name] = _Phase(self, len(self.names))
+            self.names.append(name)
+            self._recent.append(deque(maxlen=self.window))
+        return timer
+
+    def _add(self, slot, start, duration):
+        self._recent[slot].append(duration)
+        if self.record:
+            self._t_frame.append(self.frame)
+            self._t_slot.append(slot)
+            self._t_start.append(start - self._origin)
+            self._t_dur.append(duration)
+
+    # always stamped, so a frame in which F3 turns profiling on still has its own start
+    def begin_frame(self):
+        self._frame_start = time.perf_counter_ns()
+
+    # the whole frame is recorded as one more phase, 'frame'
+    def end_frame(self):
+        if not self.enabled:
+            return
+        start = self._frame_start
+        self.phase('frame')      # make sure the slot exists
+        self._add(self._phases['frame'].slot, start, time.perf_counter_ns() - start)
+        self.frame += 1
+        if self.record and len(self._t_dur) >= TRACE_FLUSH:
+            self.flush()
+
+    # {phase: (p50, p95, max)} in milliseconds over the rolling window
+    def stats(self):
+        result = {}
+        for name, samples in zip(self.names, self._recent):
+            if samples:
+                ms = np.fromiter(samples, dtype=np.float64, count=len(samples)) / 1e6
+                p50, p95 = np.percentile(ms, (50, 95))
+                result[name] = (float(p50), float(p95), float(ms.max()))
+        return result
+
+    # profiling runs while the overlay is shown or a trace is recorded
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.record
+        self._overlay_next = 0
+        return self._overlay_rect
+
+    def refresh_overlay(self, now_ms):
+        """Rebuild the overlay text when due.
+
+        Returns the screen rect that has to be redrawn (old and new panel)
+        or None if nothing changed.
+        """
+        if not self.overlay or now_ms < self._overlay_next:
+            return None
+        self._overlay_next = now_ms + OVERLAY_REFRESH_MS
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 18)
+
+        rows = [('phase', 'p50', 'p95', 'max')]
+        rows += [(name, f'{p50:.2f}', f'{p95:.2f}', f'{peak:.2f}')
+                 for name, (p50, p95, peak) in self.stats().items()]
+        line_h = self._font.get_linesize()
+        columns = (0, 110, 160, 210)
+        surf = pygame.Surface((260, 8 + line_h * len(rows)), pygame.SRCALPHA)
+        surf.fill(OVERLAY_BG)
+        for i, row in enumerate(rows):
+            for x, text in zip(columns, row):
+                surf.blit(self._font.render(text, True, OVERLAY_TEXT), (6 + x, 4 + i * line_h))
+
+        old = self._overlay_rect
+        self._overlay_surf = surf
+        self._overlay_rect = surf.get_rect(topleft=self.overlay_pos)
+        return self._overlay_rect if old is None else self._overlay_rect.union(old)
+
+    def draw_overlay(self, screen):
+        if self.overlay and self._overlay_surf is not None:
+            screen.blit(self._overlay_surf, self._overlay_rect)
+
+    # append the recorded samples to the trace file (created on the first
+    # call; the format follows the extension, .csv or .json) and drop them
+    def flush(self):
+        if not self.record:
+            return
+        f = self._trace_file
+        if f is None:
+            f = self._trace_file = open(self.trace, 'w', newline='')
+            if os.path.splitext(self.trace)[1].lower() == '.csv':
+                self._trace_csv = csv.writer(f)
+                self._trace_csv.writerow(['frame', 'phase', 'start_ms', 'duration_ms'])
+            else:
+                f.write('[')
+        samples = zip(self._t_frame, self._t_slot, self._t_start, self._t_dur)
+        if self._trace_csv is not None:
+            self._trace_csv.writerows([frame, self.names[slot], f'{start / 1e6:.4f}', f'{dur / 1e6:.4f}']
+                                      for frame, slot, start, dur in samples)
+        else:
+            self._write_chrome(f, samples)
+        f.flush()
+        for samples in (self._t_frame, self._t_slot, self._t_start, self._t_dur):
+            del samples[:]
+
+    # Chrome trace-event array format (chrome://tracing, Perfetto): complete
+    # events in us. The closing bracket is optional there, so a trace cut
+    # short by a crash still opens
+    def _write_chrome(self, f, samples):
+        for frame, slot, start, dur in samples:
+            event = {'name': self.names[slot], 'ph': 'X', 'ts': start / 1e3, 'dur': dur / 1e3,
+                     'pid': 0, 'tid': 0, 'args': {'frame': frame}}
+            f.write((',\n' if self._trace_events else '\n') + json.dumps(event))
+            self._trace_events += 1
+
+    # write what is left and finish the trace file
+    def close(self):
+        self.flush()
+        if self._trace_file is not None:
+            if self._trace_csv is None:
+                self._trace_file.write('\n]\n')
+            self._trace_file.close()
+            self._trace_file = None
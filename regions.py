@@ -0,0 +1,151 @@
+#Team Name: Anything Works
+
+import numpy as np
+import pandas as pd
+
+# value columns summed per object type; every table also holds a 'count' of objects
+VALUE_FIELDS = {
+    'resources': ['economic_value', 'abundance', 'purity'],
+    'poi': ['research_value'],
+}
+
+# up to this many changed objects are patched into a table one by one; more
+# are summed into a table of their own and added in one go
+PATCH_LIMIT = 8
+
+
+# per-object values of a TypeColumns as (fields, objects) float64: 1 for
+# 'count', the frame's column otherwise (0 where missing/NaN)
+def object_values(columns, fields):
+    values = np.ones((len(fields), len(columns.index)))
+    for f, name in enumerate(fields):
+        if name == 'count':
+            continue
+        if columns.frame is None or name not in columns.frame:
+            values[f] = 0
+            continue
+        column = pd.to_numeric(columns.frame[name], errors='coerce').to_numpy(dtype=np.float64)[columns.index]
+        values[f] = np.where(np.isnan(column), 0, column)
+    return values
+
+
+class RegionTotals:
+    """Summed-area tables of object counts and values per layer and type.
+
+    An object counts in the grid cell at the center of its footprint. For
+    every (layer, type) in VALUE_FIELDS a (fields, rows + 1, cols + 1)
+    table holds the running 2-D sums of the count and value columns, so the
+    total over any cell rectangle is four reads and the totals of every
+    w x h window on a layer come from one vectorized subtraction. The
+    tables follow the objects' versions (see TypeColumns.version): after
+    collect_at removes an object, the next query subtracts its values from
+    the sums below and right of its cell instead of rebuilding the table.
+    """
+
+    def __init__(self, objects_store, cols, rows, value_fields=VALUE_FIELDS):
+        self.objects_store = objects_store
+        self.cols = cols
+        self.rows = rows
+        self.fields = {t: ['count'] + list(names) for t, names in value_fields.items()}
+        self.layers = sorted(objects_store)
+        self.tables = {}
+        self._cells = {}        # (layer, type) -> (center rows, center cols, values) per object
+        self._alive = {}        # (layer, type) -> alive flags the table was built from
+        self._versions = {}
+        for layer in self.layers:
+            for obj_type in self.fields:
+                self._build(layer, obj_type)
+
+    def _columns(self, layer, obj_type):
+        layer_objs = self.objects_store.get(layer)
+        return layer_objs.get(obj_type) if layer_objs else None
+
+    # summed-area table of the objects selected by `which`, their values multiplied by `weight`
+    def _table(self, key, which, weight=1):
+        rows, cols, values = self._cells[key]
+        cell = rows[which] * self.cols + cols[which]
+        table = np.zeros((len(values), self.rows + 1, self.cols + 1))
+        for f in range(len(values)):
+            counts = np.bincount(cell, values[f][which] * weight, minlength=self.rows * self.cols)
+            table[f, 1:, 1:] = counts.reshape(self.rows, self.cols).cumsum(0).cumsum(1)
+        return table
+
+    def _build(self, layer, obj_type):
+        key = (layer, obj_type)
+        columns = self._columns(layer, obj_type)
+        if columns is None or not len(columns.index):
+            self._cells[key] = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                                np.zeros((len(self.fields[obj_type]), 0)))
+            self._alive[key] = np.zeros(0, dtype=bool)
+            self._versions[key] = columns.version if columns is not None else 0
+            self.tables[key] = self._table(key, self._alive[key])
+            return
+        rows = np.clip(columns.row + (columns.h - 1) // 2, 0, self.rows - 1).astype(np.int64)
+        cols = np.clip(columns.col + (columns.w - 1) // 2, 0, self.cols - 1).astype(np.int64)
+        self._cells[key] = (rows, cols, object_values(columns, self.fields[obj_type]))
+        self._alive[key] = columns.alive.copy()
+        self._versions[key] = columns.version
+        self.tables[key] = self._table(key, self._alive[key])
+
+    # the table of (layer, obj_type), brought up to date with collected objects
+    def table(self, layer, obj_type):
+        key = (layer, obj_type)
+        columns = self._columns(layer, obj_type)
+        if columns is not None and columns.version != self._versions.get(key):
+            changed = np.flatnonzero(columns.alive != self._alive[key])
+            # removed objects count -1, any that came back +1
+            weight = np.where(columns.alive[changed], 1.0, -1.0)
+            if len(changed) <= PATCH_LIMIT:
+                # one collected object: only the sums below and right of its cell change
+                rows, cols, values = self._cells[key]
+                table = self.tables[key]
+                for i, sign in zip(changed.tolist(), weight.tolist()):
+                    table[:, rows[i] + 1:, cols[i] + 1:] += (sign * values[:, i])[:, None, None]
+            else:
+                self.tables[key] += self._table(key, changed, weight)
+            self._alive[key] = columns.alive.copy()
+            self._versions[key] = columns.version
+        return self.tables[key]
+
+    def _field(self, obj_type, field):
+        try:
+            return self.fields[obj_type].index(field)
+        except (KeyError, ValueError):
+            raise KeyError(f'no {field!r} totals for {obj_type!r}') from None
+
+    # totals of every field of a type over the inclusive cell rectangle (clipped to the grid)
+    def totals(self, layer, obj_type, cmin, cmax, rmin, rmax):
+        cmin, rmin = max(0, cmin), max(0, rmin)
+        cmax, rmax = min(self.cols - 1, cmax), min(self.rows - 1, rmax)
+        names = self.fields[obj_type]
+        if layer not in self.layers or cmin > cmax or rmin > rmax:
+            return dict.fromkeys(names, 0.0)
+        t = self.table(layer, obj_type)
+        sums = t[:, rmax + 1, cmax + 1] - t[:, rmin, cmax + 1] - t[:, rmax + 1, cmin] + t[:, rmin, cmin]
+        return dict(zip(names, sums.tolist()))
+
+    def total(self, layer, obj_type, field, cmin, cmax, rmin, rmax):
+        self._field(obj_type, field)
+        return self.totals(layer, obj_type, cmin, cmax, rmin, rmax)[field]
+
+    def count(self, layer, obj_type, cmin, cmax, rmin, rmax):
+        return int(round(self.total(layer, obj_type, 'count', cmin, cmax, rmin, rmax)))
+
+    # (rows - h + 1, cols - w + 1) totals of one field over every w x h window;
+    # [r, c] is the window whose top-left cell is (c, r)
+    def window_totals(self, layer, obj_type, field, w, h=None):
+        h = w if h is None else h
+        f = self._field(obj_type, field)
+        if layer not in self.layers or not (0 < w <= self.cols and 0 < h <= self.rows):
+            return np.zeros((max(0, self.rows - h + 1), max(0, self.cols - w + 1)))
+        t = self.table(layer, obj_type)[f]
+        return t[h:, w:] - t[:-h, w:] - t[h:, :-w] + t[:-h, :-w]
+
+    # (col, row, total) of the w x h window of a layer holding the most of a
+    # field (top-left cell; the first one on ties), or None if none fits
+    def best_window(self, layer, obj_type, field, w, h=None):
+        sums = self.window_totals(layer, obj_type, field, w, h)
+        if not sums.size:
+            return None
+        row, col = np.unravel_index(int(np.argmax(sums)), sums.shape)
+        return int(col), int(row), float(sums[row, col])
@@ -0,0 +1,384 @@
+#Team Name: Anything Works
+
+from collections import OrderedDict
+import numpy as np
+import pygame
+from lod import DensityPyramid
+from occupancy import footprint_cells
+from profiler import FrameProfiler
+from view_by_layer import apply_viewport_to_rgb, bounds_mask, upscale_grid_to_image
+
+
+# density pyramid of a layer's static or dynamic (moving) types, kept in
+# pyramids; a dynamic one is rebuilt when its objects moved since
+def layer_pyramid(pyramids, layer_objs, layer, dynamic, cols, rows, object_colors):
+    pyramid = pyramids.get((layer, dynamic))
+    if pyramid is None:
+        types = list(layer_objs.dynamic) if dynamic else layer_objs.static_types()
+        pyramid = DensityPyramid(layer_objs, cols, rows, types, object_colors)
+        pyramids[(layer, dynamic)] = pyramid
+    elif dynamic and pyramid.stale():
+        pyramid.refresh(0, cols - 1, 0, rows - 1)
+    return pyramid
+
+
+# Each layer (base fill, objects and grid lines) is rendered once into an
+# off-screen surface; a frame then only blits the visible sub-rectangle.
+# Objects are drawn from the layer's density pyramid: one rectangle per
+# uniform block, so wide views of crowded layers stay cheap.
+class LayerSurfaceCache:
+    origin = (0, 0)         # the whole grid is on screen
+
+    def __init__(self, objects_store, cols, rows, cell_size, sub_size,
+                 base_color, grid_line_color, object_colors, outside_color=(0, 0, 0), profiler=None):
+        self.objects_store = objects_store
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.sub_size = sub_size
+        self.base_color = base_color
+        self.grid_line_color = grid_line_color
+        self.object_colors = object_colors
+        self.outside_color = outside_color
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.surfaces = {}
+        self.pyramids = {}      # (layer, dynamic) -> DensityPyramid
+
+    # cached surface for a layer, rendered on first use
+    def surface(self, layer):
+        surf = self.surfaces.get(layer)
+        if surf is None:
+            surf = pygame.Surface((self.cols * self.cell_size, self.rows * self.cell_size))
+            self._render(surf, layer, 0, self.cols - 1, 0, self.rows - 1)
+            self.surfaces[layer] = surf
+        return surf
+
+    def invalidate(self, layer=None):
+        if layer is None:
+            self.surfaces.clear()
+            self.pyramids.clear()
+        else:
+            self.surfaces.pop(layer, None)
+            self.pyramids.pop((layer, False), None)
+            self.pyramids.pop((layer, True), None)
+
+    def pyramid(self, layer, dynamic=False):
+        return layer_pyramid(self.pyramids, self.objects_store[layer], layer, dynamic,
+                             self.cols, self.rows, self.object_colors)
+
+    # re-render the cells of an inclusive rectangle, e.g. a collected object's footprint
+    def patch(self, layer, cmin, cmax, rmin, rmax):
+        surf = self.surfaces.get(layer)
+        if surf is None:
+            return
+        cmin, cmax = max(0, cmin), min(self.cols - 1, cmax)
+        rmin, rmax = max(0, rmin), min(self.rows - 1, rmax)
+        if cmin > cmax or rmin > rmax:
+            return
+        if (layer, False) in self.pyramids:
+            self.pyramids[(layer, False)].refresh(cmin, cmax, rmin, rmax)
+        self._render(surf, layer, cmin, cmax, rmin, rmax)
+
+    def _render(self, surf, layer, cmin, cmax, rmin, rmax):
+        cs = self.cell_size
+        area = pygame.Rect(cmin * cs, rmin * cs, (cmax - cmin + 1) * cs, (rmax - rmin + 1) * cs)
+        surf.set_clip(area)
+        surf.fill(self.base_color, area)
+        if self.objects_store.get(layer):
+            # moving (dynamic) types are drawn per frame, not baked into the cache
+            self.pyramid(layer).draw(surf, cmin, cmax, rmin, rmax, cs)
+
+        self._grid_lines(surf, cmin, cmax, rmin, rmax)
+        surf.set_clip(None)
+
+    # grid lines every sub_size cells across the inclusive cell rectangle
+    def _grid_lines(self, surf, cmin, cmax, rmin, rmax):
+        cs = self.cell_size
+        top, bottom = rmin * cs, (rmax + 1) * cs
+        left, right = cmin * cs, (cmax + 1) * cs
+        for c in range(cmin - cmin % self.sub_size, cmax + 1, self.sub_size):
+            pygame.draw.line(surf, self.grid_line_color, (c * cs, top), (c * cs, bottom), 1)
+        for r in range(rmin - rmin % self.sub_size, rmax + 1, self.sub_size):
+            pygame.draw.line(surf, self.grid_line_color, (left, r * cs), (right, r * cs), 1)
+
+    # blit the visible cells of a layer and black out the rest of the grid area
+    def draw_viewport(self, screen, layer, cmin, cmax, rmin, rmax):
+        cs = self.cell_size
+        profiler = self.profiler
+        view = pygame.Rect(cmin * cs, rmin * cs, (cmax - cmin + 1) * cs, (rmax - rmin + 1) * cs)
+        with profiler.phase('base_cells'):
+            screen.blit(self.surface(layer), view.topleft, view)
+
+        layer_objs = self.objects_store.get(layer)
+        if layer_objs and layer_objs.dynamic:
+            clip = screen.get_clip()
+            screen.set_clip(view.clip(clip))
+            with profiler.phase('draw_objects'):
+                self.pyramid(layer, dynamic=True).draw(screen, cmin, cmax, rmin, rmax, cs)
+            with profiler.phase('grid_lines'):
+                self._grid_lines(screen, cmin, cmax, rmin, rmax)
+            screen.set_clip(clip)
+
+        width, height = self.cols * cs, self.rows * cs
+        with profiler.phase('outside'):
+            for band in (
+                (0, 0, width, view.top),
+                (0, view.bottom, width, height - view.bottom),
+                (0, view.top, view.left, view.height),
+                (view.right, view.top, width - view.right, view.height),
+            ):
+                if band[2] > 0 and band[3] > 0:
+                    screen.fill(self.outside_color, band)
+        return view
+
+
+# paint the objects of a layer into an (rows, cols, 3) color grid, limited to
+# the inclusive cell rectangle; later types are painted over earlier ones
+def paint_objects(rgb_grid, layer_objs, cmin, cmax, rmin, rmax, object_colors, types=None):
+    sub_w, sub_h = cmax - cmin + 1, rmax - rmin + 1
+    for obj_type, columns in layer_objs.items():
+        if types is not None and obj_type not in types:
+            continue
+        idx = columns.visible(cmin, cmax, rmin, rmax)
+        if not len(idx):
+            continue
+        cells, _ = footprint_cells(idx, columns.col[idx] - cmin, columns.row[idx] - rmin,
+                                   columns.w[idx], columns.h[idx], sub_w, sub_h)
+        rgb_grid[cells // sub_w + rmin, cells % sub_w + cmin] = object_colors.get(obj_type, (255, 0, 0))
+
+
+# Same interface as LayerSurfaceCache, but each layer is kept as a
+# (rows, cols, 3) uint8 color grid and frames are composed with NumPy into a
+# preallocated framebuffer that goes to the screen via surfarray.blit_array.
+class FramebufferRenderer:
+    origin = (0, 0)
+
+    def __init__(self, objects_store, cols, rows, cell_size, sub_size,
+                 base_color, grid_line_color, object_colors, outside_color=(0, 0, 0), profiler=None):
+        self.objects_store = objects_store
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.sub_size = sub_size
+        self.base_color = base_color
+        self.grid_line_color = grid_line_color
+        self.object_colors = object_colors
+        self.outside_color = outside_color
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.grids = {}
+        self.pyramids = {}      # (layer, dynamic) -> DensityPyramid of the moving types
+
+        # per-frame work buffers, allocated once
+        self.mask = np.zeros((rows, cols), dtype=bool)
+        self.masked = np.zeros((rows, cols, 3), dtype=np.uint8)
+        self.frame = np.zeros((rows * cell_size, cols * cell_size, 3), dtype=np.uint8)
+        self.frame_rows = np.zeros((rows, cols * cell_size, 3), dtype=np.uint8)
+        # moving objects of the view: flat, so a view-sized slice is contiguous
+        self.code_index = np.zeros(rows * cols, dtype=np.intp)
+        self.code_mask = np.zeros(rows * cols, dtype=bool)
+        self.code_colors = np.zeros((rows * cols, 3), dtype=np.uint8)
+        self.target = None
+
+    # cached color grid for a layer, built on first use
+    def grid(self, layer):
+        rgb = self.grids.get(layer)
+        if rgb is None:
+            rgb = np.empty((self.rows, self.cols, 3), dtype=np.uint8)
+            self._paint(rgb, layer, 0, self.cols - 1, 0, self.rows - 1)
+            self.grids[layer] = rgb
+        return rgb
+
+    def invalidate(self, layer=None):
+        if layer is None:
+            self.grids.clear()
+            self.pyramids.clear()
+        else:
+            self.grids.pop(layer, None)
+            self.pyramids.pop((layer, True), None)
+
+    def patch(self, layer, cmin, cmax, rmin, rmax):
+        rgb = self.grids.get(layer)
+        if rgb is None:
+            return
+        cmin, cmax = max(0, cmin), min(self.cols - 1, cmax)
+        rmin, rmax = max(0, rmin), min(self.rows - 1, rmax)
+        if cmin > cmax or rmin > rmax:
+            return
+        self._paint(rgb, layer, cmin, cmax, rmin, rmax)
+
+    def _paint(self, rgb, layer, cmin, cmax, rmin, rmax):
+        rgb[rmin:rmax + 1, cmin:cmax + 1] = self.base_color
+        layer_objs = self.objects_store.get(layer)
+        if layer_objs:
+            paint_objects(rgb, layer_objs, cmin, cmax, rmin, rmax, self.object_colors,
+                          types=layer_objs.static_types())
+
+    def draw_viewport(self, screen, layer, cmin, cmax, rmin, rmax):
+        cs = self.cell_size
+        profiler = self.profiler
+        with profiler.phase('base_cells'):
+            bounds_mask(cmin, cmax, rmin, rmax, self.cols, self.rows, out=self.mask)
+            apply_viewport_to_rgb(self.grid(layer), self.mask, self.outside_color, out=self.masked)
+        layer_objs = self.objects_store.get(layer)
+        if layer_objs and layer_objs.dynamic:
+            # moving objects come from the pyramid's per-cell level: one masked
+            # copy over the view, whatever the number of objects
+            with profiler.phase('draw_objects'):
+                pyramid = layer_pyramid(self.pyramids, layer_objs, layer, True, self.cols, self.rows,
+                                        self.object_colors)
+                codes = pyramid.codes[0][rmin:rmax + 1, cmin:cmax + 1]
+                n = codes.size
+                index = self.code_index[:n].reshape(codes.shape)
+                mask = self.code_mask[:n].reshape(codes.shape)
+                colors = self.code_colors[:n].reshape(codes.shape + (3,))
+                np.maximum(codes, 0, out=index)
+                np.greater_equal(codes, 0, out=mask)
+                np.take(pyramid.colors, index, axis=0, out=colors, mode='clip')
+                np.copyto(self.masked[rmin:rmax + 1, cmin:cmax + 1], colors, where=mask[..., None])
+        with profiler.phase('upscale'):
+            upscale_grid_to_image(self.masked, cs, out=self.frame, rows=self.frame_rows)
+
+        # grid lines every sub_size cells, inside the viewport only
+        step = self.sub_size * cs
+        x0, x1 = cmin * cs, (cmax + 1) * cs
+        y0, y1 = rmin * cs, (rmax + 1) * cs
+        with profiler.phase('grid_lines'):
+            self.frame[-(-y0 // step) * step:y1:step, x0:x1] = self.grid_line_color
+            self.frame[y0:y1, -(-x0 // step) * step:x1:step] = self.grid_line_color
+
+        if self.target is None or self.target.get_parent() is not screen:
+            self.target = screen.subsurface((0, 0, self.cols * cs, self.rows * cs))
+        # surfarray expects (x, y, channel); the transpose is a view, not a copy
+        with profiler.phase('blit_array'):
+            pygame.surfarray.blit_array(self.target, self.frame.transpose(1, 0, 2))
+        return pygame.Rect(x0, y0, x1 - x0, y1 - y0)
+
+
+# Same interface as LayerSurfaceCache for a ChunkedWorld: every (chunk, layer)
+# is rendered once into its own small surface and a frame blits the chunks
+# that intersect the view. The screen shows view_cols x view_rows cells
+# starting at `origin` (a camera in world cells), so the work per frame and
+# the surfaces kept (at most max_surfaces, least recently used dropped first)
+# depend on the screen, not on the size of the world.
+class ChunkRenderer:
+    def __init__(self, world, view_cols, view_rows, cell_size, sub_size,
+                 base_color, grid_line_color, object_colors, outside_color=(0, 0, 0), profiler=None,
+                 max_surfaces=64):
+        self.world = world
+        self.cols = world.cols
+        self.rows = world.rows
+        self.view_cols = view_cols
+        self.view_rows = view_rows
+        self.cell_size = cell_size
+        self.sub_size = sub_size
+        self.base_color = base_color
+        self.grid_line_color = grid_line_color
+        self.object_colors = object_colors
+        self.outside_color = outside_color
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.origin = (0, 0)
+        self.max_surfaces = max_surfaces
+        self.surfaces = OrderedDict()   # (chunk key, layer) -> Surface, least recently used first
+        world.on_evict.append(self._drop_chunk)
+
+    # camera: top-left world cell of the screen with `center` in the middle
+    def camera_for(self, center):
+        col = min(max(0, center[0] - self.view_cols // 2), max(0, self.cols - self.view_cols))
+        row = min(max(0, center[1] - self.view_rows // 2), max(0, self.rows - self.view_rows))
+        return col, row
+
+    def center_on(self, center):
+        if center is not None:
+            self.origin = self.camera_for(center)
+
+    # queue the chunks the screen would show if it were centered on `center`
+    def prefetch(self, center):
+        col, row = self.camera_for(center)
+        self.world.prefetch(col, col + self.view_cols - 1, row, row + self.view_rows - 1)
+
+    def _drop_chunk(self, key):
+        for surface_key in [k for k in self.surfaces if k[0] == key]:
+            del self.surfaces[surface_key]
+
+    def invalidate(self, layer=None):
+        if layer is None:
+            self.surfaces.clear()
+        else:
+            for surface_key in [k for k in self.surfaces if k[1] == layer]:
+                del self.surfaces[surface_key]
+
+    def surface(self, key, layer):
+        surf = self.surfaces.get((key, layer))
+        if surf is None:
+            k = self.world.chunk_cells
+            surf = pygame.Surface((k * self.cell_size, k * self.cell_size))
+            self._render(surf, key, layer)
+            self.surfaces[(key, layer)] = surf
+            while len(self.surfaces) > self.max_surfaces:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end((key, layer))
+        return surf
+
+    # chunks are small, so a patch simply re-renders the chunks it touches
+    def patch(self, layer, cmin, cmax, rmin, rmax):
+        for key in self.world.keys_in(cmin, cmax, rmin, rmax):
+            surf = self.surfaces.get((key, layer))
+            if surf is not None:
+                self._render(surf, key, layer)
+
+    def _render(self, surf, key, layer):
+        cs = self.cell_size
+        chunk = self.world.chunk(key)
+        k = self.world.chunk_cells
+        surf.fill(self.base_color)
+        layer_objs = chunk.objects.get(layer)
+        if layer_objs:
+            # the chunk surface is drawn in chunk-local pixels
+            for obj_type, columns in layer_objs.items():
+                color = self.object_colors.get(obj_type, (255, 0, 0))
+                for i in columns.visible(chunk.col0, chunk.col0 + k - 1, chunk.row0, chunk.row0 + k - 1):
+                    pygame.draw.rect(surf, color, (
+                        (int(columns.col[i]) - chunk.col0) * cs, (int(columns.row[i]) - chunk.row0) * cs,
+                        int(columns.w[i]) * cs, int(columns.h[i]) * cs,
+                    ))
+        # grid lines on world multiples of sub_size
+        first_col = -chunk.col0 % self.sub_size
+        first_row = -chunk.row0 % self.sub_size
+        for c in range(first_col, k, self.sub_size):
+            pygame.draw.line(surf, self.grid_line_color, (c * cs, 0), (c * cs, k * cs), 1)
+        for r in range(first_row, k, self.sub_size):
+            pygame.draw.line(surf, self.grid_line_color, (0, r * cs), (k * cs, r * cs), 1)
+
+    # blit the chunks of the visible cells and black out the rest of the screen grid
+    def draw_viewport(self, screen, layer, cmin, cmax, rmin, rmax):
+        cs = self.cell_size
+        k = self.world.chunk_cells
+        oc, orow = self.origin
+        # only what the camera shows is drawn
+        cmin, cmax = max(cmin, oc), min(cmax, oc + self.view_cols - 1)
+        rmin, rmax = max(rmin, orow), min(rmax, orow + self.view_rows - 1)
+        view = pygame.Rect((cmin - oc) * cs, (rmin - orow) * cs, (cmax - cmin + 1) * cs, (rmax - rmin + 1) * cs)
+
+        with self.profiler.phase('stream'):
+            self.world.update(cmin, cmax, rmin, rmax)
+        with self.profiler.phase('base_cells'):
+            clip = screen.get_clip()
+            screen.set_clip(view.clip(clip))
+            for key in self.world.keys_in(cmin, cmax, rmin, rmax):
+                x = (key[0] * k - oc) * cs
+                y = (key[1] * k - orow) * cs
+                screen.blit(self.surface(key, layer), (x, y))
+            screen.set_clip(clip)
+
+        width, height = self.view_cols * cs, self.view_rows * cs
+        with self.profiler.phase('outside'):
+            for band in (
+                (0, 0, width, view.top),
+                (0, view.bottom, width, height - view.bottom),
+                (0, view.top, view.left, view.height),
+                (view.right, view.top, width - view.right, view.height),
+            ):
+                if band[2] > 0 and band[3] > 0:
+                    screen.fill(self.outside_color, band)
+        return view
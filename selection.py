@@ -0,0 +1,62 @@
+#Team Name: Anything Works
+
+import numpy as np
+
+
+# Active (highlighted) cells held as a set of (col, row) instead of a full
+# rows x cols grid, so changing the selection costs O(changed cells).
+class Selection:
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.active = set()
+
+    def __contains__(self, cell):
+        return cell in self.active
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    # make (col,row) the only active cell; returns the cells that changed
+    def select(self, col, row):
+        cell = (col, row)
+        changed = [c for c in self.active if c != cell]
+        if cell not in self.active:
+            changed.append(cell)
+        self.active = {cell}
+        return changed
+
+    # add (col,row) to the selection (multi-select); returns the cells that changed
+    def add(self, col, row):
+        cell = (col, row)
+        if cell in self.active:
+            return []
+        self.active.add(cell)
+        return [cell]
+
+    def remove(self, col, row):
+        cell = (col, row)
+        if cell not in self.active:
+            return []
+        self.active.discard(cell)
+        return [cell]
+
+    def clear(self):
+        changed = list(self.active)
+        self.active = set()
+        return changed
+
+    # active cells inside the inclusive rectangle
+    def within(self, cmin, cmax, rmin, rmax):
+        return [(c, r) for c, r in self.active if cmin <= c <= cmax and rmin <= r <= rmax]
+
+    # the selection as a (rows, cols) bool array, for vectorized consumers
+    def to_mask(self):
+        mask = np.zeros((self.rows, self.cols), dtype=bool)
+        if self.active:
+            cols, rows = zip(*self.active)
+            mask[list(rows), list(cols)] = True
+        return mask
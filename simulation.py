@@ -0,0 +1,312 @@
+#Team Name: Anything Works
+
+# Game rules without a display. Replay a recorded session with:
+#   python simulation.py session.npz
+
+import argparse
+import array
+import hashlib
+import json
+import time
+from functools import partial
+import numpy as np
+from layers import OBJ_TYPES
+from object_store import collect_at
+from planner import FUEL_PER_CELL, INF
+
+LAYERS = 6
+TOP_RADIUS = 75
+MIN_RADIUS = 20
+
+# marine life takes one step every LIFE_TICK_MS of game time
+LIFE_TICK_MS = 250
+
+# input events of a session
+CLICK, DESCEND, ASCEND, END = 1, 2, 3, 4
+EVENT_NAMES = {CLICK: 'click', DESCEND: 'descend', ASCEND: 'ascend', END: 'end'}
+
+# one logged event: game time in ms, kind and the clicked cell (13 bytes)
+EVENT_DTYPE = np.dtype([('t', '<u4'), ('kind', 'u1'), ('col', '<i4'), ('row', '<i4')])
+# bumped whenever a rule change makes older logs replay to a different state
+# (2: hull damage from the hazard fields)
+LOG_VERSION = 2
+
+
+# function to compute radius for a given layer
+def radius_for_layer(layer):
+    if LAYERS <= 1:
+        return MIN_RADIUS
+    t = (layer - 1) / (LAYERS - 1)
+    return int(round(TOP_RADIUS * (1 - t) + MIN_RADIUS * t))
+
+# function to check if (col,row) is inside viewport
+def in_viewport(col, row, center, radius):
+    """Square viewport check: Chebyshev distance <= radius."""
+    if center is None:
+        return True
+    ccol, crow = center
+    return abs(col - ccol) <= radius and abs(row - crow) <= radius
+
+# fuel to move between two cells of a layer: the cheapest route through the
+# currents around hazards (inside window, e.g. the viewport), or the
+# straight-line burn without a planner or route. Every click is a new goal,
+# so this is a one-off planner.fuel() query rather than a D* Lite plan()
+def move_fuel(planner, layer, start, goal, window=None):
+    if start == goal:
+        return 0.0
+    fuel = planner.fuel(layer - 1, start, goal, window) if planner else INF
+    if fuel != INF:
+        return fuel
+    dx = goal[0] - start[0]
+    dy = goal[1] - start[1]
+    return FUEL_PER_CELL * (dx*dx + dy*dy) ** 0.5     # sqrt(a^2 + b^2)
+
+
+class EventLog:
+    """Input events of one session, appended to compact typed arrays.
+
+    meta describes what the session was played on (dataset, seed, world
+    mode) and, once saved, the state it ended in, so a replay can tell
+    whether it got to the same place.
+    """
+
+    def __init__(self, meta=None):
+        self.meta = dict(meta or {})
+        self.t = array.array('I')
+        self.kind = array.array('B')
+        self.col = array.array('i')
+        self.row = array.array('i')
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, t, kind, col=0, row=0):
+        self.t.append(t)
+        self.kind.append(kind)
+        self.col.append(col)
+        self.row.append(row)
+
+    def __iter__(self):
+        return zip(self.t, self.kind, self.col, self.row)
+
+    def events(self):
+        events = np.empty(len(self), dtype=EVENT_DTYPE)
+        events['t'] = self.t
+        events['kind'] = self.kind
+        events['col'] = self.col
+        events['row'] = self.row
+        return events
+
+    def save(self, path):
+        meta = dict(self.meta, version=LOG_VERSION)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, events=self.events(), meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != LOG_VERSION:
+                raise ValueError(f"{path}: event log version {meta.get('version')}, expected {LOG_VERSION}")
+            events = data['events']
+        log = cls(meta)
+        log.t.extend(events['t'].tolist())
+        log.kind.extend(events['kind'].tolist())
+        log.col.extend(events['col'].tolist())
+        log.row.extend(events['row'].tolist())
+        return log
+
+
+class Simulation:
+    """The game rules of one session: layer, selection, collecting and fuel.
+
+    Input comes in as click(col, row), descend() and ascend(); advance(now)
+    moves game time (ms) forward and steps marine life on a fixed
+    LIFE_TICK_MS clock. Nothing here draws or waits, so the game loop feeds
+    it pygame events and replay() feeds it a recorded EventLog at full CPU
+    speed. With a log, every input is recorded with its game time; the same
+    inputs at the same times on the same world end in the same state.
+
+    world is an objects store ({layer: LayerObjects}) or a ChunkedWorld;
+    a store can be filled layer by layer while the world loads.
+    With hazard fields, every move costs hull health by the hazard exposure
+    of the cell it ends in; the session is over when fuel or hull runs out.
+    """
+
+    def __init__(self, world, cols, rows, planner=None, life_sim=None, hazards=None, log=None,
+                 life_tick_ms=LIFE_TICK_MS):
+        self.set_world(world, cols, rows)
+        self.planner = planner
+        self.life_sim = life_sim
+        self.hazards = hazards          # HazardFields: hull damage per move
+        self.log = log
+        self.life_tick_ms = life_tick_ms
+
+        self.now = 0
+        self.next_life_tick = 0
+        self.layer = 1
+        self.hull_health = 100
+        self.fuel = 100
+        self.depth_m = self.layer * 100     # depth based on layer (1 -> 100m)
+        self.collected_counts = {k: 0 for k in OBJ_TYPES}
+
+        self.viewport_center = None     # (col,row) or None
+        self.selected = None            # (col,row) user-selected cell (must be inside viewport)
+        self.prev_selected = None
+
+    # play on another world, e.g. one that finished loading after the session began
+    def set_world(self, world, cols, rows):
+        self.world = world
+        self.cols = cols
+        self.rows = rows
+        self._collect = partial(collect_at, world) if isinstance(world, dict) else world.collect_at
+
+    def _record(self, kind, col=0, row=0):
+        if self.log is not None:
+            self.log.append(self.now, kind, col, row)
+
+    # move game time to now (ms); returns how many marine-life steps were due
+    def advance(self, now):
+        now = max(self.now, now)
+        self.now = now
+        if self.life_sim is None or now < self.next_life_tick:
+            return 0
+        steps = (now - self.next_life_tick) // self.life_tick_ms + 1
+        self.life_sim.run(steps)
+        self.next_life_tick += steps * self.life_tick_ms
+        return steps
+
+    # go one layer deeper, centered on the selection; False at the bottom
+    def descend(self):
+        self._record(DESCEND)
+        if self.layer >= LAYERS:
+            return False
+        if self.selected is not None:
+            self.viewport_center = self.selected
+        self.layer += 1
+        self.depth_m = self.layer * 100
+        return True
+
+    # go one layer up, keeping the viewport center (the radius grows)
+    def ascend(self):
+        self._record(ASCEND)
+        if self.layer <= 1:
+            return False
+        self.layer -= 1
+        self.depth_m = self.layer * 100
+        return True
+
+    def click(self, col, row):
+        """Select a grid cell: the first click centers the viewport, later
+        clicks inside it move there, collecting what is in the cell, burning
+        fuel and taking hazard damage. Once the session is over, clicks do
+        nothing. Returns the collected object or None.
+        """
+        self._record(CLICK, col, row)
+        if self.over or not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+
+        if self.viewport_center is None:
+            self.viewport_center = (col, row)
+            self.selected = (col, row)
+            return None
+
+        collected = None
+        # only clicks inside the currently visible bounds count
+        if in_viewport(col, row, self.viewport_center, radius_for_layer(self.layer)):
+            self.selected = (col, row)   # the viewport only moves when going deeper
+            if self.hazards is not None:
+                self.hull_health = max(0.0, self.hull_health - self.hazards.damage(self.layer, col, row))
+            collected = self._collect(col, row, self.layer)
+            if collected:
+                self.collected_counts[collected['type']] = self.collected_counts.get(collected['type'], 0) + 1
+                # a collected hazard no longer blocks routes or hurts around it
+                if collected['type'] == 'hazards':
+                    if self.planner is not None:
+                        self.planner.set_blocked(self.layer - 1, [
+                            (c, r) for c in range(collected['col'], collected['col'] + collected['w'])
+                            for r in range(collected['row'], collected['row'] + collected['h'])])
+                    if self.hazards is not None:
+                        self.hazards.refresh(self.layer, collected['col'], collected['row'],
+                                             collected['w'], collected['h'])
+
+        # fuel for the route to the new cell
+        if self.prev_selected is not None:
+            (ccol, crow), radius = self.viewport_center, radius_for_layer(self.layer)
+            window = (ccol - radius, ccol + radius, crow - radius, crow + radius)
+            self.fuel = max(0, self.fuel - move_fuel(self.planner, self.layer, self.prev_selected, self.selected, window))
+        self.prev_selected = self.selected
+        return collected
+
+    def apply(self, kind, col=0, row=0):
+        if kind == CLICK:
+            return self.click(col, row)
+        if kind == DESCEND:
+            return self.descend()
+        if kind == ASCEND:
+            return self.ascend()
+        if kind == END:
+            self._record(END)
+            return None
+        raise ValueError(f'unknown event kind {kind}')
+
+    # the session is over (window closed, out of fuel or hull)
+    def finish(self):
+        self.apply(END)
+
+    @property
+    def over(self):
+        return self.fuel <= 0 or self.hull_health <= 0
+
+    # where the session stands; equal summaries mean equal game state
+    def summary(self):
+        state = {
+            'time_ms': self.now,
+            'layer': self.layer,
+            'fuel': round(float(self.fuel), 6),
+            'hull_health': round(float(self.hull_health), 6),
+            'selected': list(self.selected) if self.selected else None,
+            'viewport_center': list(self.viewport_center) if self.viewport_center else None,
+            'collected': dict(self.collected_counts),
+        }
+        if self.life_sim is not None:
+            state['life'] = hashlib.sha1(self.life_sim.pos.tobytes()).hexdigest()[:16]
+        return state
+
+
+# feed a recorded session into a fresh simulation, as fast as possible
+def replay(log, sim):
+    for t, kind, col, row in log:
+        sim.advance(t)
+        sim.apply(kind, col, row)
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a recorded session without a display.')
+    parser.add_argument('log', help='event log written with BT_RECORD=<file.npz>')
+    args = parser.parse_args()
+
+    import main as game     # world loading lives with the game setup
+    log = EventLog.load(args.log)
+    meta = log.meta
+    start = time.perf_counter()
+    sim, _ = game.load_session(game.DataLoader(meta.get('data_dir', game.DATA_DIR)), seed=meta.get('seed'),
+                               world_mode=meta.get('world_mode'), simulate_life=meta.get('simulate_life', True))
+    loaded = time.perf_counter()
+    replay(log, sim)
+    done = time.perf_counter()
+
+    summary = sim.summary()
+    print(json.dumps(summary, indent=2))
+    print(f'{len(log)} events, {sim.now / 1000:.1f} s of play replayed in {done - loaded:.3f} s '
+          f'(world loaded in {loaded - start:.2f} s)')
+    if 'final' in meta:
+        same = meta['final'] == summary
+        print('final state matches the recording' if same else 'final state DIFFERS from the recording')
+        return 0 if same else 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
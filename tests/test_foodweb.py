@@ -0,0 +1,34 @@
+#Team Name: Anything Works
+
+import math
+import pandas as pd
+from foodweb import FoodWeb
+
+
+def web(*links):
+    return FoodWeb(pd.DataFrame({'predator': [p for p, _ in links], 'prey': [q for _, q in links]}))
+
+
+def test_chain_levels():
+    w = web(('shark', 'tuna'), ('tuna', 'sardine'), ('sardine', 'plankton'))
+    assert w.trophic_levels().tolist() == [4.0, 3.0, 2.0, 1.0]
+
+
+def test_cannibal_with_basal_prey():
+    w = web(('squid', 'squid'), ('squid', 'krill'))
+    assert math.isclose(w.trophic_level('squid'), 3.0)
+    assert w.trophic_level('krill') == 1.0
+
+
+def test_cycle_with_basal_exit():
+    # A = 1 + (B + krill) / 2, B = 1 + A: A = 4, B = 5
+    w = web(('a', 'b'), ('b', 'a'), ('a', 'krill'))
+    assert math.isclose(w.trophic_level('a'), 4.0)
+    assert math.isclose(w.trophic_level('b'), 5.0)
+
+
+def test_closed_cycles_have_no_level():
+    w = web(('a', 'b'), ('b', 'a'), ('c', 'c'), ('orca', 'a'), ('orca', 'seal'), ('seal', 'fish'))
+    levels = dict(zip(w.names, w.trophic_levels().tolist()))
+    assert all(math.isnan(levels[name]) for name in ('a', 'b', 'c', 'orca'))
+    assert levels['seal'] == 2.0 and levels['fish'] == 1.0
@@ -23,6 +23,9 @@ OBJECT_LABELS = {
     "resources": "Resources",
 }
 
+# reverse of OBJECT_LABELS, so legend items resolve to an object type in O(1)
+LABEL_TO_KEY = {v: k for k, v in OBJECT_LABELS.items()}
+
 DEFAULT_LEGEND_ITEMS = [
     {"color": OBJECT_COLORS["life"],      "label": OBJECT_LABELS["life"]},
     {"color": OBJECT_COLORS["poi"],       "label": OBJECT_LABELS["poi"]},
@@ -38,6 +41,26 @@ RED       = (200, 50, 50)
 YELLOW    = (230, 210, 50)
 DARK_GREY = (40, 40, 40)
 
+# rendered strings kept per font before the text cache is reset
+TEXT_CACHE_SIZE = 256
+
+# environment readings under the cursor: (field, label, value format)
+READING_FORMATS = [
+    ("depth_m",           "Seafloor", "{:.0f} m"),
+    ("pressure_atm",      "Pressure", "{:.1f} atm"),
+    ("temperature_c",     "Temp",     "{:.1f} C"),
+    ("light_intensity",   "Light",    "{:.2f}"),
+    ("terrain_roughness", "Terrain",  "{:.2f}"),
+]
+
+# short names of the hazard types for the nearest-hazard line
+HAZARD_LABELS = {
+    "thermal_vent": "Vent",
+    "methane_leak": "Methane",
+    "acidic_zone":  "Acid",
+    "trench_wall":  "Trench",
+}
+
 class HUD:
     def __init__(
         self,
@@ -55,22 +78,109 @@ class HUD:
         self.fuel = 100          
         self.depth_m = 0       
 
-        # Legend entries
+        # Legend entries and the object type each one counts
         self.legend_items = legend_items if legend_items is not None else DEFAULT_LEGEND_ITEMS
+        self.legend_keys = [LABEL_TO_KEY.get(item["label"]) for item in self.legend_items]
 
         self.collected_counts = {k: 0 for k in OBJECT_LABELS.keys()}
 
+        # formatted environment readings under the cursor (empty: cursor off the grid)
+        self.reading_lines = ()
+
+        # nearest hazard to the sub ("" when none is in range)
+        self.hazard_line = ""
+
+        # predators in view of the last collected species ("" until one is collected)
+        self.predator_line = ""
+
         # Fonts (initialize once)
         self.font_small = pygame.font.SysFont(None, 20)
         self.font_medium = pygame.font.SysFont(None, 28)
 
+        # rendered text surfaces keyed by (font, string)
+        self._text_cache = {}
+
+        # the whole panel is composed off-screen and only rebuilt when the
+        # values it shows change; draw() is then a single blit
+        self._panel = pygame.Surface((self.window_width, self.gui_height))
+        self._panel_state = None
+
     def increment_collected(self, obj_type: str, n: int = 1):
         if obj_type not in self.collected_counts:
             self.collected_counts[obj_type] = 0
         self.collected_counts[obj_type] += n
 
+    # show readings ({field: value}, or None to clear); True if the text changed
+    def set_readings(self, readings):
+        lines = ()
+        if readings:
+            lines = tuple(
+                f"{label}: {fmt.format(float(readings[name]))}"
+                for name, label, fmt in READING_FORMATS
+                if name in readings and readings[name] == readings[name]     # skip NaN
+            )
+        if lines == self.reading_lines:
+            return False
+        self.reading_lines = lines
+        return True
+
+    # show the nearest hazard ((type, distance in cells) or None); True if the text changed
+    def set_hazard(self, nearest):
+        line = ""
+        if nearest is not None:
+            kind, distance = nearest
+            line = f"{HAZARD_LABELS.get(kind, kind)}: {distance:.0f} cells"
+        if line == self.hazard_line:
+            return False
+        self.hazard_line = line
+        return True
+
+    # show how many predators of a collected species are in view; True if the text changed
+    def set_predators(self, species, count):
+        line = f"{species}: {count} predators in view" if species else ""
+        if line == self.predator_line:
+            return False
+        self.predator_line = line
+        return True
+
+    # loading indicator at the top of a screen region: the current step and a
+    # bar filled to fraction; returns the rectangle drawn
+    def draw_progress(self, surface: pygame.Surface, region: pygame.Rect, label: str, fraction: float):
+        box = pygame.Rect(0, 0, 320, 54)
+        box.midtop = (region.centerx, region.top + 10)
+        pygame.draw.rect(surface, GUI_BG, box)
+        pygame.draw.rect(surface, WHITE, box, 1)
+        surface.blit(self._text(self.font_small, label), (box.x + 10, box.y + 8))
+
+        bar = pygame.Rect(box.x + 10, box.y + 30, box.width - 20, 14)
+        pygame.draw.rect(surface, DARK_GREY, bar)
+        pygame.draw.rect(surface, YELLOW, (bar.x, bar.y, int(bar.width * max(0.0, min(1.0, fraction))), bar.height))
+        pygame.draw.rect(surface, WHITE, bar, 1)
+        return box
+
+    def _text(self, font, text):
+        key = (id(font), text)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surf = font.render(text, True, WHITE)
+            self._text_cache[key] = surf
+        return surf
+
+    def _state(self):
+        return (self.hull_health, self.fuel, self.depth_m, tuple(self.collected_counts.items()),
+                self.reading_lines, self.hazard_line, self.predator_line)
+
     def draw(self, surface: pygame.Surface):
-        gui_y = self.grid_height  
+        state = self._state()
+        if state != self._panel_state:
+            self._render_panel(self._panel)
+            self._panel_state = state
+        surface.blit(self._panel, (0, self.grid_height))
+
+    def _render_panel(self, surface: pygame.Surface):
+        gui_y = 0       # panel-local coordinates
         gui_height = self.gui_height
 
         # Background panel
@@ -81,14 +191,9 @@ class HUD:
         box_size = 18
         spacing_y = 22
 
-        for i, item in enumerate(self.legend_items):
+        for i, (item, obj_key) in enumerate(zip(self.legend_items, self.legend_keys)):
             color = item["color"]
             base_label = item["label"]
-            obj_key = None
-            for k, v in OBJECT_LABELS.items():
-                if v == base_label:
-                    obj_key = k
-                    break
 
             count = self.collected_counts.get(obj_key, 0) if obj_key is not None else None
             label = f"{base_label} ({count})" if count is not None else base_label
@@ -99,9 +204,14 @@ class HUD:
             pygame.draw.rect(surface, WHITE, box_rect, 1)
 
             # Text
-            text_surf = self.font_small.render(label, True, WHITE)
+            text_surf = self._text(self.font_small, label)
             surface.blit(text_surf, (legend_x + box_size + 8, legend_y + i * spacing_y + 2))
 
+        # Readings under the cursor
+        readings_x = 250
+        for i, line in enumerate(self.reading_lines):
+            surface.blit(self._text(self.font_small, line), (readings_x, gui_y + 10 + i * 17))
+
         bars_x = 500
         bars_y = gui_y + 10
         bar_width = 200
@@ -118,7 +228,7 @@ class HUD:
                          (bars_x, bars_y, int(bar_width * health_ratio), bar_height))
         pygame.draw.rect(surface, WHITE,
                          (bars_x, bars_y, bar_width, bar_height), 1)
-        health_text = self.font_small.render(f"Hull: {int(self.hull_health)}%", True, WHITE)
+        health_text = self._text(self.font_small, f"Hull: {int(self.hull_health)}%")
         surface.blit(health_text, (bars_x + bar_width + 10, bars_y))
 
         # Fuel Bar
@@ -129,9 +239,19 @@ class HUD:
                          (bars_x, fuel_y, int(bar_width * fuel_ratio), bar_height))
         pygame.draw.rect(surface, WHITE,
                          (bars_x, fuel_y, bar_width, bar_height), 1)
-        fuel_text = self.font_small.render(f"Fuel: {int(self.fuel)}%", True, WHITE)
+        fuel_text = self._text(self.font_small, f"Fuel: {int(self.fuel)}%")
         surface.blit(fuel_text, (bars_x + bar_width + 10, fuel_y))
 
         # Depth
-        depth_text = self.font_medium.render(f"Depth: {self.depth_m} m", True, WHITE)
+        depth_text = self._text(self.font_medium, f"Depth: {self.depth_m} m")
         surface.blit(depth_text, (bars_x, fuel_y + bar_height + 10))
+
+        # Nearest hazard, next to the depth
+        if self.hazard_line:
+            hazard_text = self._text(self.font_small, self.hazard_line)
+            surface.blit(hazard_text, (bars_x + 150, fuel_y + bar_height + 14))
+
+        # Predators of the last collected species, under the depth
+        if self.predator_line:
+            predator_text = self._text(self.font_small, self.predator_line)
+            surface.blit(predator_text, (bars_x, fuel_y + bar_height + 30))
@@ -11,25 +11,48 @@ def compute_viewport_bounds(center_col, center_row, view_radius, grid_w, grid_h)
     row_max = min(grid_h - 1, center_row + view_radius)
     return col_min, col_max, row_min, row_max
 
-# Compute a boolean mask of visible cells within the viewport
-def visible_mask(center_col, center_row, radius, grid_w, grid_h):
-    cols = np.arange(grid_w)[None, :]        
-    rows = np.arange(grid_h)[:, None]
+# Boolean mask of the inclusive cell rectangle; written into `out` if given
+def bounds_mask(col_min, col_max, row_min, row_max, grid_w, grid_h, out=None):
+    if out is None:
+        out = np.zeros((grid_h, grid_w), dtype=bool)
+    else:
+        out[...] = False
+    out[max(0, row_min):row_max + 1, max(0, col_min):col_max + 1] = True
+    return out
 
-    # boolean viewOrNot where cells are within the square viewport or not
-    viewOrNot = (np.abs(cols - center_col) <= radius) & (np.abs(rows - center_row) <= radius)
-    return viewOrNot
+# Compute a boolean mask of visible cells within the viewport
+def visible_mask(center_col, center_row, radius, grid_w, grid_h, out=None):
+    # the square viewport is a rectangle of cells, so it can be filled by slicing
+    bounds = compute_viewport_bounds(center_col, center_row, radius, grid_w, grid_h)
+    return bounds_mask(*bounds, grid_w, grid_h, out=out)
 
 # Apply viewport mask to RGB grid and the outside color set to black
-def apply_viewport_to_rgb(rgb_grid, mask, outside_color=(0,0,0)):
-    out = np.zeros_like(rgb_grid, dtype=np.uint8)
-    out[mask] = rgb_grid[mask]      # set inside cells to original colors
-    out[~mask] = outside_color      # set outside cells to black
+def apply_viewport_to_rgb(rgb_grid, mask, outside_color=(0,0,0), out=None):
+    if out is None:
+        out = np.empty_like(rgb_grid, dtype=np.uint8)
+    out[...] = outside_color                        # set outside cells to black
+    np.copyto(out, rgb_grid, where=mask[..., None]) # set inside cells to original colors
     return out
 
-def upscale_grid_to_image(rgb_grid, cell_px=2):
+# `rows` is an optional (h, w * cell_px, channels) scratch array for the
+# first pixel row of every cell row
+def upscale_grid_to_image(rgb_grid, cell_px=2, out=None, rows=None):
     # if cell_px <= 1, return original
     if cell_px <= 1:
-        return rgb_grid.copy()
-    # else upscale using np.kron to repeat each cell_px times in both dimensions
-    return np.kron(rgb_grid, np.ones((cell_px, cell_px, 1), dtype=np.uint8))
\ No newline at end of file
+        if out is None:
+            return rgb_grid.copy()
+        out[...] = rgb_grid
+        return out
+    h, w, ch = rgb_grid.shape
+    if out is None:
+        out = np.empty((h * cell_px, w * cell_px, ch), dtype=rgb_grid.dtype)
+    if not out.flags.c_contiguous:
+        raise ValueError("out must be a C-contiguous (h*cell_px, w*cell_px, channels) array")
+    if rows is None:
+        rows = np.empty((h, w * cell_px, ch), dtype=rgb_grid.dtype)
+    # repeat each cell along one pixel row, then broadcast that row down its
+    # block; two contiguous broadcasts are several times faster than one
+    # broadcast over (h, cell_px, w, cell_px), whose inner run is one pixel
+    rows.reshape(h, w, cell_px, ch)[...] = rgb_grid[:, :, None, :]
+    out.reshape(h, cell_px, w * cell_px, ch)[...] = rows[:, None]
+    return out